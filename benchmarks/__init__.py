@@ -0,0 +1,11 @@
+"""Performance benchmarks for fealden; see benchmarks/run.py."""
+import os
+
+# Unless a backend is chosen explicitly (such as FEALDEN_BACKEND=replay with a
+# recorded archive), fold with the synthetic backend, which needs no binaries.
+os.environ.setdefault("FEALDEN_BACKEND", "synthetic")
+
+
+class Skip(Exception):
+    """Raised by a benchmark's setup when it cannot run here, such as when the
+    backend it measures is not installed."""
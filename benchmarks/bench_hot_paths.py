@@ -0,0 +1,73 @@
+"""Benchmarks for sensor generation, folding graphs and scoring."""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+
+from fealden import fealden, fold, seed, sensor
+from fealden._synthetic import RNAfolder as SyntheticFolder
+
+SENSOR_SEQ = "acttcgggacttgcttgaagcacgtgctattggtaccaatagtgagaagt"
+REC_SEQ = {"start": 21, "end": 27}
+RESP_SEQ = {"start": -1, "end": -1}
+
+GRAPH_2 = [
+    "2 1 3 11 0",
+    "3 2 4",
+    "4 3 5 5 7",
+    "5 4 4",
+    "7 4 6",
+    "6 7 9 9 11",
+    "9 6 6",
+    "11 6 2",
+]
+
+
+def make_seed() -> seed.Seed:
+    return seed.Seed(GRAPH_2, "7", "CACGTG", 1, "Graph 2", 50)
+
+
+def bench_seed_sequence_synthesis() -> Callable[[], object]:
+    s = make_seed()
+
+    def run() -> str:
+        s.generate_node_sizes()
+        s.populate_nodes()
+        return "".join(s.get_sequence())
+
+    return run
+
+
+def bench_seed_build_sensor() -> Callable[[], object]:
+    s = make_seed()
+    return lambda: s.build_sensor(1, 1, "CACGTG", False, True)
+
+
+def bench_fold_construction() -> Callable[[], object]:
+    folds = SyntheticFolder(SENSOR_SEQ).structure_dict
+    return lambda: [
+        fold.Fold(f["bps"], f["deltaG"], REC_SEQ) for f in folds  # type: ignore
+    ]
+
+
+def bench_fold_get_distance() -> Callable[[], object]:
+    f = SyntheticFolder(SENSOR_SEQ).structure_dict[0]
+    this_fold = fold.Fold(f["bps"], f["deltaG"], REC_SEQ)  # type: ignore[arg-type]
+    return lambda: [this_fold.get_distance(1, i) for i in range(2, len(SENSOR_SEQ))]
+
+
+def bench_sensor_get_tagging_information() -> Callable[[], object]:
+    sen = sensor.Sensor(
+        (SENSOR_SEQ, SyntheticFolder(SENSOR_SEQ).structure_dict),
+        REC_SEQ,
+        RESP_SEQ,
+        1,
+        "Graph 2",
+        "CACGTG",
+        False,
+    )
+    return sen.get_tagging_information
+
+
+def bench_fealden_end_to_end() -> Callable[[], object]:
+    return lambda: fealden.Fealden("cacgtg", 1, 50, 200, True, "", False, True)
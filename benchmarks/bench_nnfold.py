@@ -0,0 +1,17 @@
+"""In-process folding latency of the built-in nnfold backend (needs numpy)."""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+
+from . import Skip
+
+SENSOR_SEQ = "ACTTCGGGACTTGCTTGAAGCACGTGCTATTGGTACCAATAGTGAGAAGT"
+
+
+def bench_nnfold_fold_sensor() -> Callable[[], object]:
+    try:
+        from fealden._nnfold import RNAfolder
+    except ImportError:
+        raise Skip("numpy is not installed") from None
+    return lambda: RNAfolder(SENSOR_SEQ)
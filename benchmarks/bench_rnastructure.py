@@ -0,0 +1,64 @@
+"""Per-candidate folding and pair-table extraction latency of the RNAstructure
+backend; extraction is timed on the 50-nt sensor with 15 suboptimal structures.
+
+These need the RNAstructure python interface (see the README), and are skipped
+without it.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import io
+from collections.abc import Callable
+from typing import Any
+
+from . import Skip
+
+SENSOR_SEQ = "ACTTCGGGACTTGCTTGAAGCACGTGCTATTGGTACCAATAGTGAGAAGT"
+
+
+def rnastructure() -> Any:
+    """Import the backend quietly, raising Skip if RNAstructure is missing."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        from fealden import _rnastructure
+    if not hasattr(_rnastructure, "RNAstructure"):
+        raise Skip("RNAstructure is not installed")
+    return _rnastructure
+
+
+def bench_fold_loading_parameters() -> Callable[[], object]:
+    backend = rnastructure()
+    backend._thermo_template = None
+    return lambda: backend.RNAfolder(SENSOR_SEQ)
+
+
+def bench_fold_preloaded_parameters() -> Callable[[], object]:
+    backend = rnastructure()
+    backend.RNAfolder.warm_up()
+    if backend._thermo_template is None:
+        raise Skip("this RNAstructure build cannot copy parameters")
+    return lambda: backend.RNAfolder(SENSOR_SEQ)
+
+
+def folded_suboptimals(count: int = 15) -> tuple[Any, Any]:
+    """Fold the sensor sequence, keeping up to count structures."""
+    backend = rnastructure()
+    rna = backend.RNAstructure.RNA.fromString(SENSOR_SEQ, backbone="dna")
+    rna.SetTemperature(temperature=backend.TEMPERATURE)
+    rna.FoldSingleStrand(percent=100, maximumstructures=count)
+    return backend, rna
+
+
+def bench_extract_pairs_per_base() -> Callable[[], object]:
+    _, rna = folded_suboptimals()
+    seq_len, number_folds = len(rna), rna.GetStructureNumber()
+    return lambda: [
+        [rna.GetPair(base + 1, structurenumber=i + 1) for base in range(seq_len)]
+        for i in range(number_folds)
+    ]
+
+
+def bench_extract_pairs_bulk_ct() -> Callable[[], object]:
+    backend, rna = folded_suboptimals()
+    seq_len, number_folds = len(rna), rna.GetStructureNumber()
+    return lambda: backend.RNAfolder.read_ct_pairs(rna, seq_len, number_folds)
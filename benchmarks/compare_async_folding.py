@@ -0,0 +1,62 @@
+"""Compare folding one sequence at a time with keeping several folds in flight.
+
+Usage (from the repository root):
+
+    python -m benchmarks.compare_async_folding [--sensors N] [--concurrency 1 2 4 8]
+
+Sensors are generated from one seed graph with fealden.generate_sensor(), then with
+the asyncio driver (see fealden/asyncfold.py) at each concurrency, from the same
+random seed. Folding uses the selected backend: set FEALDEN_BACKEND=mfold to measure
+hybrid-ss-min itself. By default the synthetic backend is used, sleeping
+FEALDEN_SYNTHETIC_SLEEP seconds per fold (10 ms here) in place of a subprocess.
+Reported are the folds per second, the average folds in flight, and whether the
+same sensors were found.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import random
+import time
+
+os.environ.setdefault("FEALDEN_BACKEND", "synthetic")
+os.environ.setdefault("FEALDEN_SYNTHETIC_SLEEP", "0.01")
+
+from fealden import asyncfold, fealden, structure  # noqa: E402
+
+from .bench_hot_paths import make_seed  # noqa: E402
+
+REC_SEQ = "CACGTG"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare concurrent folding.")
+    parser.add_argument("--sensors", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    structure.warm_up()
+    random.seed(args.seed)
+    start = time.perf_counter()
+    expected = fealden.generate_sensor(
+        make_seed(), REC_SEQ, args.sensors, 1, False, True
+    )
+    elapsed = time.perf_counter() - start
+    found = sorted(sen.seq for sen in expected)
+    print(f"backend: {os.environ['FEALDEN_BACKEND']}  designs: {args.sensors}")
+    print(f"one at a time: {elapsed:.2f} s, {len(found)} sensors")
+
+    for concurrency in args.concurrency:
+        random.seed(args.seed)
+        stats = asyncfold.FoldStats()
+        tasks = [(make_seed(), REC_SEQ, args.sensors, 1, False, True)]
+        actual = asyncio.run(asyncfold.generate_all(tasks, concurrency, stats))
+        same = sorted(sen.seq for sen in actual) == found
+        print(f"concurrency {concurrency}: {stats.summary()}; same sensors: {same}")
+
+
+if __name__ == "__main__":
+    main()
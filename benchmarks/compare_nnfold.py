@@ -0,0 +1,138 @@
+"""Compare the built-in nnfold backend with hybrid-ss-min, for accuracy and speed.
+
+Usage (from the repository root):
+
+    python -m benchmarks.compare_nnfold [--sequences N] [--seed N] [-o FILE]
+
+A corpus of sensor sequences is generated from the seed graphs and folded with both
+backends (hybrid-ss-min is configured through the .env file, as for the mfold
+backend, and is skipped if it is not available). Reported for each backend are the
+sequences folded per second, and for nnfold against hybrid-ss-min:
+
+    - the mean absolute difference of the minimum free energies
+    - the base pair sensitivity and positive predictive value of the minimum free
+      energy structures
+    - how often the sensor built from each sequence is accepted by both, or neither
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import time
+from typing import Any
+
+from fealden import sensor
+
+from .bench_hot_paths import RESP_SEQ, make_seed
+
+
+def build_corpus(size: int) -> list[tuple[str, dict[str, int]]]:
+    """Return (sequence, rec_seq) for size sensor sequences from the seed graph."""
+    s = make_seed()
+    corpus: list[tuple[str, dict[str, int]]] = []
+    while len(corpus) < size:
+        s.generate_node_sizes()
+        s.populate_nodes()
+        seq = "".join(s.get_sequence()).upper()
+        if len(seq) > s.max_sensor_size:
+            continue
+        rec_seq, _ = s.nodes[s.rec_node_name].get_rec_seq_data()  # type: ignore
+        corpus.append((seq, rec_seq))
+    return corpus
+
+
+def fold_all(folder: Any, corpus: list[tuple[str, dict[str, int]]]) -> dict[str, Any]:
+    """Fold every sequence, returning the results and the sequences per second."""
+    start = time.perf_counter()
+    results = [folder(seq).structure_dict for seq, _ in corpus]
+    elapsed = time.perf_counter() - start
+    return {"results": results, "per_second": len(corpus) / elapsed}
+
+
+def pairs(structure_dict: Any) -> set[tuple[int, int]]:
+    """Return the base pairs of the minimum free energy structure."""
+    return {(b, p) for b, p in structure_dict[0]["bps"] if 0 < b < p}
+
+
+def accepted(seq: str, rec_seq: dict[str, int], structure_dict: Any) -> bool:
+    """Return True if the sensor built from these folds gets a valid score."""
+    sen = sensor.Sensor(
+        (seq.lower(), structure_dict), rec_seq, RESP_SEQ, 1, "Graph 2", "CACGTG", False
+    )
+    return sen.score >= 0
+
+
+def compare(
+    corpus: list[tuple[str, dict[str, int]]], test: list[Any], reference: list[Any]
+) -> dict[str, float]:
+    """Return accuracy statistics of the test folds against the reference folds."""
+    true_positives = predicted = known = agree = 0
+    for (seq, rec_seq), a, b in zip(corpus, test, reference):
+        found, expected = pairs(a), pairs(b)
+        true_positives += len(found & expected)
+        predicted += len(found)
+        known += len(expected)
+        agree += accepted(seq, rec_seq, a) == accepted(seq, rec_seq, b)
+    return {
+        "mfe_mean_abs_difference": statistics.fmean(
+            abs(a[0]["deltaG"] - b[0]["deltaG"]) for a, b in zip(test, reference)
+        ),
+        "pair_sensitivity": true_positives / known if known else 1.0,
+        "pair_ppv": true_positives / predicted if predicted else 1.0,
+        "sensor_verdict_agreement": agree / len(corpus),
+        "mean_folds": statistics.fmean(len(a) for a in test),
+        "reference_mean_folds": statistics.fmean(len(b) for b in reference),
+    }
+
+
+def hybrid_ss_min_available() -> bool:
+    """Return True if hybrid-ss-min is configured and can be run."""
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    location = os.getenv("HYBRID_SS_MIN")
+    return bool(location) and shutil.which(str(location)) is not None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare nnfold with hybrid-ss-min.")
+    parser.add_argument("--sequences", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", help="also write the report as JSON")
+    args = parser.parse_args()
+
+    from fealden._nnfold import RNAfolder as BuiltinFolder
+
+    random.seed(args.seed)
+    corpus = build_corpus(args.sequences)
+    report: dict[str, Any] = {"sequences": len(corpus)}
+    builtin = fold_all(BuiltinFolder, corpus)
+    report["nnfold_per_second"] = builtin["per_second"]
+    print(f"sequences: {len(corpus)}")
+    print(f"nnfold:        {builtin['per_second']:8.1f} sequences/s")
+
+    if hybrid_ss_min_available():
+        from fealden._unafold import RNAfolder as UnafoldFolder
+
+        unafold = fold_all(UnafoldFolder, corpus)
+        report["hybrid_ss_min_per_second"] = unafold["per_second"]
+        print(f"hybrid-ss-min: {unafold['per_second']:8.1f} sequences/s")
+        accuracy = compare(corpus, builtin["results"], unafold["results"])
+        report.update(accuracy)
+        for key, value in accuracy.items():
+            print(f"{key}: {value:.3f}")
+    else:
+        print("hybrid-ss-min is not configured (HYBRID_SS_MIN); skipped comparison")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""Compare the output formats of fealden/writers.py for size and throughput.
+
+Usage (from the repository root):
+
+    python -m benchmarks.compare_output_formats [--sensors N] [--seed N] [-o FILE]
+
+A result set of N synthetic sensors (random sequences and scores, with the columns
+of Sensor.as_dict()) is written in every available format, then read back: CSV
+with the csv module, JSON lines with json, Parquet with pyarrow (skipped if it is
+not installed) and .npz with numpy. Reported for each format are the file size,
+the sensors written and read per second, and each against CSV.
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import os
+import random
+import tempfile
+import time
+from types import SimpleNamespace
+from typing import Any
+
+from fealden import writers
+
+
+def make_sensors(size: int) -> list[Any]:
+    """Return size objects with the as_dict() and csv_line() of a sensor."""
+    found = []
+    for _ in range(size):
+        seq = "".join(random.choices("acgt", k=random.randint(30, 60)))
+        row = {
+            "sequence": seq,
+            "score": random.random(),
+            "seed_name": f"Graph {random.randint(1, 5)}",
+            "tag_location": random.randint(1, len(seq)),
+            "conc_on": random.random(),
+            "conc_off": random.random(),
+            "conc_off_to_on_ratio": random.random() * 10,
+            "conc_noise": random.random(),
+            "conc_wrong": random.random(),
+            "conc_fuzzy": random.random(),
+            "on_to_off_dist": random.random() * 50,
+            "length": len(seq),
+            "num_folds": random.randint(1, 30),
+            "original_sequence": seq,
+        }
+        line = ",".join(map(str, row.values()))
+        found.append(
+            SimpleNamespace(
+                as_dict=lambda row=row: row, csv_line=lambda line=line: line
+            )
+        )
+    return found
+
+
+def read_csv(path: str) -> int:
+    with open(path, newline="") as f:
+        return sum(1 for _ in csv.reader(f)) - 1
+
+
+def read_jsonl(path: str) -> int:
+    with open(path) as f:
+        return sum(1 for line in f if json.loads(line))
+
+
+def read_parquet(path: str) -> int:
+    import pyarrow.parquet as pq
+
+    return int(pq.read_table(path).num_rows)
+
+
+def read_npz(path: str) -> int:
+    import numpy as np
+
+    with np.load(path) as arrays:
+        return sum(len(arrays[name]) for name in arrays.files) // len(arrays.files)
+
+
+READERS = {
+    "csv": read_csv,
+    "jsonl": read_jsonl,
+    "parquet": read_parquet,
+    "npz": read_npz,
+}
+
+
+def measure(form: str, sensors: list[Any], directory: str) -> dict[str, float]:
+    """Write and read back sensors in a format, returning its size and rates."""
+    start = time.perf_counter()
+    with writers.open_writer(os.path.join(directory, "results.csv"), form) as writer:
+        writer.write_all(sensors)
+    written = time.perf_counter() - start
+    start = time.perf_counter()
+    rows = READERS[form](writer.path)
+    read = time.perf_counter() - start
+    assert rows == len(sensors), (form, rows)
+    return {
+        "bytes": os.path.getsize(writer.path),
+        "write_per_second": len(sensors) / written,
+        "read_per_second": len(sensors) / read,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare the output formats.")
+    parser.add_argument("--sensors", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", help="also write the report as JSON")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    sensors = make_sensors(args.sensors)
+    report: dict[str, Any] = {"sensors": len(sensors)}
+    print(f"sensors: {len(sensors)}")
+    with tempfile.TemporaryDirectory() as directory:
+        for form in writers.FORMATS:
+            if writers.output_format(form) != form:
+                print(f"{form:8} skipped (pyarrow is not installed)")
+                continue
+            try:
+                report[form] = measure(form, sensors, directory)
+            except ImportError as e:
+                print(f"{form:8} skipped ({e})")
+                continue
+
+    csv_report = report["csv"]
+    for form in writers.FORMATS:
+        if form not in report:
+            continue
+        result = report[form]
+        result["size_vs_csv"] = result["bytes"] / csv_report["bytes"]
+        result["write_vs_csv"] = (
+            result["write_per_second"] / csv_report["write_per_second"]
+        )
+        result["read_vs_csv"] = (
+            result["read_per_second"] / csv_report["read_per_second"]
+        )
+        print(
+            f"{form:8} {result['bytes'] / 1e6:8.2f} MB ({result['size_vs_csv']:.2f}x)"
+            f"  write {result['write_per_second']:10.0f}/s"
+            f" ({result['write_vs_csv']:.2f}x)"
+            f"  read {result['read_per_second']:10.0f}/s"
+            f" ({result['read_vs_csv']:.2f}x)"
+        )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
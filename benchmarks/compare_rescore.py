@@ -0,0 +1,95 @@
+"""Compare designing sensors with scoring the same candidates again from a fold store.
+
+Usage (from the repository root):
+
+    python -m benchmarks.compare_rescore [--sps N] [--jobs N] [--seed N] [-o FILE]
+
+A design is run with a fold store (see fealden/foldstore.py), then its candidates
+are rescored with the default thresholds and with looser ones. Folding uses the
+selected backend: set FEALDEN_BACKEND=mfold to measure hybrid-ss-min itself. By
+default the synthetic backend is used, sleeping FEALDEN_SYNTHETIC_SLEEP seconds
+per fold (10 ms here) in place of a subprocess. Reported are the seconds each
+took, the size of the fold store per candidate, and whether rescoring with the
+default thresholds found the same sensors as the design.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import tempfile
+import time
+from typing import Any
+
+os.environ.setdefault("FEALDEN_BACKEND", "synthetic")
+os.environ.setdefault("FEALDEN_SYNTHETIC_SLEEP", "0.01")
+
+from fealden import foldstore, sensor  # noqa: E402
+from fealden.fealden import Designer  # noqa: E402
+
+REC_SEQ = "CACGTG"
+
+
+def rescore_all(store: str, thresholds: sensor.Thresholds) -> tuple[set[str], int]:
+    """Rescore every candidate of a store, returning the sequences and candidates."""
+    found: set[str] = set()
+    scored = 0
+    for path in foldstore.store_files(store):
+        for chunk in foldstore.chunks(path):
+            sensors, candidates = foldstore.rescore(chunk, thresholds)
+            found.update(sen.seq for sen in sensors)
+            scored += candidates
+    return found, scored
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare rescoring with designing.")
+    parser.add_argument("--sps", type=int, default=200)
+    parser.add_argument("--jobs", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", help="also write the report as JSON")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as store:
+        start = time.perf_counter()
+        with Designer(
+            jobs=args.jobs, master_seed=args.seed, fold_store=store
+        ) as designer:
+            designed = designer.design(REC_SEQ, 1, 50, args.sps)
+        design_seconds = time.perf_counter() - start
+        size = sum(os.path.getsize(path) for path in foldstore.store_files(store))
+
+        start = time.perf_counter()
+        found, scored = rescore_all(store, sensor.Sensor.THRESHOLDS)
+        rescore_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        loose, _ = rescore_all(store, sensor.Thresholds(16, 6))
+        loose_seconds = time.perf_counter() - start
+
+    report: dict[str, Any] = {
+        "backend": os.environ["FEALDEN_BACKEND"],
+        "candidates": scored,
+        "design_seconds": design_seconds,
+        "rescore_seconds": rescore_seconds,
+        "rescore_fraction": rescore_seconds / design_seconds,
+        "store_bytes_per_candidate": size / max(scored, 1),
+        "same_sensors": found == {sen.seq for sen in designed},
+        "loose_sensors": len(loose),
+    }
+    print(f"backend: {report['backend']}  candidates: {scored}")
+    print(f"design:  {design_seconds:8.2f} s, {len(designed)} sensors")
+    print(
+        f"rescore: {rescore_seconds:8.2f} s ({report['rescore_fraction']:.1%} of the"
+        f" design, one process), same sensors: {report['same_sensors']}"
+    )
+    print(f"loose:   {loose_seconds:8.2f} s, {len(loose)} sensors")
+    print(f"store:   {report['store_bytes_per_candidate']:8.0f} bytes per candidate")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
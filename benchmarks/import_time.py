@@ -0,0 +1,54 @@
+"""Measure the cost of importing fealden with python -X importtime.
+
+Usage (from the repository root):
+
+    python -m benchmarks.import_time [MODULE] [--repeat N] [--top N]
+
+Prints the cumulative import time of MODULE (fealden.seed by default), as the
+median of several fresh interpreters, and the slowest imports it pulls in.
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import subprocess
+import sys
+
+
+def import_times(module: str) -> dict[str, int]:
+    """Return the cumulative import time, in microseconds, of every module."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure fealden import time.")
+    parser.add_argument("module", nargs="?", default="fealden.seed")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    runs = [import_times(args.module) for _ in range(args.repeat)]
+    totals = [run[args.module] for run in runs]
+    print(f"import {args.module}: {statistics.median(totals) / 1e3:.1f} ms (median)")
+    print(f"modules imported: {len(runs[-1])}")
+    for name, micros in sorted(runs[-1].items(), key=lambda item: -item[1])[
+        : args.top
+    ]:
+        print(f"{micros / 1e3:>10.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""Standalone benchmark runner for fealden's hot paths.
+
+Usage (from the repository root):
+
+    python -m benchmarks.run [-k PATTERN] [-o results.json] [--compare old.json]
+
+Every function named bench_* in a benchmarks/bench_*.py module is a benchmark. It
+does its setup and returns a zero-argument callable, which is the code that is
+timed; setup raises benchmarks.Skip if the benchmark cannot run here. Results are
+printed and can be written as JSON, tagged with the git commit, so runs from
+different commits can be compared with --compare.
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib
+import json
+import os
+import pkgutil
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+import timeit
+from collections.abc import Callable, Iterator
+
+from . import Skip
+
+REPEAT = 5
+
+BenchmarkFactory = Callable[[], Callable[[], object]]
+
+
+def discover(pattern: str | None = None) -> Iterator[tuple[str, BenchmarkFactory]]:
+    """Yield (name, factory) for every benchmark whose name contains pattern."""
+    package_dir = os.path.dirname(os.path.abspath(__file__))
+    for module_info in sorted(pkgutil.iter_modules([package_dir]), key=str):
+        if not module_info.name.startswith("bench_"):
+            continue
+        module = importlib.import_module(f"benchmarks.{module_info.name}")
+        for attr in sorted(vars(module)):
+            if not attr.startswith("bench_"):
+                continue
+            name = f"{module_info.name}.{attr[len('bench_'):]}"
+            if pattern is None or pattern in name:
+                yield name, getattr(module, attr)
+
+
+def measure(factory: BenchmarkFactory, repeat: int = REPEAT) -> dict[str, float]:
+    """Time one benchmark, returning per-call statistics in seconds."""
+    random.seed(0)
+    func = factory()
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    per_call = [t / number for t in timer.repeat(repeat=repeat, number=number)]
+    return {
+        "min": min(per_call),
+        "median": statistics.median(per_call),
+        "mean": statistics.mean(per_call),
+        "stdev": statistics.stdev(per_call) if len(per_call) > 1 else 0.0,
+        "number": number,
+        "repeat": repeat,
+    }
+
+
+def git_commit() -> str:
+    """Return the current git commit, or 'unknown' outside of a checkout."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(results: dict[str, dict[str, float]], baseline_file: str) -> None:
+    """Print the median of each benchmark relative to a previous results file."""
+    with open(baseline_file) as f:
+        baseline = json.load(f)["benchmarks"]
+    print(f"\n{'benchmark':<50} {'old':>12} {'new':>12} {'ratio':>8}")
+    for name, stats in results.items():
+        if name not in baseline:
+            continue
+        old, new = baseline[name]["median"], stats["median"]
+        print(f"{name:<50} {old:>12.6f} {new:>12.6f} {new / old:>8.2f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the fealden benchmarks.")
+    parser.add_argument("-k", type=str, help="Only run benchmarks matching this.")
+    parser.add_argument("-o", "--output", type=str, help="Write results as JSON.")
+    parser.add_argument("--compare", type=str, help="Compare with a results file.")
+    parser.add_argument("--repeat", type=int, default=REPEAT)
+    args = parser.parse_args()
+
+    results: dict[str, dict[str, float]] = {}
+    for name, factory in discover(args.k):
+        try:
+            stats = measure(factory, args.repeat)
+        except Skip as reason:
+            print(f"{name:<50} skipped: {reason}")
+            continue
+        results[name] = stats
+        print(f"{name:<50} {stats['median'] * 1e3:>10.3f} ms/call", flush=True)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(
+                {
+                    "commit": git_commit(),
+                    "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                    "python": sys.version.split()[0],
+                    "platform": platform.platform(),
+                    "cpu_count": os.cpu_count(),
+                    "benchmarks": results,
+                },
+                f,
+                indent=2,
+            )
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Measure the fixed cost of a Fealden run, for each worker start method.
+
+Usage (from the repository root):
+
+    python -m benchmarks.startup_overhead [--runs N] [--jobs N] [--sps N]
+
+Short interactive runs are dominated by starting the worker pool: creating the
+processes, importing fealden and the backend in each, and warming up the backend.
+For every start method available, this runs Fealden --runs times in one process,
+with so few candidates (--sps) that the folding itself is negligible, and reports
+the time to the first result and the total time of each run. The first run
+includes starting the forkserver; later runs fork their workers from it. For
+comparison, the same designs are then run with one Designer, which keeps its worker
+pool between them. The synthetic backend is used unless FEALDEN_BACKEND is set.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import multiprocessing
+import os
+import statistics
+import time
+
+os.environ.setdefault("FEALDEN_BACKEND", "synthetic")
+
+from fealden.fealden import Designer, Fealden  # noqa: E402
+
+
+def run(method: str, jobs: int | None, sps: int) -> tuple[float, float]:
+    """Run Fealden once, returning the time to the first result and the total."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = Fealden(
+            "cacgtg", 1, 50, sps, True, "", False, True, jobs=jobs, start_method=method
+        )
+    return result.time_to_first_result or result.elapsed, result.elapsed
+
+
+def run_designer(
+    method: str, jobs: int | None, sps: int, runs: int
+) -> list[tuple[float, float]]:
+    """Run designs with one Designer, returning their first result and total times."""
+    times = []
+    start = time.perf_counter()
+    with Designer(jobs=jobs, start_method=method) as designer:
+        for _ in range(runs):
+            designer.design("cacgtg", 1, 50, sps)
+            total = time.perf_counter() - start
+            times.append((designer.time_to_first_result or total, total))
+            start = time.perf_counter()
+    return times
+
+
+def report(label: str, times: list[tuple[float, float]]) -> None:
+    """Print the times of the first run, and the median of the later runs."""
+    first, total = times[0]
+    later = times[1:] or times
+    print(
+        f"{label:24}   {first:7.3f} s / {total:7.3f} s"
+        f"               {statistics.median(t[0] for t in later):7.3f} s / "
+        f"{statistics.median(t[1] for t in later):7.3f} s"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure Fealden startup overhead.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--jobs", type=int, default=None)
+    parser.add_argument("--sps", type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"backend: {os.environ['FEALDEN_BACKEND']}  runs: {args.runs}")
+    print("start method               first run (first result/total)   later runs")
+    for method in multiprocessing.get_all_start_methods():
+        report(method, [run(method, args.jobs, args.sps) for _ in range(args.runs)])
+    for method in multiprocessing.get_all_start_methods():
+        times = run_designer(method, args.jobs, args.sps, args.runs)
+        report(f"{method}, one Designer", times)
+
+
+if __name__ == "__main__":
+    main()
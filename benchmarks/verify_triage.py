@@ -0,0 +1,96 @@
+"""Check that free energy triage in Sensor leaves every score, and the ranking,
+unchanged, and report the time it saves.
+
+Usage (from the repository root):
+
+    python -m benchmarks.verify_triage [--sensors N] [--seed N]
+
+Sensor sequences are generated from a seed graph and folded once with the selected
+backend (synthetic by default, whose FEALDEN_SYNTHETIC_SPREAD is widened to 8 here
+so that every triage criterion is exercised; a recorded archive can be checked with
+FEALDEN_BACKEND=replay). Each result is scored with and without triage.
+"""
+
+from __future__ import annotations
+
+import argparse
+import collections
+import os
+import random
+import sys
+import time
+from typing import Any
+
+os.environ.setdefault("FEALDEN_SYNTHETIC_SPREAD", "8")
+
+from fealden import sensor, structure  # noqa: E402
+
+from .bench_hot_paths import RESP_SEQ, make_seed  # noqa: E402
+
+
+def build_corpus(size: int) -> list[tuple[str, Any, dict[str, int]]]:
+    """Return (sequence, structure_dict, rec_seq) for size generated sensors."""
+    s = make_seed()
+    corpus: list[tuple[str, Any, dict[str, int]]] = []
+    while len(corpus) < size:
+        s.generate_node_sizes()
+        s.populate_nodes()
+        seq = "".join(s.get_sequence()).upper()
+        if len(seq) > s.max_sensor_size:
+            continue
+        rec_seq, _ = s.nodes[s.rec_node_name].get_rec_seq_data()  # type: ignore
+        corpus.append((seq.lower(), structure.RNAfolder(seq).structure_dict, rec_seq))
+    return corpus
+
+
+def score_all(
+    corpus: list[tuple[str, Any, dict[str, int]]], triage: bool
+) -> tuple[list[sensor.Sensor], float]:
+    """Score every sensor in the corpus, returning them and the time taken."""
+    start = time.perf_counter()
+    sensors = [
+        sensor.Sensor(
+            (seq, folds), rec_seq, RESP_SEQ, 1, "Graph 2", "CACGTG", False, True, triage
+        )
+        for seq, folds, rec_seq in corpus
+    ]
+    return sensors, time.perf_counter() - start
+
+
+def ranking(sensors: list[sensor.Sensor]) -> list[tuple[str, float]]:
+    """Return the accepted sensors in the order fealden reports them."""
+    accepted = [sen for sen in sensors if sen.score >= 0]
+    return [(sen.seq, sen.score) for sen in sorted(accepted, key=lambda s: s.score)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Verify Sensor free energy triage.")
+    parser.add_argument("--sensors", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    corpus = build_corpus(args.sensors)
+    full, full_time = score_all(corpus, triage=False)
+    triaged, triaged_time = score_all(corpus, triage=True)
+
+    mismatches = [
+        a.seq
+        for a, b in zip(full, triaged)
+        if (a.score, a.tag_loc) != (b.score, b.tag_loc)
+    ]
+    codes = collections.Counter(
+        sen.score if sen.score < 0 else "accepted" for sen in full
+    )
+    skipped = sum(1 for sen in triaged if not sen.folds)
+    print(f"sensors: {len(corpus)}  scores: {dict(codes)}")
+    print(f"rejected by triage before building folds: {skipped}")
+    print(f"scoring time: {full_time:.3f} s full, {triaged_time:.3f} s with triage")
+    print(f"score mismatches: {len(mismatches)}")
+    print(f"identical ranking: {ranking(full) == ranking(triaged)}")
+    if mismatches or ranking(full) != ranking(triaged):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,26 @@
+import sys
+from collections.abc import Callable
+
+from . import distributed, foldstore, merge, server, store
 from .fealden import main
 
+# fealden COMMAND ...; anything else is a design (see fealden.main())
+COMMANDS: dict[str, Callable[[list[str]], None]] = {
+    "merge": merge.main,
+    "query": store.main,
+    "rescore": foldstore.main,
+    "serve": server.main,
+    "worker": distributed.main,
+}
+
+
+def run() -> None:
+    """run() runs the command named by the first argument, or designs sensors."""
+    if len(sys.argv) > 1 and sys.argv[1] in COMMANDS:
+        COMMANDS[sys.argv[1]](sys.argv[2:])
+    else:
+        main()
+
+
 if __name__ == "__main__":
-    main()
+    run()
@@ -0,0 +1,488 @@
+"""A built-in DNA folding backend, run in-process with no external binaries.
+
+Minimum free energy structures are found with Zuker's dynamic programming algorithm
+over DNA nearest-neighbor parameters (SantaLucia & Hicks, 2004) at 37 C, with a salt
+correction for the sodium and magnesium concentrations used with hybrid-ss-min by
+the mfold backend. Suboptimal structures are enumerated the way mfold does: an
+outside pass gives the lowest free energy of any structure containing each base
+pair, and the best structure through each pair not already in an earlier structure
+is reported, if it is within the suboptimal window of the minimum.
+
+The energy model is deliberately simplified compared to UNAfold's: loop energies
+depend only on loop sizes (with a flat hairpin mismatch bonus and asymmetry penalty
+for internal loops), only Watson-Crick pairs form, and dangling ends and coaxial
+stacking are ignored. benchmarks/compare_nnfold.py measures its agreement with
+hybrid-ss-min.
+
+Needs numpy (pip install fealden[nnfold]). Each diagonal of the dynamic programming
+tables is filled with a single set of array operations.
+"""
+
+import math
+
+import numpy as np
+import numpy.typing as npt
+
+from . import structure
+from ._synthetic import COMPLEMENT, STACK_ENERGY
+
+StructureDict = list[dict[str, float | list[list[int]]]]
+FloatArray = npt.NDArray[np.float64]
+IntArray = npt.NDArray[np.intp]
+
+INF = math.inf
+EPSILON = 1e-6
+MIN_LOOP = 3
+MAX_LOOP = 30
+MAX_STRUCTURES = 100
+
+# conditions of the mfold backend (see _unafold.collect_unafold_ct)
+SODIUM = 0.15
+MAGNESIUM = 0.0005
+# equivalent sodium concentration in M, [Na+] + 120 * sqrt([Mg2+]) in mM
+SODIUM_EQUIVALENT = SODIUM + 0.120 * math.sqrt(MAGNESIUM * 1000)
+# salt correction for each nearest-neighbor stack (SantaLucia, 1998), in kcal/mol
+SALT_CORRECTION = -0.114 * math.log(SODIUM_EQUIVALENT)
+RT = 0.0019872 * 310.15
+
+# loop initiation free energies (kcal/mol, 1 M NaCl, 37 C) by loop size
+HAIRPIN_LOOP = {3: 3.5, 4: 3.5, 5: 3.3, 6: 4.0, 7: 4.2, 8: 4.3, 9: 4.5, 10: 4.6}
+HAIRPIN_LOOP.update({12: 5.0, 14: 5.1, 16: 5.3, 18: 5.5, 20: 5.7, 25: 6.1, 30: 6.3})
+BULGE_LOOP = {1: 4.0, 2: 2.9, 3: 3.1, 4: 3.2, 5: 3.3, 6: 3.5, 7: 3.7, 8: 3.9, 9: 4.1}
+BULGE_LOOP.update({10: 4.3, 12: 4.5, 14: 4.8, 16: 5.0, 18: 5.2, 20: 5.3, 25: 5.6})
+BULGE_LOOP.update({30: 5.9})
+INTERNAL_LOOP = {2: 1.0, 3: 3.2, 4: 3.6, 5: 4.0, 6: 4.4, 7: 4.6, 8: 4.8, 9: 4.9}
+INTERNAL_LOOP.update({10: 4.9, 12: 5.2, 14: 5.4, 16: 5.6, 18: 5.8, 20: 5.9, 25: 6.3})
+INTERNAL_LOOP.update({30: 6.6})
+HAIRPIN_MISMATCH = -0.8  # average terminal mismatch bonus for hairpins of 4 or more
+INTERNAL_ASYMMETRY = 0.3  # per unpaired base of difference between the two sides
+TERMINAL_AT = 0.05  # for each A-T pair closing a helix
+MULTI_CLOSE = 3.4  # multibranch loop initiation
+MULTI_BRANCH = 0.4  # per branch, including the closing pair
+MULTI_UNPAIRED = 0.0  # per unpaired base in a multibranch loop
+
+
+def loop_initiation(table: dict[int, float], size: int) -> float:
+    """Return the initiation energy of a loop, extrapolating logarithmically."""
+    if size in table:
+        return table[size]
+    known = max(k for k in table if k < size)
+    return table[known] + 2.44 * RT * math.log(size / known)
+
+
+# Every stack, bulge and internal loop shape (bases skipped on the 5' side, on the 3'
+# side), ordered by loop size, with the parts of its energy not depending on sequence
+_shapes = sorted(
+    ((l1, l2) for l1 in range(MAX_LOOP + 1) for l2 in range(MAX_LOOP + 1 - l1)),
+    key=lambda s: (s[0] + s[1], s),
+)
+SHAPE_5 = np.array([s[0] for s in _shapes], dtype=np.intp)
+SHAPE_3 = np.array([s[1] for s in _shapes], dtype=np.intp)
+SHAPE_SIZE = SHAPE_5 + SHAPE_3
+# stacks and single base bulges keep the stacking energy of their two pairs
+SHAPE_STACKS = SHAPE_SIZE <= 1
+SHAPE_ENERGY = np.array(
+    [
+        0.0
+        if l1 + l2 == 0
+        else loop_initiation(BULGE_LOOP, l1 + l2)
+        if l1 == 0 or l2 == 0
+        else loop_initiation(INTERNAL_LOOP, l1 + l2) + INTERNAL_ASYMMETRY * abs(l1 - l2)
+        for l1, l2 in _shapes
+    ]
+)
+# number of shapes with a loop size of at most s
+SHAPES_UP_TO = np.searchsorted(SHAPE_SIZE, np.arange(MAX_LOOP + 1), side="right")
+
+
+def shape_count(span: int) -> int:
+    """Return how many of the shapes fit inside a pair (i, i + span)."""
+    largest_loop = min(MAX_LOOP, span - 2 - MIN_LOOP - 1)
+    return int(SHAPES_UP_TO[largest_loop]) if largest_loop >= 0 else 0
+
+
+class RNAfolder:
+
+    """
+    RNAfolder folds a DNA sequence in-process and reports its minimum free energy
+    structure and suboptimal structures, in the same structure_dict format as the
+    other backends.
+
+    Parameters:
+
+        seq --> The sequence of nucleotides to fold
+
+    """
+
+    def __init__(self, seq: str) -> None:
+        """Initialize RNAfolder object."""
+        self.seq = seq.upper()
+        n = self.n = len(self.seq)
+        bases = np.array(list(self.seq))
+        complements = np.array([COMPLEMENT.get(b, "") for b in self.seq])
+        span = np.arange(n)[None, :] - np.arange(n)[:, None]
+        self.can_pair = (complements[:, None] == bases[None, :]) & (span > MIN_LOOP)
+        # free energy of stacking pair (i, -) on pair (k, -), for Watson-Crick pairs
+        self.stack = np.array(
+            [[STACK_ENERGY.get(a + b, 0.0) for b in self.seq] for a in self.seq]
+        ).reshape(n, n)
+        # penalty for an A-T pair (i, -) closing a helix, padded for W3[n]
+        self.terminal = np.zeros((n + 1, n + 1))
+        self.terminal[:n, :n] = np.isin(bases, ["A", "T"])[:, None] * TERMINAL_AT
+        self.hairpin_initiation = np.array(
+            [loop_initiation(HAIRPIN_LOOP, max(size, MIN_LOOP)) for size in range(n)]
+        )
+        # loop energies of each diagonal, kept by fold() for outside()
+        self.loop_energies: dict[int, FloatArray] = {}
+
+        self.fold()
+        self.outside()
+        self.structure_dict: StructureDict = self.suboptimal_structures(
+            structure.suboptimal_percent()
+        )
+        self.number_folds = len(self.structure_dict)
+
+    def loop_energy(
+        self,
+        i: IntArray | int,
+        j: IntArray | int,
+        k: IntArray | int,
+        l: IntArray | int,  # noqa: E741
+        shapes: slice | IntArray,
+    ) -> FloatArray:
+        """Return the energy of the stacks or loops closed by (i, j) and (k, l)."""
+        stacks = SHAPE_STACKS[shapes]
+        return SHAPE_ENERGY[shapes] + np.where(  # type: ignore[no-any-return]
+            stacks,
+            self.stack[i, k] + SALT_CORRECTION,
+            self.terminal[i, j] + self.terminal[k, l],
+        )
+
+    def hairpin_energy(self, i: IntArray | int, j: IntArray | int) -> FloatArray:
+        """Return the energy of the hairpins closed by (i, j)."""
+        size = np.asarray(j) - np.asarray(i) - 1
+        return self.hairpin_initiation[size] + np.where(  # type: ignore
+            size == MIN_LOOP, self.terminal[i, j], HAIRPIN_MISMATCH
+        )
+
+    def fold(self) -> None:
+        """
+        fold() fills the dynamic programming tables, one diagonal (pairs (i, i + d))
+        at a time, shortest first:
+            V[i, j]  the lowest energy of bases i..j, given i and j pair
+            WM[i, j] the lowest energy of bases i..j in a multibranch loop
+            W5[j]    the lowest energy of the first j bases
+            W3[i]    the lowest energy of bases i onwards
+        """
+        n = self.n
+        self.V = V = np.full((n + 1, n + 1), INF)
+        self.WM = WM = np.full((n + 1, n + 1), INF)
+        for d in range(MIN_LOOP + 1, n):
+            i = np.arange(n - d)
+            j = i + d
+            best = self.hairpin_energy(i, j)
+            count = shape_count(d)
+            if count:
+                k = i[:, None] + 1 + SHAPE_5[None, :count]
+                l = j[:, None] - 1 - SHAPE_3[None, :count]  # noqa: E741
+                energy = self.loop_energy(i[:, None], j[:, None], k, l, slice(0, count))
+                self.loop_energies[d] = energy
+                inner = V[k, l] + energy
+                best = np.minimum(best, inner.min(axis=1))
+            if d > 2:
+                u = i[:, None] + 2 + np.arange(d - 2)[None, :]
+                branches = (WM[i[:, None] + 1, u - 1] + WM[u, j[:, None] - 1]).min(
+                    axis=1
+                )
+                best = np.minimum(
+                    best, branches + MULTI_CLOSE + MULTI_BRANCH + self.terminal[i, j]
+                )
+            V[i, j] = np.where(self.can_pair[i, j], best, INF)
+
+            k = i[:, None] + 1 + np.arange(d)[None, :]
+            WM[i, j] = np.minimum.reduce(
+                [
+                    V[i, j] + MULTI_BRANCH + self.terminal[i, j],
+                    WM[i + 1, j] + MULTI_UNPAIRED,
+                    WM[i, j - 1] + MULTI_UNPAIRED,
+                    (WM[i[:, None], k - 1] + WM[k, j[:, None]]).min(axis=1),
+                ]
+            )
+
+        self.W5 = W5 = np.zeros(n + 1)
+        for end in range(1, n + 1):
+            i = np.arange(end)
+            total = W5[i] + V[i, end - 1] + self.terminal[i, end - 1]
+            W5[end] = min(W5[end - 1], total.min())
+        self.W3 = W3 = np.zeros(n + 1)
+        for start in range(n - 1, -1, -1):
+            j = np.arange(start, n)
+            total = V[start, j] + self.terminal[start, j] + W3[j + 1]
+            W3[start] = min(W3[start + 1], total.min())
+
+    def outside(self) -> None:
+        """
+        outside() fills Vout[i, j], the lowest energy of the rest of a structure
+        containing the pair (i, j), and WMout, its counterpart for WM, one diagonal at
+        a time, longest first; each diagonal pushes its contributions to the shorter
+        pairs and multibranch segments inside it.
+        """
+        n, V, WM = self.n, self.V, self.WM
+        self.Vout = Vout = np.full((n + 1, n + 1), INF)
+        self.WMout = WMout = np.full((n + 1, n + 1), INF)
+        Vout[:n, :n] = self.W5[:n, None] + self.terminal[:n, :n] + self.W3[None, 1:]
+        for d in range(n - 1, MIN_LOOP, -1):
+            i = np.arange(n - d)
+            j = i + d
+            outer = np.minimum(
+                Vout[i, j], WMout[i, j] + MULTI_BRANCH + self.terminal[i, j]
+            )
+            Vout[i, j] = outer = np.where(np.isfinite(V[i, j]), outer, INF)
+
+            wm_out = WMout[i, j]
+            np.minimum.at(WMout, (i + 1, j), wm_out + MULTI_UNPAIRED)
+            np.minimum.at(WMout, (i, j - 1), wm_out + MULTI_UNPAIRED)
+            k = i[:, None] + 1 + np.arange(d)[None, :]
+            ii, jj = np.broadcast_arrays(i[:, None], j[:, None])
+            np.minimum.at(WMout, (ii, k - 1), wm_out[:, None] + WM[k, jj])
+            np.minimum.at(WMout, (k, jj), wm_out[:, None] + WM[ii, k - 1])
+
+            rows = np.flatnonzero(np.isfinite(outer))
+            if rows.size == 0:
+                continue
+            i, j, outer = i[rows], j[rows], outer[rows]
+            count = shape_count(d)
+            if count:
+                k = i[:, None] + 1 + SHAPE_5[None, :count]
+                l = j[:, None] - 1 - SHAPE_3[None, :count]  # noqa: E741
+                energy = self.loop_energies[d][rows]
+                np.minimum.at(Vout, (k, l), outer[:, None] + energy)
+            if d > 2:
+                u = i[:, None] + 2 + np.arange(d - 2)[None, :]
+                closing = (outer + MULTI_CLOSE + MULTI_BRANCH + self.terminal[i, j])[
+                    :, None
+                ]
+                left, right = np.broadcast_arrays(i[:, None] + 1, j[:, None] - 1)
+                np.minimum.at(WMout, (left, u - 1), closing + WM[u, right])
+                np.minimum.at(WMout, (u, right), closing + WM[left, u - 1])
+
+    def suboptimal_structures(self, percent: float) -> StructureDict:
+        """
+        suboptimal_structures() lists the best structure through each base pair, in
+        order of free energy, for pairs within percent of the minimum free energy
+        which are not in an earlier structure.
+        """
+        mfe = float(self.W5[self.n])
+        if mfe >= 0:
+            return [{"deltaG": 0.0, "bps": [[b + 1, 0] for b in range(self.n)]}]
+        through = self.V + self.Vout
+        limit = mfe + abs(mfe) * percent / 100 + EPSILON
+        i, j = np.nonzero(through <= limit)
+        order = np.lexsort((j, i, through[i, j]))
+        covered: set[tuple[int, int]] = set()
+        found: list[tuple[float, set[tuple[int, int]]]] = []
+        for p, q in zip(i[order].tolist(), j[order].tolist()):
+            if (p, q) in covered:
+                continue
+            pairs = {(p, q)}
+            self.trace_inside(p, q, pairs)
+            self.trace_outside(p, q, pairs)
+            covered |= pairs
+            found.append((float(through[p, q]), pairs))
+            if len(found) >= MAX_STRUCTURES:
+                break
+        return [
+            {"deltaG": round(dG, 3), "bps": self.pair_table(pairs)}
+            for dG, pairs in found
+        ]
+
+    def pair_table(self, pairs: set[tuple[int, int]]) -> list[list[int]]:
+        """Return a 1-based [[base, partner], ...] table, partner 0 when unpaired."""
+        partners = [0] * self.n
+        for i, j in pairs:
+            partners[i], partners[j] = j + 1, i + 1
+        return [[base + 1, partner] for base, partner in enumerate(partners)]
+
+    def trace_inside(self, i: int, j: int, pairs: set[tuple[int, int]]) -> None:
+        """Add the pairs inside the best structure of V[i, j] to pairs."""
+        V, WM = self.V, self.WM
+        target = V[i, j] + EPSILON
+        if self.hairpin_energy(i, j) <= target:
+            return
+        count = shape_count(j - i)
+        if count:
+            k, l = i + 1 + SHAPE_5[:count], j - 1 - SHAPE_3[:count]  # noqa: E741
+            energy = V[k, l] + self.loop_energy(i, j, k, l, slice(0, count))
+            match = np.flatnonzero(energy <= target)
+            if match.size:
+                k_, l_ = int(k[match[0]]), int(l[match[0]])
+                pairs.add((k_, l_))
+                self.trace_inside(k_, l_, pairs)
+                return
+        u = np.arange(i + 2, j)
+        closing = MULTI_CLOSE + MULTI_BRANCH + self.terminal[i, j]
+        match = np.flatnonzero(WM[i + 1, u - 1] + WM[u, j - 1] + closing <= target)
+        u_ = int(u[match[0]])
+        self.trace_multi(i + 1, u_ - 1, pairs)
+        self.trace_multi(u_, j - 1, pairs)
+
+    def trace_multi(self, i: int, j: int, pairs: set[tuple[int, int]]) -> None:
+        """Add the pairs of the best structure of WM[i, j] to pairs."""
+        V, WM = self.V, self.WM
+        target = WM[i, j] + EPSILON
+        if V[i, j] + MULTI_BRANCH + self.terminal[i, j] <= target:
+            pairs.add((i, j))
+            self.trace_inside(i, j, pairs)
+        elif WM[i + 1, j] + MULTI_UNPAIRED <= target:
+            self.trace_multi(i + 1, j, pairs)
+        elif WM[i, j - 1] + MULTI_UNPAIRED <= target:
+            self.trace_multi(i, j - 1, pairs)
+        else:
+            k = np.arange(i + 1, j + 1)
+            k_ = int(k[np.flatnonzero(WM[i, k - 1] + WM[k, j] <= target)[0]])
+            self.trace_multi(i, k_ - 1, pairs)
+            self.trace_multi(k_, j, pairs)
+
+    def trace_exterior(self, start: int, end: int, pairs: set[tuple[int, int]]) -> None:
+        """Add the pairs of the best structure of bases start..end - 1 to pairs,
+        where that is the first (W5) or last (W3) part of the sequence."""
+        V, W5, W3 = self.V, self.W5, self.W3
+        if start == 0:  # W5[end]
+            while end > 0:
+                if abs(W5[end] - W5[end - 1]) <= EPSILON:
+                    end -= 1
+                    continue
+                i = np.arange(end)
+                total = W5[i] + V[i, end - 1] + self.terminal[i, end - 1]
+                i_ = int(np.flatnonzero(total <= W5[end] + EPSILON)[0])
+                pairs.add((i_, end - 1))
+                self.trace_inside(i_, end - 1, pairs)
+                end = i_
+        else:  # W3[start]
+            while start < self.n:
+                if abs(W3[start] - W3[start + 1]) <= EPSILON:
+                    start += 1
+                    continue
+                j = np.arange(start, self.n)
+                total = V[start, j] + self.terminal[start, j] + W3[j + 1]
+                j_ = int(j[np.flatnonzero(total <= W3[start] + EPSILON)[0]])
+                pairs.add((start, j_))
+                self.trace_inside(start, j_, pairs)
+                start = j_ + 1
+
+    def trace_outside(self, i: int, j: int, pairs: set[tuple[int, int]]) -> None:
+        """Add the pairs outside the best structure of Vout[i, j] to pairs."""
+        n, V, Vout = self.n, self.V, self.Vout
+        target = Vout[i, j] + EPSILON
+        if self.W5[i] + self.terminal[i, j] + self.W3[j + 1] <= target:
+            self.trace_exterior(0, i, pairs)
+            self.trace_exterior(j + 1, n, pairs)
+            return
+        shapes = np.flatnonzero((i - 1 - SHAPE_5 >= 0) & (j + 1 + SHAPE_3 < n))
+        p, q = i - 1 - SHAPE_5[shapes], j + 1 + SHAPE_3[shapes]
+        energy = Vout[p, q] + self.loop_energy(p, q, i, j, shapes)
+        match = np.flatnonzero(np.isfinite(V[p, q]) & (energy <= target))
+        if match.size:
+            p_, q_ = int(p[match[0]]), int(q[match[0]])
+            pairs.add((p_, q_))
+            self.trace_outside(p_, q_, pairs)
+            return
+        self.trace_multi_outside(i, j, pairs)
+
+    def trace_multi_outside(self, i: int, j: int, pairs: set[tuple[int, int]]) -> None:
+        """Add the pairs outside the best structure of WMout[i, j] to pairs."""
+        n, WM, WMout, Vout = self.n, self.WM, self.WMout, self.Vout
+        target = WMout[i, j] + EPSILON
+        if i > 0 and WMout[i - 1, j] + MULTI_UNPAIRED <= target:
+            self.trace_multi_outside(i - 1, j, pairs)
+            return
+        if j < n - 1 and WMout[i, j + 1] + MULTI_UNPAIRED <= target:
+            self.trace_multi_outside(i, j + 1, pairs)
+            return
+        k = np.arange(j + 1, n)
+        match = np.flatnonzero(WMout[i, k] + WM[j + 1, k] <= target)
+        if match.size:
+            k_ = int(k[match[0]])
+            self.trace_multi(j + 1, k_, pairs)
+            self.trace_multi_outside(i, k_, pairs)
+            return
+        m = np.arange(0, i)
+        match = np.flatnonzero(WMout[m, j] + WM[m, i - 1] <= target)
+        if match.size:
+            m_ = int(m[match[0]])
+            self.trace_multi(m_, i - 1, pairs)
+            self.trace_multi_outside(m_, j, pairs)
+            return
+        closing = MULTI_CLOSE + MULTI_BRANCH
+        if i > 0:  # (i, j) is the first branch of a loop closed by (i - 1, q)
+            q = np.arange(j + 2, n)
+            total = Vout[i - 1, q] + closing + self.terminal[i - 1, q]
+            total = total + WM[j + 1, q - 1]
+            match = np.flatnonzero(total <= target)
+            if match.size:
+                q_ = int(q[match[0]])
+                pairs.add((i - 1, q_))
+                self.trace_multi(j + 1, q_ - 1, pairs)
+                self.trace_outside(i - 1, q_, pairs)
+                return
+        # (i, j) holds the last branches of a loop closed by (p, j + 1)
+        p = np.arange(0, i - 1)
+        total = Vout[p, j + 1] + closing + self.terminal[p, j + 1] + WM[p + 1, i - 1]
+        p_ = int(p[np.flatnonzero(total <= target)[0]])
+        pairs.add((p_, j + 1))
+        self.trace_multi(p_ + 1, i - 1, pairs)
+        self.trace_outside(p_, j + 1, pairs)
+
+    def structure_energy(self, bps: list[list[int]]) -> float:
+        """
+        structure_energy() evaluates the free energy of a structure under the same
+        model, loop by loop, independently of the dynamic programming tables.
+
+        Parameters:
+            bps <-- a 1-based [[base, partner], ...] pair table
+        Returns:
+            a float, the free energy in kcal/mol
+        """
+        partner = [p - 1 for _, p in bps]
+
+        def branches(i: int, j: int) -> list[tuple[int, int]]:
+            found, k = [], i
+            while k <= j:
+                if partner[k] > k:
+                    found.append((k, partner[k]))
+                    k = partner[k] + 1
+                else:
+                    k += 1
+            return found
+
+        total = sum(float(self.terminal[i, j]) for i, j in branches(0, self.n - 1))
+        for i, p in enumerate(partner):
+            if p <= i:
+                continue
+            j = p
+            inner = branches(i + 1, j - 1)
+            if not inner:
+                total += float(self.hairpin_energy(i, j))
+            elif len(inner) == 1:
+                k, m = inner[0]
+                shape = np.flatnonzero((SHAPE_5 == k - i - 1) & (SHAPE_3 == j - m - 1))
+                total += float(self.loop_energy(i, j, k, m, shape)[0])
+            else:
+                unpaired = (j - i - 1) - sum(m - k + 1 for k, m in inner)
+                total += MULTI_CLOSE + MULTI_BRANCH * (len(inner) + 1)
+                total += float(self.terminal[i, j]) + MULTI_UNPAIRED * unpaired
+                total += sum(float(self.terminal[k, m]) for k, m in inner)
+        return total
+
+    def __len__(self) -> int:
+        """Return sequence length."""
+        return len(self.seq)
+
+    def __str__(self) -> str:
+        """Return string representation."""
+        return self.seq
+
+    def __repr__(self) -> str:
+        """Return representation."""
+        return f"RNAfolder instance\n sequence input: {self.seq}\n \
+            number of structures: {self.number_folds}"
@@ -0,0 +1,184 @@
+"""Record and replay folding results, so runs can be repeated without a backend.
+
+An archive is a JSON lines file (gzip compressed if the name ends in .gz), holding
+one record per folded sequence and suboptimal window, on one line:
+
+{"seq": "CATG...", "percent": 15, "elapsed": 0.012,
+ "folds": [{"deltaG": -4.1, "pairs": [0, 12, ...]}]}
+
+where pairs lists the (1-based) partner of each base, 0 if unpaired, and percent is
+structure.suboptimal_percent() when it was folded: ensemble runs fold with a
+narrower window, so their folds are kept apart. Records without a percent are taken
+as folded with structure.SUBOPTIMAL_PERCENT.
+
+Configured through the environment (or .env file):
+
+FEALDEN_REPLAY_ARCHIVE=/path/to/archive.jsonl.gz
+FEALDEN_RECORD_BACKEND=mfold        # backend wrapped when FEALDEN_BACKEND=record
+FEALDEN_REPLAY_LATENCY=0            # seconds to sleep per fold, or 'recorded'
+FEALDEN_REPLAY_MISSES=error         # 'error' or 'empty' for unrecorded sequences
+
+With FEALDEN_REPLAY_MISSES=error, an unrecorded sequence raises structure.FoldingError,
+so its candidate is counted as failed like one any other backend could not fold.
+"""
+
+import gzip
+import json
+import os
+import time
+from typing import Any, TypeVar
+
+from . import structure
+
+StructureDict = list[dict[str, float | list[list[int]]]]
+T = TypeVar("T")
+
+# archive path --> {(sequence, percent): record}, loaded once per process
+_archives: dict[str, dict[tuple[str, int], dict[str, Any]]] = {}
+
+
+def archive_path() -> str:
+    """Return the configured archive path."""
+    path = os.getenv("FEALDEN_REPLAY_ARCHIVE")
+    if not path:
+        raise LookupError("FEALDEN_REPLAY_ARCHIVE is not set")
+    return path
+
+
+def encode(
+    seq: str, structure_dict: StructureDict, elapsed: float, percent: int | None = None
+) -> dict[str, Any]:
+    """
+    Convert a backend's structure_dict into a compact archive record, folded with a
+    suboptimal window of percent (structure.suboptimal_percent() if None).
+    """
+    return {
+        "seq": seq,
+        "percent": structure.suboptimal_percent() if percent is None else percent,
+        "elapsed": round(elapsed, 6),
+        "folds": [
+            {
+                "deltaG": each["deltaG"],
+                "pairs": [pair for _, pair in each["bps"]],  # type: ignore[union-attr]
+            }
+            for each in structure_dict
+        ],
+    }
+
+
+def decode(record: dict[str, Any]) -> StructureDict:
+    """Convert an archive record back into a structure_dict."""
+    return [
+        {
+            "deltaG": each["deltaG"],
+            "bps": [[base + 1, pair] for base, pair in enumerate(each["pairs"])],
+        }
+        for each in record["folds"]
+    ]
+
+
+def load_archive(path: str) -> dict[tuple[str, int], dict[str, Any]]:
+    """
+    Read an archive into a dict keyed by sequence and suboptimal percent, caching it
+    for this process.
+    """
+    if path not in _archives:
+        records: dict[tuple[str, int], dict[str, Any]] = {}
+        if os.path.exists(path):
+            opener = gzip.open if path.endswith(".gz") else open
+            with opener(path, "rt") as f:
+                for line in f:
+                    if line.strip():
+                        record = json.loads(line)
+                        percent = record.get("percent", structure.SUBOPTIMAL_PERCENT)
+                        records[(record["seq"], percent)] = record
+        _archives[path] = records
+    return _archives[path]
+
+
+def append_record(path: str, record: dict[str, Any]) -> None:
+    """
+    append_record() adds one record to the archive. The record is written with a
+    single write() to a file opened for appending, so pool workers can record into
+    the same archive concurrently.
+    """
+    data = (json.dumps(record, separators=(",", ":")) + "\n").encode()
+    if path.endswith(".gz"):
+        data = gzip.compress(data)  # gzip readers accept concatenated members
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, data)
+    finally:
+        os.close(fd)
+
+
+class RNAfolder:
+
+    """
+    RNAfolder serves folding results from a recorded archive instead of running a
+    folding backend. Only the structure_dict interface used by Seed is provided.
+
+    Parameters:
+
+        seq --> The sequence of nucleotides to look up in the archive
+
+    """
+
+    def __init__(self, seq: str) -> None:
+        """Initialize RNAfolder object."""
+        self.seq = seq.upper()
+        key = (self.seq, structure.suboptimal_percent())
+        record = load_archive(archive_path()).get(key)
+        if record is None:
+            if os.getenv("FEALDEN_REPLAY_MISSES", "error") != "empty":
+                # a candidate which cannot be replayed fails like one which
+                # cannot be folded, rather than its whole task
+                raise structure.FoldingError(
+                    f"{self.seq} is not in the replay archive with a suboptimal"
+                    f" window of {key[1]}%"
+                )
+            record = {"seq": self.seq, "elapsed": 0.0, "folds": []}
+
+        latency = os.getenv("FEALDEN_REPLAY_LATENCY", "0")
+        delay = record["elapsed"] if latency == "recorded" else float(latency)
+        if delay > 0:
+            time.sleep(delay)
+
+        self.structure_dict: StructureDict = decode(record)
+        self.number_folds = len(self.structure_dict)
+
+    def __len__(self) -> int:
+        """Return sequence length."""
+        return len(self.seq)
+
+    def __str__(self) -> str:
+        """Return string representation."""
+        return self.seq
+
+    def __repr__(self) -> str:
+        """Return representation."""
+        return f"RNAfolder instance\n sequence input: {self.seq}\n \
+            number of structures: {self.number_folds}"
+
+
+def recording(folder: type[T]) -> type[T]:
+    """
+    recording() wraps a backend's RNAfolder class so every sequence it folds is
+    appended to the replay archive, along with the time the backend took.
+
+    Parameters:
+        folder <-- the RNAfolder class of a real backend
+    Returns:
+        a subclass of folder which records its results
+    """
+
+    class RecordingFolder(folder):  # type: ignore[valid-type,misc]
+        def __init__(self, seq: str, *args: Any) -> None:
+            start = time.perf_counter()
+            super().__init__(seq, *args)
+            elapsed = time.perf_counter() - start
+            append_record(
+                archive_path(), encode(self.seq, self.structure_dict, elapsed)
+            )
+
+    return RecordingFolder
@@ -1,7 +1,12 @@
+import functools
 import itertools
 import math
 import os
 import sys
+import tempfile
+from typing import Any
+
+from . import structure
 
 RNA_PATH = os.getenv("RNASTRUCTURE", "/home")
 
@@ -13,6 +18,18 @@ except Exception as error:
     print("RNAstructure could not be found; check config.ini")
     print(error)
 
+TEMPERATURE = 310
+# the base pairs DNA can form, and the fewest bases a hairpin loop can close over;
+# any other pair has a probability of 0 in the nearest neighbor model
+PAIRS = {("A", "T"), ("T", "A"), ("G", "C"), ("C", "G"), ("G", "T"), ("T", "G")}
+MIN_HAIRPIN_LOOP = 3
+# CT files are written to a memory-backed filesystem where one is available
+CT_DIR = "/dev/shm" if os.path.isdir("/dev/shm") else None
+
+# An RNA object holding the DNA thermodynamic parameters, read once per process by
+# RNAfolder.warm_up(); new sequences copy their parameters from it.
+_thermo_template: Any = None
+
 
 class RNAfolder:
 
@@ -33,35 +50,138 @@ class RNAfolder:
     def __init__(self, seq: str) -> None:
         """Initialize RNAfolder object."""
         self.seq = seq.upper()
-        self.RNAobj = RNAstructure.RNA.fromString(f"{self.seq}", backbone="dna")
-        self.RNAobj.SetTemperature(310)
-        self.RNAobj.FoldSingleStrand(percent=15, window=0)
+        self.RNAobj = self.new_rna(self.seq)
+        self.RNAobj.FoldSingleStrand(percent=structure.suboptimal_percent(), window=0)
         self.number_folds = self.RNAobj.GetStructureNumber()
-        self.point_list = [
-            self.get_coordinate_list(structure_num=i + 1)
-            for i in range(self.number_folds)
-        ]
         self.structure_dict: list[dict[str, float | list[list[int]]]] = [
             {} for _ in range(self.number_folds)
         ]
         self.make_fold_dict()
 
+    @classmethod
+    def warm_up(cls) -> None:
+        """
+        warm_up() reads the DNA thermodynamic parameter tables from DATAPATH once for
+        this process, so that each new sequence copies them from memory instead of
+        reading them again. It is run by the initializer of each pool worker. If this
+        build of RNAstructure cannot copy parameters between RNA objects, every
+        sequence keeps loading its own.
+        """
+        global _thermo_template
+        if _thermo_template is not None:
+            return
+        try:
+            template = RNAstructure.RNA.fromString("GGGAAACCC", backbone="dna")
+            template.SetTemperature(TEMPERATURE)
+            template.FoldSingleStrand(percent=15, window=0)  # reads the tables
+            # check that sequences can be built from the copied parameters
+            RNAstructure.RNA("A", RNAstructure.SEQUENCE_STRING, template)
+        except Exception as error:
+            print("RNAstructure parameters could not be preloaded")
+            print(error)
+            return
+        _thermo_template = template
+
+    @staticmethod
+    def new_rna(seq: str) -> Any:
+        """Return a new RNAstructure DNA object for seq, set to TEMPERATURE."""
+        if _thermo_template is not None:
+            # parameters, already at TEMPERATURE, are copied from the template
+            return RNAstructure.RNA(seq, RNAstructure.SEQUENCE_STRING, _thermo_template)
+        rna = RNAstructure.RNA.fromString(f"{seq}", backbone="dna")
+        rna.SetTemperature(TEMPERATURE)
+        return rna
+
     def make_fold_dict(self) -> None:
         """
         make_fold_dict populates the list of dictionaries
         (self.structure_dict) defined in __init__
         """
         seq_len = len(self.RNAobj)
+        pair_tables = self.read_ct_pairs(self.RNAobj, seq_len, self.number_folds)
         for i, each_dict in enumerate(self.structure_dict):
             each_dict["deltaG"] = self.RNAobj.GetFreeEnergy(i + 1)
-            pairs_list: list[list[int]] = []
-            for base in range(seq_len):
-                pairs_list.append(
-                    [base + 1, self.RNAobj.GetPair(base + 1, structurenumber=i + 1)]
-                )
-            each_dict["bps"] = pairs_list
+            each_dict["bps"] = [
+                [base + 1, pair] for base, pair in enumerate(pair_tables[i])
+            ]
             # dict of deltaG's with corresponding folding list for each fold
 
+    def unpaired_probabilities(self) -> list[float]:
+        """
+        unpaired_probabilities() returns the probability that each base is unpaired,
+        from the base pair probabilities of RNAstructure's partition function. Only
+        the pairs which can form (see PAIRS) are read, as each is a call through
+        SWIG, about a third of every pair of bases.
+        """
+        self.RNAobj.PartitionFunction()
+        paired = [0.0] * len(self.seq)
+        for i, j in self.possible_pairs(self.seq):
+            probability = self.RNAobj.GetPairProbability(i + 1, j + 1)
+            paired[i] += probability
+            paired[j] += probability
+        return [min(1.0, max(0.0, 1.0 - p)) for p in paired]
+
+    @staticmethod
+    def possible_pairs(seq: str) -> list[tuple[int, int]]:
+        """
+        possible_pairs() returns the (0-based) positions i < j of the bases of seq
+        which can pair: complementary or G-T, with a hairpin loop between them.
+        """
+        return [
+            (i, j)
+            for i, first in enumerate(seq)
+            for j in range(i + MIN_HAIRPIN_LOOP + 1, len(seq))
+            if (first, seq[j]) in PAIRS
+        ]
+
+    @staticmethod
+    def read_ct_pairs(rna: Any, length: int, count: int) -> list[list[int]]:
+        """
+        read_ct_pairs() returns the pairing partner of every base in every structure
+        of an RNAstructure object. All structures are written to one CT file, which is
+        parsed in a single pass; this replaces a GetPair() call, and its round-trip
+        through SWIG, for each base of each structure.
+
+        Parameters:
+            rna    <-- an RNAstructure RNA object, after folding
+            length <-- an integer, the length of the sequence
+            count  <-- an integer, the number of structures
+        Returns:
+            a list with one list of partners (0 if unpaired) per structure
+        """
+        if length == 0 or count == 0:
+            return [[] for _ in range(count)]
+        with tempfile.TemporaryDirectory(dir=CT_DIR) as tmpdirname:
+            ct_file = os.path.join(tmpdirname, "structures.ct")
+            rna.WriteCt(ct_file)
+            with open(ct_file) as f:
+                ct_output = f.read()
+        return RNAfolder.parse_ct_pairs(ct_output, length)
+
+    @staticmethod
+    def parse_ct_pairs(ct_output: str, length: int) -> list[list[int]]:
+        """
+        parse_ct_pairs() reads the pairing partners from CT file contents, in which
+        each structure is a header line followed by one line per base.
+        """
+        lines = [line for line in ct_output.split("\n") if line.strip()]
+        return [
+            [int(line.split()[4]) for line in lines[start + 1 : start + 1 + length]]
+            for start in range(0, len(lines), length + 1)
+        ]
+
+    @functools.cached_property
+    def point_list(self) -> list[list[list[int]]]:
+        """
+        point_list holds the drawing coordinates of every base in every structure.
+        They are only used for tag distances by dist_from_index(), so they are
+        computed the first time they are needed rather than for every sequence.
+        """
+        return [
+            self.get_coordinate_list(structure_num=i + 1)
+            for i in range(self.number_folds)
+        ]
+
     def get_coordinate_list(
         self, h: int = 10, w: int = 10, structure_num: int = 1
     ) -> list[list[int]]:
@@ -0,0 +1,180 @@
+"""A synthetic folding backend for load testing, needing no external binaries.
+
+Folds are derived from the sequence alone. Perfectly complementary stems are placed
+greedily, longest first, which recovers the structure designed from the seed graph;
+random suboptimal folds are built by placing the stems in a random order. Every fold
+is a valid, nested pair table with a loop of at least three bases in each hairpin.
+Free energies use DNA nearest-neighbor stacking energies (SantaLucia, 2004) plus a
+loop penalty per stem, and the suboptimal folds are scaled into the configured
+spread above the minimum free energy. The same sequence always folds the same way.
+
+Configured through the environment (or .env file):
+
+FEALDEN_SYNTHETIC_FOLDS=4       # maximum number of folds returned per sequence
+FEALDEN_SYNTHETIC_SPREAD=2.0    # most kcal/mol between the first and last fold
+FEALDEN_SYNTHETIC_SLEEP=0       # seconds to sleep per call, to mimic a subprocess
+FEALDEN_SYNTHETIC_BURN=0        # seconds of CPU to burn per call
+FEALDEN_SYNTHETIC_SEED=0        # changes the random suboptimal folds
+"""
+
+import os
+import random
+import time
+
+StructureDict = list[dict[str, float | list[list[int]]]]
+Stem = tuple[int, int, int]  # (5' base, 3' base, length), 0-based
+
+COMPLEMENT = {"A": "T", "T": "A", "C": "G", "G": "C"}
+MIN_STEM = 3
+MIN_LOOP = 3
+LOOP_PENALTY = 3.5
+
+# DNA Watson-Crick nearest-neighbor free energies at 37 C, by 5'-->3' dinucleotide
+STACK_ENERGY = {
+    "AA": -1.00,
+    "TT": -1.00,
+    "AT": -0.88,
+    "TA": -0.58,
+    "CA": -1.45,
+    "TG": -1.45,
+    "GT": -1.44,
+    "AC": -1.44,
+    "CT": -1.28,
+    "AG": -1.28,
+    "GA": -1.30,
+    "TC": -1.30,
+    "CG": -2.17,
+    "GC": -2.24,
+    "GG": -1.84,
+    "CC": -1.84,
+}
+
+
+def setting(name: str, default: float) -> float:
+    """Return the numeric FEALDEN_SYNTHETIC_<name> setting."""
+    return float(os.getenv(f"FEALDEN_SYNTHETIC_{name}", default))
+
+
+def candidate_stems(seq: str) -> list[Stem]:
+    """Return every maximal complementary stem, longest first."""
+    n = len(seq)
+    # run[i][j] is the length of the complementary stem closed by bases i and j
+    run = [[0] * (n + 1) for _ in range(n + 1)]
+    for i in range(n - 1, -1, -1):
+        for j in range(i + MIN_LOOP + 1, n):
+            if COMPLEMENT.get(seq[i]) == seq[j]:
+                run[i][j] = run[i + 1][j - 1] + 1 if j - i > MIN_LOOP + 2 else 1
+    stems = [
+        (i, j, run[i][j])
+        for i in range(n)
+        for j in range(i + MIN_LOOP + 1, n)
+        if run[i][j] >= MIN_STEM and (i == 0 or j == n - 1 or not run[i - 1][j + 1])
+    ]
+    return sorted(stems, key=lambda s: (-s[2], s[0], -s[1]))
+
+
+def place_stems(n: int, stems: list[Stem]) -> list[Stem]:
+    """Place stems in the order given, skipping any that clash with those placed."""
+    paired = [False] * n
+    pairs: list[tuple[int, int]] = []
+    placed: list[Stem] = []
+    for i, j, length in stems:
+        if any(paired[i + k] or paired[j - k] for k in range(length)):
+            continue
+        if any(i < c < j < d or c < i < d < j for c, d in pairs):
+            continue
+        placed.append((i, j, length))
+        for k in range(length):
+            paired[i + k] = paired[j - k] = True
+            pairs.append((i + k, j - k))
+    return placed
+
+
+def pair_table(n: int, stems: list[Stem]) -> list[list[int]]:
+    """Return a 1-based [[base, partner], ...] table, partner 0 when unpaired."""
+    partners = [0] * n
+    for i, j, length in stems:
+        for k in range(length):
+            partners[i + k] = j - k + 1
+            partners[j - k] = i + k + 1
+    return [[base + 1, partner] for base, partner in enumerate(partners)]
+
+
+def energy(seq: str, stems: list[Stem]) -> float:
+    """Return the stacking energy of the stems, plus a loop penalty for each."""
+    return sum(
+        LOOP_PENALTY
+        + sum(STACK_ENERGY[seq[i + k : i + k + 2]] for k in range(length - 1))
+        for i, _, length in stems
+    )
+
+
+def burn(seconds: float) -> None:
+    """Keep the CPU busy for the given time."""
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+class RNAfolder:
+
+    """
+    RNAfolder generates plausible, deterministic folding results for a sequence, in
+    the same structure_dict format as the real backends.
+
+    Parameters:
+
+        seq --> The sequence of nucleotides to fold
+
+    """
+
+    def __init__(self, seq: str) -> None:
+        """Initialize RNAfolder object."""
+        self.seq = seq.upper()
+        max_folds = int(setting("FOLDS", 4))
+        spread = setting("SPREAD", 2.0)
+        rng = random.Random(f"{setting('SEED', 0)}:{self.seq}")
+
+        n = len(self.seq)
+        candidates = candidate_stems(self.seq)
+        folds: dict[tuple[Stem, ...], float] = {}
+        designed = place_stems(n, candidates)
+        folds[tuple(sorted(designed))] = energy(self.seq, designed)
+        for _ in range(4 * max_folds):
+            if len(folds) >= max_folds or not candidates:
+                break
+            shuffled = rng.sample(candidates, len(candidates))
+            stems = place_stems(n, shuffled[: rng.randint(1, len(shuffled))])
+            folds[tuple(sorted(stems))] = energy(self.seq, stems)
+
+        ranked = sorted(folds.items(), key=lambda item: item[1])[:max_folds]
+        lowest, highest = ranked[0][1], ranked[-1][1]
+        scale = min(1.0, spread / (highest - lowest)) if highest > lowest else 1.0
+        self.structure_dict: StructureDict = [
+            {
+                "deltaG": round(lowest + (dG - lowest) * scale, 3),
+                "bps": pair_table(n, list(stems)),
+            }
+            for stems, dG in ranked
+        ]
+        self.number_folds = len(self.structure_dict)
+
+        sleep = setting("SLEEP", 0)
+        if sleep > 0:
+            time.sleep(sleep)
+        cpu = setting("BURN", 0)
+        if cpu > 0:
+            burn(cpu)
+
+    def __len__(self) -> int:
+        """Return sequence length."""
+        return len(self.seq)
+
+    def __str__(self) -> str:
+        """Return string representation."""
+        return self.seq
+
+    def __repr__(self) -> str:
+        """Return representation."""
+        return f"RNAfolder instance\n sequence input: {self.seq}\n \
+            number of structures: {self.number_folds}"
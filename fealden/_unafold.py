@@ -1,11 +1,108 @@
+import asyncio
+import functools
 import itertools
 import math
 import os
 import re
+import signal
 import subprocess
 import tempfile
 from collections.abc import Iterator
 
+from . import structure
+
+
+def run_program(command: list[str], input_text: str, cwd: str) -> None:
+    """
+    run_program() runs an UNAfold or mfold program, raising structure.FoldingError if
+    it cannot be started, runs longer than structure.fold_timeout(), or fails.
+
+    Parameters:
+        command    <-- a list of strings, the program and its arguments
+        input_text <-- a string, written to the standard input of the program
+        cwd        <-- a string, the directory to run the program in
+    Returns:
+        Nothing
+    """
+    try:
+        process = subprocess.Popen(
+            command,
+            text=True,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            cwd=cwd,
+            start_new_session=True,
+        )
+    except OSError as e:
+        raise structure.FoldingError(f"Could not start {command[0]}: {e}") from e
+    timeout = structure.fold_timeout()
+    try:
+        _, errors = process.communicate(input=input_text, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        kill_session(process.pid)
+        process.communicate()
+        raise structure.FoldingError(
+            f"{command[0]} timed out after {timeout} s"
+        ) from None
+    check_returncode(command, process.returncode, errors)
+
+
+async def run_program_async(command: list[str], input_text: str, cwd: str) -> None:
+    """run_program() for an event loop, with asyncio subprocesses."""
+    try:
+        process = await asyncio.create_subprocess_exec(
+            *command,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            cwd=cwd,
+            start_new_session=True,
+        )
+    except OSError as e:
+        raise structure.FoldingError(f"Could not start {command[0]}: {e}") from e
+    timeout = structure.fold_timeout()
+    try:
+        _, errors = await asyncio.wait_for(
+            process.communicate(input=input_text.encode()), timeout
+        )
+    except asyncio.TimeoutError:
+        kill_session(process.pid)
+        await process.communicate()
+        raise structure.FoldingError(
+            f"{command[0]} timed out after {timeout} s"
+        ) from None
+    check_returncode(command, process.returncode, errors.decode(errors="replace"))
+
+
+def kill_session(pid: int) -> None:
+    """Kill a program started by run_program(), and any programs it started."""
+    try:
+        os.killpg(pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+
+
+def check_returncode(command: list[str], returncode: int | None, errors: str) -> None:
+    """Raise structure.FoldingError if a program exited with an error."""
+    if returncode != 0:
+        # the end of the standard error is where programs report what went wrong
+        message = errors.strip()[-500:]
+        raise structure.FoldingError(
+            f"{command[0]} exited with status {returncode}: {message}"
+        )
+
+
+def read_output(path: str, command: list[str], encoding: str | None = None) -> str:
+    """Return the contents of a file a program wrote, raising FoldingError if none."""
+    try:
+        with open(path, encoding=encoding) as f:
+            return f.read()
+    except FileNotFoundError:
+        raise structure.FoldingError(
+            f"{command[0]} wrote no {os.path.basename(path)}"
+        ) from None
+
 
 class RNAfolder:
 
@@ -23,20 +120,40 @@ class RNAfolder:
 
     """
 
-    def __init__(self, seq: str) -> None:
-        """Initialize RNAfolder object."""
+    def __init__(self, seq: str, ct_output: str | None = None) -> None:
+        """Initialize RNAfolder object, running hybrid-ss-min unless its output
+        (ct_output) has already been collected."""
         self.seq = seq.upper()
-        self.ct_output = self.collect_unafold_ct(self.seq)
+        if ct_output is None:
+            ct_output = self.collect_unafold_ct(self.seq)
+        self.ct_output = ct_output
         self.number_folds = self.ct_output.count("dG")
-        self.point_list = [
-            self.get_coordinate_list(structure_num=i + 1)
-            for i in range(self.number_folds)
-        ]
         self.structure_dict: list[dict[str, float | list[list[int]]]] = [
             {} for _ in range(self.number_folds)
         ]
         self.make_fold_dict()
 
+    @classmethod
+    async def fold_async(cls, seq: str) -> "RNAfolder":
+        """
+        fold_async() folds a sequence like RNAfolder(seq), but runs hybrid-ss-min
+        with asyncio, so an event loop can keep several folds in flight at once.
+        """
+        return cls(seq, await cls.collect_unafold_ct_async(seq.upper()))
+
+    @staticmethod
+    def hybrid_ss_min_command() -> list[str]:
+        """Return the hybrid-ss-min command line, reading the sequence from stdin."""
+        hybrid_ss_min_location = os.getenv("HYBRID_SS_MIN")
+        return [
+            f"{hybrid_ss_min_location}",
+            f"--mfold={structure.suboptimal_percent()}",
+            "--sodium=0.15",
+            "--magnesium=0.0005",
+            "--NA=DNA",
+            "/dev/stdin",
+        ]
+
     @staticmethod
     def collect_unafold_ct(sequence: str) -> str:
         """Python wrapper to call UNAfold hybrid-ss-min without reading or writing files
@@ -44,31 +161,60 @@ class RNAfolder:
         Uses modified hybrid-ss-min that prints .ct file contents to stdout."""
 
         with tempfile.TemporaryDirectory() as tmpdirname:
-            hybrid_ss_min_location = os.getenv("HYBRID_SS_MIN")
+            command = RNAfolder.hybrid_ss_min_command()
+            run_program(command, sequence, tmpdirname)
+            return read_output(f"{tmpdirname}/stdin.ct", command)
 
-            command = [
-                f"{hybrid_ss_min_location}",
-                "--mfold=15",
-                "--sodium=0.15",
-                "--magnesium=0.0005",
-                "--NA=DNA",
-                "/dev/stdin",
-            ]
-            hybrid_process = subprocess.Popen(
-                command,
-                text=True,
-                stdin=subprocess.PIPE,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                cwd=tmpdirname,
-            )
+    @staticmethod
+    async def collect_unafold_ct_async(sequence: str) -> str:
+        """collect_unafold_ct() for an event loop, with asyncio subprocesses."""
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            command = RNAfolder.hybrid_ss_min_command()
+            await run_program_async(command, sequence, tmpdirname)
+            return read_output(f"{tmpdirname}/stdin.ct", command)
 
-            _ = hybrid_process.communicate(input=f"{sequence}")[0]
+    def unpaired_probabilities(self) -> list[float]:
+        """
+        unpaired_probabilities() returns the probability that each base is unpaired,
+        from the base pair probabilities written by UNAfold's partition function
+        program, hybrid-ss (HYBRID_SS, or HYBRID_SS_MIN without the "-min").
+        """
+        hybrid_ss_location = os.getenv("HYBRID_SS") or re.sub(
+            r"-min$", "", os.getenv("HYBRID_SS_MIN", "hybrid-ss-min")
+        )
+        command = [
+            f"{hybrid_ss_location}",
+            "--sodium=0.15",
+            "--magnesium=0.0005",
+            "--NA=DNA",
+            "/dev/stdin",
+        ]
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            run_program(command, self.seq, tmpdirname)
+            plot_files = sorted(
+                name for name in os.listdir(tmpdirname) if name.endswith(".plot")
+            )
+            plot_output = read_output(
+                os.path.join(tmpdirname, (plot_files or ["stdin.plot"])[0]), command
+            )
 
-            with open(f"{tmpdirname}/stdin.ct") as f:
-                hybrid_output = f.read()
+        return self.parse_plot_unpaired(plot_output, len(self.seq))
 
-        return hybrid_output
+    @staticmethod
+    def parse_plot_unpaired(plot_output: str, length: int) -> list[float]:
+        """
+        parse_plot_unpaired() reads the "i j probability" lines of a hybrid-ss .plot
+        file and returns the probability that each base is unpaired.
+        """
+        paired = [0.0] * length
+        for line in plot_output.split("\n"):
+            fields = line.split()
+            if len(fields) < 3 or not fields[0].isdigit():
+                continue  # header
+            i, j, probability = int(fields[0]), int(fields[1]), float(fields[2])
+            paired[i - 1] += probability
+            paired[j - 1] += probability
+        return [min(1.0, max(0.0, 1.0 - p)) for p in paired]
 
     @staticmethod
     def parse_ct_to_folds(sequence: str) -> tuple[list[str], list[list[str]]]:
@@ -122,6 +268,18 @@ class RNAfolder:
             each_dict["bps"] = pairs_list
             # dict of deltaG's with corresponding folding list for each fold
 
+    @functools.cached_property
+    def point_list(self) -> list[list[list[int]]]:
+        """
+        point_list holds the drawing coordinates of every base in every structure.
+        Each structure needs a sir_graph run, and they are only used for tag
+        distances by dist_from_index(), so they are computed when first needed.
+        """
+        return [
+            self.get_coordinate_list(structure_num=i + 1)
+            for i in range(self.number_folds)
+        ]
+
     def get_coordinate_list(self, structure_num: int = 1) -> list[list[int]]:
         headings, list_lines = self.parse_ct_to_folds(self.ct_output)
 
@@ -129,7 +287,7 @@ class RNAfolder:
             [headings[structure_num - 1], "\n".join(list_lines[structure_num - 1])]
         )
 
-        def call_sir_graph(tmpdirname: str, ct_output: str) -> None:
+        def call_sir_graph(tmpdirname: str, ct_output: str) -> str:
             sir_graph_location = os.getenv("SIR_GRAPH")
             command = [
                 f"{sir_graph_location}",
@@ -138,22 +296,11 @@ class RNAfolder:
                 f"{tmpdirname}/new.ps",
                 "/dev/stdin",
             ]
-
-            sir_graph_process = subprocess.Popen(
-                command,
-                text=True,
-                stdin=subprocess.PIPE,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                cwd=tmpdirname,
-            )
-
-            _ = sir_graph_process.communicate(input=f"{ct_output}")
+            run_program(command, ct_output, tmpdirname)
+            return read_output(f"{tmpdirname}/new.ps", command, "ISO-8859-1")
 
         with tempfile.TemporaryDirectory() as tmpdirname:
-            call_sir_graph(tmpdirname, sir_graph_input)
-            with open(f"{tmpdirname}/new.ps", encoding="ISO-8859-1") as f:
-                contents = f.read()
+            contents = call_sir_graph(tmpdirname, sir_graph_input)
 
         raw_pattern = r"(\d*\.\d*) (\d*\.\d*) m\n\(\w\)"
 
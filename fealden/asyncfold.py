@@ -0,0 +1,213 @@
+"""Fold candidate sensors concurrently from an asyncio event loop.
+
+Folding with the mfold backend is bound by the hybrid-ss-min subprocess, so a worker
+folding one sequence at a time sits idle while it runs. The drivers here keep up to
+a given number of folds in flight, and score each sensor as soon as its fold
+completes, in a thread, while the others are still running.
+"""
+
+import asyncio
+import time
+from collections.abc import Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from . import foldstore, progress, seed, sensor, structure
+
+
+class FoldStats:
+
+    """
+    FoldStats records how many folds were run and how long each was in flight, to
+    report the concurrency and throughput achieved.
+    """
+
+    def __init__(self) -> None:
+        """Initialize FoldStats object, starting its clock."""
+        self.folds = 0
+        self.busy = 0.0  # seconds of folding, summed over all folds
+        self.in_flight = 0
+        self.peak = 0
+        self.start = time.perf_counter()
+        self.end: float | None = None
+
+    @property
+    def elapsed(self) -> float:
+        """Return the seconds since the clock started, until it was stopped."""
+        return (self.end or time.perf_counter()) - self.start
+
+    @property
+    def concurrency(self) -> float:
+        """Return the average number of folds in flight."""
+        return self.busy / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def throughput(self) -> float:
+        """Return the folds completed per second."""
+        return self.folds / self.elapsed if self.elapsed > 0 else 0.0
+
+    def summary(self) -> str:
+        """Return a one line report of the folds run."""
+        return (
+            f"Folded {self.folds} sequences in {self.elapsed:.2f} s: "
+            f"{self.throughput:.1f} folds/s, {self.concurrency:.2f} in flight on "
+            f"average (peak {self.peak})"
+        )
+
+
+async def fold(seq: str, limiter: asyncio.Semaphore, stats: FoldStats) -> Any:
+    """Fold a sequence once fewer than the limit of folds are in flight."""
+    async with limiter:
+        stats.in_flight += 1
+        stats.peak = max(stats.peak, stats.in_flight)
+        start = time.perf_counter()
+        try:
+            return await structure.fold_async(seq)
+        finally:
+            stats.busy += time.perf_counter() - start
+            stats.in_flight -= 1
+            stats.folds += 1
+
+
+async def fold_and_score(
+    sensor_seed: seed.Seed,
+    design: tuple[str, list[dict[str, int]]],
+    rec_seq: str,
+    fixed: bool,
+    thiol: bool,
+    limiter: asyncio.Semaphore,
+    stats: FoldStats,
+) -> sensor.Sensor:
+    """
+    fold_and_score() folds a design of sensor_seed.design_sequence() and scores it
+    as a Sensor. Scoring is run in the loop's default executor, as it may itself
+    run the backend (for the partition function of an ensemble score) and would
+    otherwise hold up the other folds in flight.
+    """
+    seq, rec_data = design
+    folder = await fold(seq, limiter, stats)
+    return await asyncio.get_running_loop().run_in_executor(
+        None, sensor_seed.make_sensor, seq, rec_data, folder, rec_seq, fixed, thiol
+    )
+
+
+async def generate_sensors(
+    sensor_seed: seed.Seed,
+    rec_seq: str,
+    num_poss_sen: float,
+    fixed: bool,
+    thiol: bool,
+    concurrency: int,
+    limiter: asyncio.Semaphore,
+    stats: FoldStats,
+) -> sensor.SensorList:
+    """
+    generate_sensors() is the event loop counterpart of fealden.generate_sensor().
+    Sequences are designed as slots free up under the limiter, and each is scored as
+    soon as it has folded (see fold_and_score()). Candidates which cannot be folded
+    are counted in the list.
+
+    Parameters:
+        sensor_seed  <-- an object of the 'Seed' class, the seed graph for the sensor
+        rec_seq      <-- a String, the recognition sequence
+        num_poss_sen <-- an integer, the number of possible sensors to be generated
+        fixed        <-- bool, is methylene blue fixed at 3' terminus
+        concurrency  <-- an integer, the most folds to have in flight
+        limiter      <-- an asyncio.Semaphore, bounding the folds in flight, which
+                         may be shared with other seeds
+        stats        <-- a FoldStats object, updated with every fold
+    Returns:
+        a SensorList of the valid sensors
+    """
+    sensors = sensor.SensorList()
+    pending: set[asyncio.Task[sensor.Sensor]] = set()
+    version = 0
+    while version < num_poss_sen or pending:
+        # stay one design ahead of the limiter, so a free slot is filled at once
+        while version < num_poss_sen and len(pending) <= concurrency:
+            version += 1
+            design = sensor_seed.design_sequence()
+            if design is None:
+                progress.count(generated=1)
+                continue
+            pending.add(
+                asyncio.create_task(
+                    fold_and_score(
+                        sensor_seed, design, rec_seq, fixed, thiol, limiter, stats
+                    )
+                )
+            )
+        if not pending:
+            continue
+        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            try:
+                sen = task.result()
+            except structure.FoldingError as e:
+                sensors.add_failure(e)
+                progress.count(generated=1)
+                continue
+            # only keep good sensors
+            if sen.score >= 0:
+                sensors.append(sen)
+                progress.count(generated=1, folded=1, accepted=1, score=sen.score)
+            else:
+                sensors.add_rejection(sen.score)
+                progress.count(generated=1, folded=1)
+    progress.beat()
+    foldstore.flush()
+    return sensors
+
+
+async def generate_all(
+    tasks: Iterable[tuple[seed.Seed, str, float, int, bool, bool]],
+    concurrency: int,
+    stats: FoldStats | None = None,
+    task_done: Callable[[Any, sensor.SensorList], None] | None = None,
+) -> sensor.SensorList:
+    """
+    generate_all() runs the tasks of a Fealden run (the arguments of
+    fealden.generate_sensor()) in one event loop, sharing a limit of concurrency
+    folds in flight between them. task_done, if given, is called with each task
+    and its sensors as soon as it completes.
+    """
+    stats = stats or FoldStats()
+    limiter = asyncio.Semaphore(concurrency)
+    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(concurrency))
+
+    async def run(task: tuple[seed.Seed, str, float, int, bool, bool]) -> Any:
+        (s, rec_seq, num, core, fixed, thiol) = task
+        # with a master seed, each task designs from the random numbers of its chunk
+        sensors = await generate_sensors(
+            s.for_task(core), rec_seq, num, fixed, thiol, concurrency, limiter, stats
+        )
+        if task_done is not None:
+            task_done(task, sensors)
+        return sensors
+
+    results = await asyncio.gather(*(run(task) for task in tasks))
+    stats.end = time.perf_counter()
+    sensors = sensor.SensorList()
+    for each in results:
+        sensors.merge(each)
+    return sensors
+
+
+def generate_sensor(
+    sensor_seed: seed.Seed,
+    rec_seq: str,
+    num_poss_sen: float,
+    core: int,
+    fixed: bool,
+    thiol: bool,
+    concurrency: int,
+) -> sensor.SensorList:
+    """
+    generate_sensor() is a drop-in pool task for fealden.generate_sensor(), which
+    keeps up to concurrency folds in flight in the worker.
+    """
+    return asyncio.run(
+        generate_all(
+            [(sensor_seed, rec_seq, num_poss_sen, core, fixed, thiol)], concurrency
+        )
+    )
@@ -0,0 +1,268 @@
+"""Read the targets of a batch run, and write and report their results.
+
+A batch file lists one recognition sequence per target, as CSV or FASTA. In CSV, the
+header names the columns, of which only the sequence is required:
+
+    name,sequence,binding_state,max_size,sps,fixed,thiol
+    myc,CACGTG,1,50,1000,,
+    tata,TATATAA,SS,,,,
+
+In FASTA, the options follow the name on the header line:
+
+    >myc binding_state=1 sps=1000
+    CACGTG
+
+The binding state is 0 or 1, or DS or SS (see fealden.BINDING_STATE). Options left
+out take the values given on the command line.
+"""
+
+import csv
+import os
+import re
+from collections.abc import Callable, Iterable
+from typing import NamedTuple
+
+from . import sensor, writers
+
+# binding states, as numbers or as in fealden.BINDING_STATE
+STATES = {"0": 0, "1": 1, "DS": 0, "SS": 1}
+# column or option name --> Target field
+FIELDS = {
+    "name": "name",
+    "sequence": "rec_seq",
+    "seq": "rec_seq",
+    "rec_seq": "rec_seq",
+    "recseq": "rec_seq",
+    "binding_state": "binding_state",
+    "bindingstate": "binding_state",
+    "state": "binding_state",
+    "max_size": "max_sensor_size",
+    "ms": "max_sensor_size",
+    "sps": "min_sens_per_seed",
+    "sens_per_seed": "min_sens_per_seed",
+    "fixed": "fixed",
+    "thiol": "thiol",
+    "thiol3": "thiol",
+}
+
+
+class Target(NamedTuple):
+    """A recognition sequence to design sensors for, with its options."""
+
+    name: str
+    rec_seq: str
+    binding_state: int
+    max_sensor_size: int = 50
+    min_sens_per_seed: int = 500
+    fixed: bool = False
+    thiol: bool = True
+
+    def design_args(self) -> tuple[str, int, int, int, bool, bool]:
+        """Return the arguments of Designer.design() for this target."""
+        return (
+            self.rec_seq,
+            self.binding_state,
+            self.max_sensor_size,
+            self.min_sens_per_seed,
+            self.fixed,
+            self.thiol,
+        )
+
+
+def parse_bool(value: str) -> bool:
+    """Return a yes or no option (1, true, yes, y, or 0, false, no, n) as a bool."""
+    if value.strip().lower() in ("1", "true", "yes", "y"):
+        return True
+    if value.strip().lower() in ("0", "false", "no", "n"):
+        return False
+    raise ValueError(f"Expected yes or no, not {value}")
+
+
+def make_target(options: dict[str, str], defaults: Target, where: str) -> Target:
+    """
+    make_target() builds a Target from the options of one row or record of a batch
+    file, taking the options it leaves out from defaults.
+
+    Parameters:
+        options  <-- a dictionary, option or column name --> value
+        defaults <-- a Target, with the values of options left out
+        where    <-- a string, the line of the file, for error messages
+    Returns:
+        a Target
+    """
+    values: dict[str, str] = {}
+    for key, value in options.items():
+        if key is None or not isinstance(value, (str, type(None))):
+            # csv.DictReader keeps the fields of a row beyond the header under None
+            raise ValueError(f"{where}: too many fields")
+        field = FIELDS.get(key.strip().lower())
+        if field is None:
+            raise ValueError(f"{where}: unknown option {key}")
+        if value is not None and value.strip():
+            values[field] = value.strip()
+    try:
+        if "rec_seq" not in values:
+            raise ValueError("no sequence")
+        if re.search("[^atgc]", values["rec_seq"], re.IGNORECASE):
+            raise ValueError(f"invalid sequence {values['rec_seq']}")
+        state = values.get("binding_state", str(defaults.binding_state)).upper()
+        if state not in STATES:
+            raise ValueError(f"invalid binding state {state}")
+        max_sensor_size = int(values.get("max_sensor_size", defaults.max_sensor_size))
+        if max_sensor_size <= 20:
+            raise ValueError(
+                f"max size {max_sensor_size} is too low, it must be greater than 20"
+            )
+        min_sens_per_seed = int(
+            values.get("min_sens_per_seed", defaults.min_sens_per_seed)
+        )
+        if min_sens_per_seed < 1:
+            raise ValueError(f"sps {min_sens_per_seed} must be at least 1")
+        return Target(
+            values.get("name", defaults.name),
+            values["rec_seq"].lower(),
+            STATES[state],
+            max_sensor_size,
+            min_sens_per_seed,
+            parse_bool(values["fixed"]) if "fixed" in values else defaults.fixed,
+            parse_bool(values["thiol"]) if "thiol" in values else defaults.thiol,
+        )
+    except ValueError as e:
+        raise ValueError(f"{where}: {e}") from None
+
+
+def read_fasta(lines: Iterable[str]) -> list[tuple[dict[str, str], int]]:
+    """Return the options of each FASTA record, and the line it starts on."""
+    records: list[tuple[dict[str, str], int]] = []
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line.startswith(";"):
+            continue
+        if line.startswith(">"):
+            if not line[1:].strip():
+                raise ValueError(f"line {number}: no name after >")
+            name, *options = line[1:].split()
+            record = {"name": name, "sequence": ""}
+            for option in options:
+                key, _, value = option.partition("=")
+                record[key] = value
+            records.append((record, number))
+        elif records:
+            records[-1][0]["sequence"] += line
+        else:
+            raise ValueError(f"line {number}: sequence before the first > header")
+    return records
+
+
+def read_targets(path: str, defaults: Target) -> list[Target]:
+    """
+    read_targets() reads the targets of a batch file, in CSV or FASTA format (see the
+    module docstring). Targets without a name are named after their position.
+
+    Parameters:
+        path     <-- a string, the batch file
+        defaults <-- a Target, the options of targets that leave them out
+    Returns:
+        a list of Targets, in the order of the file
+    """
+    with open(path, newline="") as f:
+        lines = f.readlines()
+    # no CSV row starts with a FASTA header
+    if any(line.startswith(">") for line in lines):
+        records = read_fasta(lines)
+    else:
+        reader = csv.DictReader(line for line in lines if line.strip())
+        records = [(row, reader.line_num) for row in reader]
+    targets = []
+    for number, (options, line) in enumerate(records, 1):
+        named = defaults._replace(name=f"target{number}")
+        targets.append(make_target(options, named, f"{path}, line {line}"))
+    names = [t.name for t in targets]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"{path}: duplicate target names {', '.join(duplicates)}")
+    return targets
+
+
+def write_combined(
+    path: str,
+    targets: list[Target],
+    results: list[sensor.SensorList],
+    form: str = "csv",
+) -> str:
+    """
+    Write the sensors of every target to one file, with a target column, in a format
+    of writers.FORMATS, returning the path written (see writers.open_writer()).
+    """
+    with writers.open_writer(path, form, target_column=True) as writer:
+        for target, sensors in zip(targets, results):
+            writer.write_all(sensors, target.name)
+    return writer.path
+
+
+def target_files(
+    directory: str, targets: list[Target], suffix: str = ".csv"
+) -> list[str]:
+    """
+    target_files() returns the path of the file of each target in write_per_target(),
+    named after the target with the characters not allowed in file names replaced.
+    Names which would then share a file (ignoring case, as some file systems do)
+    are told apart by a number, as in "a_b.csv" and "a_b-2.csv".
+
+    Parameters:
+        directory <-- a string, the directory of the files
+        targets   <-- a list of Targets
+        suffix    <-- a string, the suffix of the files
+    Returns:
+        a list of strings, the path of each target's file
+    """
+    paths: list[str] = []
+    taken: set[str] = set()
+    for target in targets:
+        stem = name = re.sub(r"[^\w.-]", "_", target.name)
+        number = 1
+        while (name + suffix).lower() in taken:
+            number += 1
+            name = f"{stem}-{number}"
+        taken.add((name + suffix).lower())
+        paths.append(os.path.join(directory, name + suffix))
+    return paths
+
+
+def write_per_target(
+    directory: str,
+    targets: list[Target],
+    results: list[sensor.SensorList],
+    form: str = "csv",
+) -> None:
+    """Write the sensors of each target to its own file in a directory."""
+    os.makedirs(directory, exist_ok=True)
+    form = writers.output_format(form)
+    paths = target_files(directory, targets, writers.FORMATS[form])
+    for path, sensors in zip(paths, results):
+        with writers.open_writer(path, form) as writer:
+            writer.write_all(sensors)
+
+
+def progress_printer(
+    targets: list[Target],
+) -> Callable[[int, int, int, sensor.SensorList], None]:
+    """
+    progress_printer() returns a progress function for Designer.design_many(), which
+    prints a line as each target is finished.
+    """
+    finished = 0
+
+    def progress(index: int, done: int, total: int, results: sensor.SensorList) -> None:
+        nonlocal finished
+        if done < total:
+            return
+        finished += 1
+        failed = f", {results.failed} not folded" if results.failed else ""
+        print(
+            f"[{finished}/{len(targets)}] {targets[index].name}: "
+            f"{len(results)} candidate sensor(s){failed}",
+            flush=True,
+        )
+
+    return progress
@@ -0,0 +1,204 @@
+"""Save the progress of long designs, so an interrupted run can be resumed.
+
+With a master seed (see Designer), the candidates of a design are split into chunks,
+each designed from random numbers seeded from the master seed and the chunk alone.
+A chunk designed again finds the same sensors, so the progress of a run is the set
+of chunks done and the sensors they found. A Checkpoint records these, with the
+funnel counters of each design, and is written to its file every interval seconds
+as tasks complete:
+
+    checkpoint = Checkpoint("run.ckpt", designs, master_seed=0)
+    results = designer.design_many(designs, checkpoint=checkpoint)
+
+After an interruption, Checkpoint.load() reads the file back, and design_many()
+designs only the chunks not yet done, adding their sensors to those saved. The file
+is kept once the run completes, so resuming it again only writes its results.
+
+The file is a pickle, written to a temporary file and renamed over the last, so it
+is never left half written. Like any pickle, only load checkpoints you wrote.
+"""
+
+import os
+import pickle
+import tempfile
+import threading
+import timeit
+from collections.abc import Sequence
+from typing import Any
+
+from . import sensor
+
+# the version of the checkpoint file format (2: results count their rejections)
+VERSION = 2
+
+
+class Checkpoint:
+
+    """
+    Checkpoint records the chunks of candidates done by one or more designs, and
+    their results so far, and writes them to a file from time to time.
+
+    Parameters:
+        path        <-- a string, the file the checkpoint is written to
+        designs     <-- a list of the arguments of Designer.design(), as tuples
+        master_seed <-- an integer, the master seed of the designer
+        shard       <-- a tuple (i, n), the shard of the designer, or None
+        interval    <-- a float, the least seconds between writes of the file
+    Returns:
+        an object of the class Checkpoint
+    """
+
+    def __init__(
+        self,
+        path: str,
+        designs: Sequence[tuple[str, int, int, int, bool, bool]],
+        master_seed: int,
+        shard: tuple[int, int] | None = None,
+        interval: float = 60.0,
+    ) -> None:
+        """Initialize a new Checkpoint, with no chunks done."""
+        self.path = path
+        self.designs = [tuple(design) for design in designs]
+        self.master_seed = master_seed
+        self.shard = shard
+        self.interval = interval
+        # (design index, seed graph name, chunk) of every task done
+        self.done: set[tuple[int, str, int]] = set()
+        self.results = [sensor.SensorList() for _ in self.designs]
+        # the candidates generated for each design, the start of its funnel
+        self.candidates = [0] * len(self.designs)
+        self.saves = 0
+        self.last_save = timeit.default_timer()
+        self.lock = threading.RLock()
+
+    @classmethod
+    def load(cls, path: str, interval: float = 60.0) -> "Checkpoint":
+        """
+        load() reads a checkpoint written by save(), to resume its run.
+
+        Parameters:
+            path     <-- a string, the checkpoint file
+            interval <-- a float, the least seconds between writes from now on
+        Returns:
+            a Checkpoint; an OSError is raised if the file cannot be read, and a
+            ValueError if it is not a checkpoint
+        """
+        with open(path, "rb") as f:
+            try:
+                state = pickle.load(f)
+            except (pickle.UnpicklingError, EOFError, AttributeError) as e:
+                raise ValueError(f"{path} is not a checkpoint: {e}") from None
+        if not isinstance(state, dict) or state.get("version") != VERSION:
+            raise ValueError(f"{path} is not a checkpoint of this version")
+        checkpoint = cls(
+            path, state["designs"], state["master_seed"], state["shard"], interval
+        )
+        checkpoint.done = state["done"]
+        checkpoint.results = state["results"]
+        checkpoint.candidates = state["candidates"]
+        return checkpoint
+
+    def check(
+        self,
+        designs: Sequence[tuple[str, int, int, int, bool, bool]],
+        master_seed: int | None,
+        shard: tuple[int, int] | None,
+    ) -> None:
+        """
+        check() raises a ValueError unless this checkpoint is of the same designs,
+        designed with the same master seed and shard, so its chunks are theirs.
+        """
+        if [tuple(design) for design in designs] != self.designs:
+            raise ValueError(f"{self.path} is a checkpoint of other designs")
+        if master_seed != self.master_seed or shard != self.shard:
+            raise ValueError(
+                f"{self.path} was designed with master seed {self.master_seed} "
+                f"and shard {self.shard}"
+            )
+
+    @staticmethod
+    def key(index: int, task: tuple[Any, ...]) -> tuple[int, str, int]:
+        """Return the key of a design's task, from its seed graph and chunk."""
+        return index, task[0].name, task[3]
+
+    def is_done(self, index: int, task: tuple[Any, ...]) -> bool:
+        """Return whether a task of the design at index is done."""
+        return self.key(index, task) in self.done
+
+    def task_done(self, index: int, task: tuple[Any, ...]) -> None:
+        """
+        task_done() records a task of the design at index as done, once its
+        sensors are in results, and writes the checkpoint if interval has passed
+        since it was last written.
+        """
+        with self.lock:
+            self.done.add(self.key(index, task))
+            self.candidates[index] += int(task[2])
+            if timeit.default_timer() - self.last_save >= self.interval:
+                self.save()
+
+    def funnel(self, index: int) -> dict[str, int]:
+        """
+        funnel() returns the counters of the design at index: the candidates
+        generated, those which could not be folded, and the sensors kept.
+        """
+        return {
+            "candidates": self.candidates[index],
+            "failed": self.results[index].failed,
+            "sensors": len(self.results[index]),
+        }
+
+    def save(self) -> None:
+        """
+        save() writes the checkpoint to a temporary file beside path, and renames
+        it over path, so a reader sees the last checkpoint or this one, whole.
+        """
+        with self.lock:
+            # keep each sequence once, so the file grows with the sensors found;
+            # in place, as the designer adds to these lists
+            for result in self.results:
+                result[:] = result.best_first()
+            state = {
+                "version": VERSION,
+                "designs": self.designs,
+                "master_seed": self.master_seed,
+                "shard": self.shard,
+                "done": self.done,
+                "results": self.results,
+                "candidates": self.candidates,
+            }
+            directory = os.path.dirname(os.path.abspath(self.path))
+            with tempfile.NamedTemporaryFile(
+                "wb", dir=directory, prefix=".checkpoint-", delete=False
+            ) as f:
+                try:
+                    pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+                    f.flush()
+                    os.fsync(f.fileno())
+                except BaseException:
+                    f.close()
+                    os.unlink(f.name)
+                    raise
+            os.replace(f.name, self.path)
+            self.saves += 1
+            self.last_save = timeit.default_timer()
+
+
+def open_checkpoint(
+    path: str,
+    designs: Sequence[tuple[str, int, int, int, bool, bool]],
+    master_seed: int,
+    shard: tuple[int, int] | None = None,
+    interval: float = 60.0,
+    resume: bool = False,
+) -> Checkpoint:
+    """
+    open_checkpoint() returns a new Checkpoint of a run, or with resume, the one
+    saved in path, checking it is of the same designs, master seed and shard.
+    An OSError or ValueError is raised if it cannot be resumed.
+    """
+    if not resume:
+        return Checkpoint(path, designs, master_seed, shard, interval)
+    saved = Checkpoint.load(path, interval)
+    saved.check(designs, master_seed, shard)
+    return saved
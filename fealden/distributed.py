@@ -0,0 +1,612 @@
+"""Spread the candidate sensors of a design over workers on many machines.
+
+A Coordinator splits the candidates of each seed graph into leases of lease_size
+candidates, and serves them from a Broker over TCP, with multiprocessing.managers.
+Workers are started on any machine that can reach it, with the same key:
+
+    FEALDEN_AUTHKEY=KEY fealden worker HOST:PORT
+
+Each worker takes a lease, generates and scores its candidates with
+generate_sensor(), and returns the sensors. While it works, the worker renews its
+lease every third of lease_timeout; a lease not renewed in time, because its worker
+died or lost the network, is given to the next worker asking, up to max_attempts
+times. The Broker keeps the best top_k sensors of the design.
+"""
+
+import argparse
+import collections
+import os
+import secrets
+import socket
+import sys
+import threading
+import time
+import timeit
+from collections.abc import Callable
+from multiprocessing.managers import BaseManager
+from typing import Any, NamedTuple
+
+from . import asyncfold, fealden, seed, sensor
+
+AUTHKEY_VARIABLE = "FEALDEN_AUTHKEY"
+
+
+class Lease(NamedTuple):
+    """A share of the candidates of a design: the arguments of generate_sensor()."""
+
+    id: int
+    task: tuple[seed.Seed, str, float, int, bool, bool]
+
+
+class Broker:
+
+    """
+    Broker hands the leases of the current design out to workers, takes their
+    results back, and gives the leases of workers which stopped renewing them to
+    others. It lives in the coordinator, and workers call it through a proxy, so its
+    methods may be called from many threads at once.
+    """
+
+    def __init__(
+        self,
+        config: dict[str, Any],
+        lease_timeout: float = 60.0,
+        top_k: int | None = None,
+        max_attempts: int = 3,
+    ) -> None:
+        """
+        Initialize a new Broker object, with no leases.
+
+        Parameters:
+            config        <-- a dictionary, the options of init_worker() and of the
+                              tasks, for the workers (see get_config())
+            lease_timeout <-- a float, the seconds a lease is held without renewal
+            top_k         <-- an integer, the best sensors kept, or None for all
+            max_attempts  <-- an integer, the times a lease is handed out before it
+                              is given up
+        """
+        self.config = dict(config, lease_timeout=lease_timeout)
+        self.lease_timeout = lease_timeout
+        self.top_k = top_k
+        self.max_attempts = max_attempts
+        self.changed = threading.Condition()
+        self.closed = False
+        self.next_id = 0
+        self.leases: dict[int, Lease] = {}
+        self.pending: collections.deque[int] = collections.deque()
+        # lease id --> (worker, deadline)
+        self.assigned: dict[int, tuple[str, float]] = {}
+        self.attempts: collections.Counter[int] = collections.Counter()
+        self.done: set[int] = set()
+        self.results = sensor.SensorList()
+        self.task_errors: list[str] = []
+        self.reassigned = 0
+        self.first_result: float | None = None
+        # worker --> when it last called the broker
+        self.seen: dict[str, float] = {}
+
+    def get_config(self) -> dict[str, Any]:
+        """Return the options the workers run with (backend, ensemble, and so on)."""
+        return self.config
+
+    def is_closed(self) -> bool:
+        """Return whether the coordinator has shut down, so workers should stop."""
+        return self.closed
+
+    def close(self) -> None:
+        """Shut the broker down, telling the workers to stop."""
+        with self.changed:
+            self.closed = True
+            self.changed.notify_all()
+
+    def add(self, tasks: list[tuple[seed.Seed, str, float, int, bool, bool]]) -> None:
+        """
+        add() starts a new design, dropping the leases and results of the last. Lease
+        ids are not reused, so late results of the last design are ignored.
+
+        Parameters:
+            tasks <-- a list of the arguments of generate_sensor(), one per lease
+        Returns:
+            Nothing
+        """
+        with self.changed:
+            self.leases = {}
+            for task in tasks:
+                self.leases[self.next_id] = Lease(self.next_id, task)
+                self.next_id += 1
+            self.pending = collections.deque(self.leases)
+            self.assigned = {}
+            self.attempts = collections.Counter()
+            self.done = set()
+            self.results = sensor.SensorList()
+            self.task_errors = []
+            self.reassigned = 0
+            self.first_result = None
+            self.changed.notify_all()
+
+    def reclaim(self) -> None:
+        """Requeue the leases whose deadline passed; call with the lock held."""
+        now = time.monotonic()
+        for lease_id, (worker, deadline) in list(self.assigned.items()):
+            if deadline < now:
+                del self.assigned[lease_id]
+                self.reassigned += 1
+                self.retry(lease_id, f"Lease {lease_id} timed out on {worker}")
+
+    def retry(self, lease_id: int, error: str) -> None:
+        """Requeue a lease, or give it up; call with the lock held."""
+        if self.attempts[lease_id] < self.max_attempts:
+            self.pending.append(lease_id)
+        else:
+            self.task_errors.append(error)
+            self.done.add(lease_id)
+        self.changed.notify_all()
+
+    def take(self, worker: str) -> Lease | None:
+        """
+        take() hands the next lease to a worker.
+
+        Parameters:
+            worker <-- a string, the name of the worker
+        Returns:
+            a Lease, or None if there is none to hand out now
+        """
+        with self.changed:
+            self.seen[worker] = time.monotonic()
+            self.reclaim()
+            if self.closed or not self.pending:
+                return None
+            lease_id = self.pending.popleft()
+            self.attempts[lease_id] += 1
+            self.assigned[lease_id] = (worker, time.monotonic() + self.lease_timeout)
+            return self.leases[lease_id]
+
+    def renew(self, worker: str, lease_id: int) -> bool:
+        """
+        renew() extends a worker's lease by lease_timeout seconds.
+
+        Returns:
+            True, or False if the lease is no longer the worker's
+        """
+        with self.changed:
+            self.seen[worker] = time.monotonic()
+            if self.assigned.get(lease_id, ("",))[0] != worker:
+                return False
+            self.assigned[lease_id] = (worker, time.monotonic() + self.lease_timeout)
+            return True
+
+    def complete(self, worker: str, lease_id: int, results: sensor.SensorList) -> None:
+        """
+        complete() takes the sensors of a lease, keeping the best top_k of the design.
+        Results of leases already completed by another worker are ignored.
+        """
+        with self.changed:
+            self.seen[worker] = time.monotonic()
+            if lease_id not in self.leases or lease_id in self.done:
+                return
+            self.assigned.pop(lease_id, None)
+            if lease_id in self.pending:
+                self.pending.remove(lease_id)
+            self.done.add(lease_id)
+            if self.first_result is None:
+                self.first_result = time.monotonic()
+            self.results.merge(results)
+            if self.top_k is not None and len(self.results) > self.top_k:
+                ranked = self.results.best_first()
+                del ranked[self.top_k :]
+                self.results = ranked
+            self.changed.notify_all()
+
+    def fail(self, worker: str, lease_id: int, error: str) -> None:
+        """fail() takes the error of a lease, which is retried up to max_attempts."""
+        with self.changed:
+            self.seen[worker] = time.monotonic()
+            if self.assigned.get(lease_id, ("",))[0] != worker:
+                return
+            del self.assigned[lease_id]
+            self.retry(lease_id, error)
+
+    def progress(self) -> tuple[int, int]:
+        """Return the leases of the design completed (or given up), and in total."""
+        with self.changed:
+            return len(self.done), len(self.leases)
+
+    def active_workers(self) -> int:
+        """Return the workers which called the broker within lease_timeout."""
+        with self.changed:
+            since = time.monotonic() - self.lease_timeout
+            return sum(1 for seen in self.seen.values() if seen >= since)
+
+    def wait(self, timeout: float) -> bool:
+        """
+        wait() waits until the leases of the design are all done, or the timeout
+        passes, reclaiming expired leases meanwhile, and returns whether they are.
+        """
+        with self.changed:
+            self.reclaim()
+            return self.changed.wait_for(
+                lambda: len(self.done) == len(self.leases), timeout
+            )
+
+
+class BrokerManager(BaseManager):
+    """The manager workers connect to the broker with (see Coordinator)."""
+
+
+BrokerManager.register("broker")
+
+
+def parse_address(address: str) -> tuple[str, int]:
+    """Return a HOST:PORT string as (host, port)."""
+    host, _, port = address.rpartition(":")
+    if not host or not port.isdigit():
+        raise ValueError(f"Expected HOST:PORT, not {address}")
+    return host, int(port)
+
+
+def authkey() -> bytes:
+    """Return the key of FEALDEN_AUTHKEY, which coordinator and workers share."""
+    key = os.environ.get(AUTHKEY_VARIABLE)
+    if not key:
+        raise ValueError(f"Set {AUTHKEY_VARIABLE} to the key of the coordinator")
+    return key.encode()
+
+
+class Coordinator:
+
+    """
+    Coordinator designs sensors with workers started by `fealden worker`, anywhere
+    on the network, in place of a Designer and its worker pool. It is used the same
+    way, as a context manager, which stops serving leases:
+
+        with Coordinator("0.0.0.0:5000", lease_size=100) as coordinator:
+            sensors = coordinator.design("CACGTG", 1, min_sens_per_seed=100000)
+    """
+
+    def __init__(
+        self,
+        address: str,
+        key: bytes | None = None,
+        backend: str | None = None,
+        ensemble: bool = False,
+        fold_concurrency: int = 1,
+        fold_cache: int | None = None,
+        lease_size: int = 100,
+        lease_timeout: float = 60.0,
+        top_k: int | None = None,
+        max_attempts: int = 3,
+        master_seed: int | None = None,
+    ) -> None:
+        """
+        Initialize a new Coordinator object, listening on address.
+
+        Parameters:
+            address          <-- a string, HOST:PORT to listen on (port 0 for any)
+            key              <-- bytes, the key workers must present, or None for
+                                 FEALDEN_AUTHKEY, or a new one if that is not set
+            backend          <-- a string, the folding backend of the workers
+            ensemble         <-- a bool, score with partition function populations
+            fold_concurrency <-- an integer, the folds each worker keeps in flight
+            fold_cache       <-- an integer, the folding results each worker keeps,
+                                 or None for Designer.FOLD_CACHE_SIZE
+            lease_size       <-- an integer, the candidate sensors in each lease
+            lease_timeout    <-- a float, the seconds a lease is held unrenewed
+            top_k            <-- an integer, the best sensors kept, or None for all
+            max_attempts     <-- an integer, the times a lease is handed out
+            master_seed      <-- an integer, if given each lease is designed from
+                                 random numbers seeded from it and the lease, so
+                                 the design finds the same sensors on any workers
+        """
+        if key is None:
+            key = os.environ.get(AUTHKEY_VARIABLE, "").encode() or None
+        # a key made up here must be given to the workers (see Fealden)
+        self.key_generated = not key
+        self.key = key or secrets.token_hex(16).encode()
+        self.lease_size = max(1, lease_size)
+        self.fold_concurrency = max(1, fold_concurrency)
+        self.broker = Broker(
+            {
+                "backend": backend,
+                "ensemble": ensemble,
+                "fold_concurrency": self.fold_concurrency,
+                "fold_cache": (
+                    fealden.Designer.FOLD_CACHE_SIZE
+                    if fold_cache is None
+                    else fold_cache
+                ),
+                "master_seed": master_seed,
+            },
+            lease_timeout,
+            top_k,
+            max_attempts,
+        )
+        broker = self.broker
+
+        # a manager class of its own, so each coordinator serves its own broker
+        class CoordinatorManager(BaseManager):
+            pass
+
+        CoordinatorManager.register("broker", callable=lambda: broker)
+        # the Server of the manager, run in this process (see start())
+        self.server = CoordinatorManager(
+            address=parse_address(address), authkey=self.key
+        ).get_server()
+        # with the port chosen, if port 0 was asked for
+        listening = self.server.address
+        assert isinstance(listening, tuple)
+        self.address = f"{listening[0]}:{listening[1]}"
+        self.thread: threading.Thread | None = None
+        # the serving threads of the Server stop with this, as in serve_forever()
+        self.stopping = threading.Event()
+        self.server.stop_event = self.stopping  # type: ignore[attr-defined]
+        self.fold_stats: asyncfold.FoldStats | None = None
+        self.task_errors: list[str] = []
+        self.time_to_first_result: float | None = None
+        self.elapsed = 0.0
+
+    @property
+    def workers(self) -> int:
+        """The workers which called the coordinator within the lease timeout."""
+        return self.broker.active_workers()
+
+    def __enter__(self) -> "Coordinator":  # noqa: PYI034
+        """Start serving leases."""
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        """Stop serving leases."""
+        self.close()
+
+    def start(self) -> None:
+        """start() serves the broker to workers, from a thread of this process."""
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.serve, daemon=True)
+            self.thread.start()
+
+    def serve(self) -> None:
+        """
+        serve() accepts the connections of workers, each served by a thread of its
+        own, until close(). (Server.serve_forever() ends with sys.exit(), and its
+        accepting thread cannot be stopped.)
+        """
+        listener = self.server.listener  # type: ignore[attr-defined]
+        while not self.stopping.is_set():
+            try:
+                connection = listener.accept()
+            except Exception:
+                # a client that failed authentication, or the wake up of close()
+                continue
+            threading.Thread(
+                target=self.server.handle_request, args=(connection,), daemon=True
+            ).start()
+
+    def close(self) -> None:
+        """
+        close() tells the workers to stop, gives them a moment to hear it, and stops
+        serving. A closed Coordinator cannot be started again.
+        """
+        if self.thread is not None:
+            self.broker.close()
+            time.sleep(min(1.0, self.broker.lease_timeout / 3))
+            self.stopping.set()
+            # wake serve() from accept()
+            with socket.create_connection(parse_address(self.address), timeout=5):
+                pass
+            self.thread.join()
+            self.thread = None
+            self.server.listener.close()  # type: ignore[attr-defined]
+
+    def leases(
+        self,
+        rec_seq: str,
+        binding_state: int,
+        max_sensor_size: int = 50,
+        min_sens_per_seed: int = 500,
+        fixed: bool = False,
+        thiol: bool = True,
+    ) -> list[tuple[seed.Seed, str, float, int, bool, bool]]:
+        """
+        leases() checks the arguments of a design (see Designer.design()) and splits
+        the candidates of each seed graph into leases of up to lease_size, taking the
+        seed graphs in turn.
+        """
+        rec_seq = rec_seq.lower()
+        seeds = fealden.design_seeds(
+            rec_seq, binding_state, max_sensor_size, min_sens_per_seed
+        )
+        sizes = [self.lease_size] * (min_sens_per_seed // self.lease_size)
+        if min_sens_per_seed % self.lease_size:
+            sizes.append(min_sens_per_seed % self.lease_size)
+        return [
+            (s, rec_seq, size, number, fixed, thiol)
+            for number, size in enumerate(sizes, 1)
+            for s in seeds
+        ]
+
+    def design(
+        self,
+        rec_seq: str,
+        binding_state: int,
+        max_sensor_size: int = 50,
+        min_sens_per_seed: int = 500,
+        fixed: bool = False,
+        thiol: bool = True,
+        progress: Callable[[int, int], None] | None = None,
+    ) -> sensor.SensorList:
+        """
+        design() generates and scores candidate sensors for a recognition sequence
+        with the workers connected, as Designer.design() does with its pool, waiting
+        until every lease is done. The errors of leases given up are kept in
+        task_errors; if every lease was given up, a RuntimeError is raised.
+
+        Parameters:
+            (those of Designer.design(), and)
+            progress <-- a function, called every second with the leases done and
+                         in total
+        Returns:
+            a SensorList of the best top_k sensors, each sequence once, best first
+        """
+        tasks = self.leases(
+            rec_seq, binding_state, max_sensor_size, min_sens_per_seed, fixed, thiol
+        )
+        self.start()
+        time_zero = timeit.default_timer()
+        start = time.monotonic()
+        self.broker.add(tasks)
+        while not self.broker.wait(1.0):
+            if progress is not None:
+                progress(*self.broker.progress())
+        self.elapsed = timeit.default_timer() - time_zero
+        with self.broker.changed:
+            results = self.broker.results.best_first()
+            self.task_errors = list(self.broker.task_errors)
+            first = self.broker.first_result
+        self.time_to_first_result = None if first is None else first - start
+        if self.task_errors and len(self.task_errors) == len(tasks):
+            raise RuntimeError(self.task_errors[0])
+        return results
+
+
+def renew_while(
+    broker: Any, worker: str, lease_id: int, interval: float, stop: threading.Event
+) -> None:
+    """Renew a lease every interval seconds until stop is set."""
+    while not stop.wait(interval):
+        try:
+            if not broker.renew(worker, lease_id):
+                return
+        except (OSError, EOFError):
+            return
+
+
+def work(
+    address: str,
+    key: bytes,
+    name: str | None = None,
+    poll: float = 1.0,
+    connect_timeout: float = 60.0,
+    verbose: bool = False,
+) -> int:
+    """
+    work() is the loop of `fealden worker`: it connects to a coordinator, prepares
+    the backend it names, and works on its leases until it shuts down.
+
+    Parameters:
+        address         <-- a string, HOST:PORT of the coordinator
+        key             <-- bytes, the key of the coordinator
+        name            <-- a string, naming this worker to the coordinator, or None
+                            for HOSTNAME:PID
+        poll            <-- a float, the seconds to wait when there are no leases
+        connect_timeout <-- a float, the seconds to keep trying to connect
+        verbose         <-- a bool, print each lease as it is done
+    Returns:
+        an integer, the leases done
+    """
+    name = name or f"{socket.gethostname()}:{os.getpid()}"
+    manager = BrokerManager(address=parse_address(address), authkey=key)
+    deadline = time.monotonic() + connect_timeout
+    while True:
+        try:
+            manager.connect()
+            break
+        except ConnectionRefusedError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(poll)
+    broker: Any = manager.broker()  # type: ignore[attr-defined]
+    config = broker.get_config()
+    fealden.init_worker(
+        config["backend"],
+        None,
+        False,
+        config["ensemble"],
+        config["fold_cache"],
+        config["master_seed"],
+    )
+    task: Callable[..., sensor.SensorList] = fealden.generate_sensor
+    extra: tuple[Any, ...] = ()
+    if config["fold_concurrency"] > 1:
+        task, extra = asyncfold.generate_sensor, (config["fold_concurrency"],)
+
+    done = 0
+    try:
+        while not broker.is_closed():
+            lease = broker.take(name)
+            if lease is None:
+                time.sleep(poll)
+                continue
+            stop = threading.Event()
+            renewer = threading.Thread(
+                target=renew_while,
+                args=(broker, name, lease.id, config["lease_timeout"] / 3, stop),
+                daemon=True,
+            )
+            renewer.start()
+            try:
+                results = task(*lease.task, *extra)
+            except Exception as e:
+                broker.fail(name, lease.id, repr(e))
+            else:
+                broker.complete(name, lease.id, results)
+                done += 1
+                if verbose:
+                    print(f"Lease {lease.id}: {len(results)} sensor(s)", flush=True)
+            finally:
+                stop.set()
+                renewer.join()
+    except (OSError, EOFError):
+        # the coordinator has gone away
+        pass
+    return done
+
+
+def main(argv: list[str] | None = None) -> None:
+    """
+    main() parses the command line of "fealden worker", and works on the leases of a
+    coordinator until it shuts down.
+
+    Parameters:
+        argv <-- a list of strings, the arguments after "worker", or None for sys.argv
+    Returns:
+        Nothing
+    """
+    parser = argparse.ArgumentParser(
+        prog="fealden worker",
+        description="Score candidate sensors for a Fealden coordinator "
+        f"(fealden --coordinator). The key is read from {AUTHKEY_VARIABLE}.",
+    )
+    parser.add_argument("address", type=str, help="HOST:PORT of the coordinator.")
+    parser.add_argument(
+        "--name",
+        type=str,
+        help="The name of this worker, in the coordinator. Default HOSTNAME:PID.",
+        default=None,
+    )
+    parser.add_argument(
+        "--wait",
+        type=float,
+        metavar="SECONDS",
+        help="Keep trying to connect for this long, while the coordinator starts.",
+        default=60.0,
+    )
+    parser.add_argument(
+        "-v",
+        "-verbose",
+        action="store_true",
+        help="Print each lease as it is done.",
+    )
+    args = parser.parse_args(argv)
+    try:
+        key = authkey()
+        parse_address(args.address)
+    except ValueError as e:
+        parser.error(str(e))
+    try:
+        done = work(
+            args.address, key, args.name, connect_timeout=args.wait, verbose=args.v
+        )
+    except ConnectionRefusedError:
+        print(f"Could not connect to a coordinator at {args.address}", file=sys.stderr)
+        sys.exit(1)
+    print(f"Coordinator closed; did {done} lease(s)")
@@ -1,13 +1,37 @@
 #!/usr/bin/env python3
 
 import argparse
+import asyncio
+import functools
+import itertools
 import multiprocessing
+import os
+import queue
 import re
+import sys
 import textwrap
+import threading
 import time
 import timeit
+from collections.abc import Callable, Sequence
+from typing import Any
 
-from . import seed, sensor
+from . import (
+    asyncfold,
+    batch,
+    checkpoint,
+    distributed,
+    foldstore,
+    profiling,
+    progress,
+    resources,
+    results,
+    seed,
+    sensor,
+    store,
+    structure,
+    writers,
+)
 
 BINDING_STATE = {"DS": 0, "SS": 1}
 verbose = False
@@ -81,6 +105,7 @@ def main() -> None:
     parser.add_argument(
         "recSeq",
         type=str,
+        nargs="?",
         help="The sequenced recognized by your target \
                 represented as a string comprised of the letters 'a', 'A', 't', \
                 'T', 'c', 'C', 'g', and 'G'.",
@@ -88,6 +113,7 @@ def main() -> None:
     parser.add_argument(
         "bindingState",
         type=int,
+        nargs="?",
         help="The state of the sequence when bound to the target.\
                 \n This is 0 if your target binds to a double stranded sequence\
                 and 1 if it binds to a single stranded sequence.",
@@ -140,10 +166,207 @@ def main() -> None:
         action="store_true",
         help="Output information when each thread starts and completes operation.",
     )
+    parser.add_argument(
+        "--profile",
+        type=str,
+        metavar="DIR",
+        help="Profile every worker process with cProfile, writing per-worker .pstats\
+                files and a merged profile to DIR.",
+        default=None,
+    )
+    parser.add_argument(
+        "--profile-memory",
+        action="store_true",
+        help="With --profile, also write tracemalloc snapshots for every worker.",
+    )
+    add_designer_arguments(parser)
+    parser.add_argument(
+        "--coordinator",
+        type=str,
+        metavar="HOST:PORT",
+        help="Score the candidates on `fealden worker` processes, on any machine,\
+                which take them in leases from HOST:PORT (see distributed.py).",
+        default=None,
+    )
+    parser.add_argument(
+        "--lease-size",
+        type=int,
+        metavar="N",
+        help="With --coordinator, the candidate sensors in each lease.",
+        default=100,
+    )
+    parser.add_argument(
+        "--lease-timeout",
+        type=float,
+        metavar="SECONDS",
+        help="With --coordinator, give a lease to another worker if its worker\
+                has not renewed it for this long.",
+        default=60.0,
+    )
+    parser.add_argument(
+        "--top-k",
+        type=int,
+        metavar="K",
+        help="With --coordinator, keep only the best K sensors.",
+        default=None,
+    )
+    parser.add_argument(
+        "--shard",
+        type=parse_shard,
+        metavar="i/N",
+        help="Design only shard i (from 0) of N disjoint slices of the candidates,\
+                with --seed (0 if not given), so N runs can split a design. Merge\
+                their results with `fealden merge`.",
+        default=None,
+    )
+    parser.add_argument(
+        "--batch",
+        type=str,
+        metavar="FILE",
+        help="Design sensors for every target listed in FILE (CSV or FASTA, see\
+                batch.py) over one worker pool, in place of recSeq and\
+                bindingState. Options a target leaves out take the values given\
+                here.",
+        default=None,
+    )
+    parser.add_argument(
+        "--per-target",
+        action="store_true",
+        help="With --batch, write one CSV file per target to the directory -out\
+                (without .csv), in place of one file with a Target column.",
+    )
+    parser.add_argument(
+        "--format",
+        choices=writers.FORMATS,
+        help="Write the results as CSV, JSON lines, Parquet (or .npz without\
+                pyarrow) or a NumPy .npz archive, replacing a .csv suffix of -out\
+                (see writers.py).",
+        default="csv",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Write the sensors as each task finds them, in the order found, in\
+                place of best first at the end of the run.",
+    )
+    parser.add_argument(
+        "--db",
+        type=str,
+        metavar="FILE",
+        help="Also add the run, and its sensors, to the SQLite database FILE,\
+                created if needed, to query across runs with `fealden query`\
+                (see store.py).",
+        default=None,
+    )
+    parser.add_argument(
+        "--progress",
+        choices=progress.FORMATS,
+        help="Report the candidates generated, folds per second, acceptance rate,\
+                best score and ETA to stderr as the workers go: as a line\
+                rewritten in place, or JSON lines for logs. -v implies line.",
+        default=None,
+    )
+    parser.add_argument(
+        "--fold-store",
+        type=str,
+        metavar="DIR",
+        help="Keep the folds of every candidate in DIR, to score them again with\
+                other thresholds with `fealden rescore`, without folding them\
+                (see foldstore.py).",
+        default=None,
+    )
+    parser.add_argument(
+        "--checkpoint",
+        type=str,
+        metavar="FILE",
+        help="Save the chunks of candidates done, and the sensors found, to FILE\
+                as the run goes, so it can be resumed (see checkpoint.py). Uses\
+                --seed, or 0 if not given.",
+        default=None,
+    )
+    parser.add_argument(
+        "--checkpoint-interval",
+        type=float,
+        metavar="SECONDS",
+        help="With --checkpoint, save at most this often.",
+        default=60.0,
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Carry on the run saved in --checkpoint, with the same arguments,\
+                designing only the chunks it had not done.",
+    )
     # Up next: Binding affinity tuning
     # Up next: Anticipated target concentration tuning
 
     args = parser.parse_args()
+    if args.batch is None and (args.recSeq is None or args.bindingState is None):
+        parser.error("recSeq and bindingState are required without --batch")
+    if args.batch is not None and args.recSeq is not None:
+        parser.error("recSeq and bindingState cannot be given with --batch")
+    if args.batch is not None and args.coordinator is not None:
+        parser.error("--batch cannot be used with --coordinator")
+    if args.shard is not None and args.coordinator is not None:
+        parser.error("--shard cannot be used with --coordinator")
+    if args.checkpoint is not None and args.coordinator is not None:
+        parser.error("--checkpoint cannot be used with --coordinator")
+    if args.fold_store is not None and args.coordinator is not None:
+        parser.error("--fold-store cannot be used with --coordinator")
+    if args.resume and args.checkpoint is None:
+        parser.error("--resume needs --checkpoint")
+    if args.stream and args.coordinator is not None:
+        parser.error("--stream cannot be used with --coordinator")
+    if args.stream and args.per_target:
+        parser.error("--stream cannot be used with --per-target")
+    if args.ms <= 20:
+        print("Maximum sensor size is too low, it must be greater than 20.")
+        exit(0)
+    global verbose
+    verbose = args.v
+    options = designer_options(args)
+    options.update(profile_dir=args.profile, profile_memory=args.profile_memory)
+    if args.shard is not None:
+        options.update(shard=args.shard)
+    if args.db is not None:
+        options.update(db=args.db)
+    if args.fold_store is not None:
+        options.update(fold_store=args.fold_store)
+    if args.format != "csv":
+        if args.format == "parquet" and not writers.has_pyarrow():
+            print("pyarrow is not installed; writing .npz in place of Parquet")
+        options.update(output_format=args.format)
+    if args.stream:
+        options.update(stream=True)
+    progress_format = args.progress or ("line" if args.v else None)
+    if progress_format is not None:
+        options.update(progress_format=progress_format)
+    if args.checkpoint is not None and options["master_seed"] is None:
+        # chunks are only designed the same again with a master seed
+        options["master_seed"] = 0
+    if args.coordinator is not None:
+        try:
+            distributed.parse_address(args.coordinator)
+        except ValueError as e:
+            parser.error(str(e))
+        options.update(
+            coordinator=args.coordinator,
+            lease_size=args.lease_size,
+            lease_timeout=args.lease_timeout,
+            top_k=args.top_k,
+        )
+    if args.batch is not None:
+        defaults = batch.Target("", "", 1, args.ms, args.sps, args.fixed, args.thiol3)
+        try:
+            targets = batch.read_targets(args.batch, defaults)
+        except (OSError, ValueError) as e:
+            print(f"Invalid batch file: {e}")
+            exit(0)
+        if args.checkpoint is not None:
+            designs = [target.design_args() for target in targets]
+            options.update(checkpoint=run_checkpoint(args, designs, options))
+        run_batch(targets, args.out, args.per_target, **options)
+        return
     invalidChars = re.compile("[^atgc]", re.IGNORECASE)
     if invalidChars.search(args.recSeq):
         print(
@@ -154,11 +377,16 @@ def main() -> None:
     if args.bindingState != 0 and args.bindingState != 1:
         print("Invalid binding state. Argument must be 0 or 1. See -h for help.")
         exit(0)
-    if args.ms <= 20:
-        print("Maximum sensor size is too low, it must be greater than 20.")
-        exit(0)
-    global verbose
-    verbose = args.v
+    if args.checkpoint is not None:
+        design = (
+            args.recSeq.lower(),
+            args.bindingState,
+            args.ms,
+            args.sps,
+            args.fixed,
+            args.thiol3,
+        )
+        options.update(checkpoint=run_checkpoint(args, [design], options))
     Fealden(
         args.recSeq.lower(),
         args.bindingState,
@@ -168,7 +396,264 @@ def main() -> None:
         args.out,
         args.fixed,
         args.thiol3,
+        **options,
+    )
+
+
+def run_checkpoint(
+    args: argparse.Namespace,
+    designs: list[tuple[str, int, int, int, bool, bool]],
+    options: dict[str, Any],
+) -> checkpoint.Checkpoint:
+    """
+    run_checkpoint() returns the checkpoint of a run from the --checkpoint options,
+    a new one, or with --resume the one saved, exiting if it cannot be resumed.
+    """
+    try:
+        return checkpoint.open_checkpoint(
+            args.checkpoint,
+            designs,
+            options["master_seed"],
+            options.get("shard"),
+            args.checkpoint_interval,
+            args.resume,
+        )
+    except (OSError, ValueError) as e:
+        print(f"Cannot resume the checkpoint: {e}")
+        exit(0)
+
+
+def add_designer_arguments(parser: argparse.ArgumentParser) -> None:
+    """
+    add_designer_arguments() adds the options of a Designer (the backend, and the
+    worker pool) to a command line parser; see designer_options().
+    """
+    parser.add_argument(
+        "--backend",
+        type=str,
+        choices=structure.BACKEND_NAMES,
+        help="The folding backend to use, overriding FEALDEN_BACKEND.",
+        default=None,
+    )
+    parser.add_argument(
+        "--ensemble",
+        action="store_true",
+        help="Score the on and off states with populations from the partition\
+                function of the folding backend, listing fewer suboptimal folds.",
+    )
+    parser.add_argument(
+        "--fold-concurrency",
+        type=int,
+        metavar="N",
+        help="Keep up to N folds in flight in each worker, from an asyncio event\
+                loop (see asyncfold.py). Default 1 folds one sequence at a time.",
+        default=1,
+    )
+    parser.add_argument(
+        "--event-loop",
+        action="store_true",
+        help="Fold from a single event loop process instead of the worker pool,\
+                keeping --fold-concurrency folds in flight.",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        metavar="N",
+        help="Run N scoring worker processes. By default one for every\
+                --fold-concurrency CPUs this process may use (respecting its\
+                affinity mask and cgroup CPU quota).",
+        default=None,
     )
+    parser.add_argument(
+        "--memory-budget",
+        type=resources.parse_memory_budget,
+        metavar="MB",
+        help="Cap the workers and folds in flight to fit an estimated MB of memory,\
+                or 'auto' for the memory available to this process.",
+        default=None,
+    )
+    parser.add_argument(
+        "--start-method",
+        choices=multiprocessing.get_all_start_methods(),
+        help="Start the worker processes with this multiprocessing start method.\
+                With forkserver, fealden and the backend are imported once in the\
+                server, and every worker is forked from it.",
+        default=None,
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        metavar="S",
+        help="Design the candidates in chunks, each from random numbers seeded from\
+                S and the chunk, so the same sensors are found whatever the\
+                workers.",
+        default=None,
+    )
+
+
+def parse_shard(value: str) -> tuple[int, int]:
+    """
+    parse_shard() reads a shard given on the command line as i/N, shard i (from 0)
+    of N.
+    """
+    index, _, count = value.partition("/")
+    shard = int(index), int(count)
+    if not 0 <= shard[0] < shard[1]:
+        raise ValueError(f"Invalid shard {value}")
+    return shard
+
+
+def designer_options(args: argparse.Namespace) -> dict[str, Any]:
+    """Return the Designer keyword arguments of add_designer_arguments() options."""
+    return {
+        "backend": args.backend,
+        "ensemble": args.ensemble,
+        "fold_concurrency": args.fold_concurrency,
+        "event_loop": args.event_loop,
+        "jobs": args.jobs,
+        "memory_budget": args.memory_budget,
+        "start_method": args.start_method,
+        "master_seed": args.seed,
+    }
+
+
+def run_batch(
+    targets: list[batch.Target],
+    output: str,
+    per_target: bool = False,
+    checkpoint: checkpoint.Checkpoint | None = None,
+    db: str | None = None,
+    output_format: str = "csv",
+    stream: bool = False,
+    **designer_options: Any,
+) -> list[sensor.SensorList]:
+    """
+    run_batch() designs sensors for many targets with one Designer, so they share a
+    worker pool and fold cache, and their tasks are interleaved, and writes the
+    results of every target to one CSV file, or one file each.
+
+    Parameters:
+        targets          <-- a list of batch.Targets
+        output           <-- a string, the CSV file, or the directory per target
+        per_target       <-- a boolean, whether to write one file per target
+        checkpoint       <-- a checkpoint.Checkpoint of the targets' designs, to save
+                             the run to (or resume it from), or None
+        db               <-- a string, a database to add the results to, or None
+        output_format    <-- a string, the format of the results (see writers.py)
+        stream           <-- a boolean, whether to write the sensors to the one file
+                             as the tasks find them, rather than best first
+        designer_options <-- keyword arguments of Designer
+    Returns:
+        a list of SensorLists, the results of each target
+    """
+    time_zero = timeit.default_timer()
+    streamed = None
+    if stream:
+        writer = writers.open_writer(output, output_format, target_column=True)
+        streamed = writers.SensorStream(writer)
+    with Designer(**designer_options) as designer:
+        if verbose:
+            print(
+                f"Designing {len(targets)} target(s) with {designer.workers} "
+                f"worker(s), each keeping up to {designer.fold_concurrency} fold(s) "
+                "in flight"
+            )
+        try:
+            results = designer.design_many(
+                [target.design_args() for target in targets],
+                batch.progress_printer(targets),
+                checkpoint=checkpoint,
+                found=(
+                    None
+                    if streamed is None
+                    else lambda index, found: streamed.add(found, targets[index].name)
+                ),
+            )
+        finally:
+            if streamed is not None:
+                with streamed.writer:
+                    streamed.flush()
+    if designer.fold_stats is not None:
+        print(designer.fold_stats.summary())
+    # the failures of each target were printed with its progress; total them here
+    failures = sensor.SensorList()
+    for result in results:
+        failures.failed += result.failed
+        failures.error = result.error or failures.error
+    Fealden.report_failures(failures, designer.task_errors)
+    if db is not None:
+        store_results(
+            db,
+            [target.design_args() for target in targets],
+            results,
+            designer,
+            [target.name for target in targets],
+        )
+    if streamed is not None:
+        output = streamed.writer.path
+    elif per_target:
+        directory = output[: -len(".csv")] if output.endswith(".csv") else output
+        batch.write_per_target(directory, targets, results, output_format)
+        output = directory + "/"
+    else:
+        output = batch.write_combined(output, targets, results, output_format)
+    found = sum(len(result) for result in results)
+    print(f"Stored {found} result(s) for {len(targets)} target(s) in {output}")
+    print("Took " + str(timeit.default_timer() - time_zero) + " seconds")
+    return results
+
+
+def store_results(
+    db: str,
+    designs: list[tuple[str, int, int, int, bool, bool]],
+    results: list[sensor.SensorList],
+    designer: "Designer | distributed.Coordinator",
+    names: list[str] | None = None,
+) -> None:
+    """
+    store_results() adds designs run by a designer, and their results, to a
+    database (see store.py), with the designer's options. The task errors recorded
+    for each design are those of the whole run.
+
+    Parameters:
+        db       <-- a string, the database file
+        designs  <-- a list of the arguments of Designer.design(), as tuples
+        results  <-- a list with the SensorList of each design
+        designer <-- the Designer or distributed.Coordinator which ran them
+        names    <-- a list of the names of the designs (see batch.py), or None
+    Returns:
+        Nothing
+    """
+    if isinstance(designer, Designer):
+        options: dict[str, Any] = {
+            "backend": designer.backend,
+            "ensemble": designer.ensemble,
+            "fold_concurrency": designer.fold_concurrency,
+            "master_seed": designer.master_seed,
+            "shard": designer.shard,
+        }
+        candidates: list[int | None] = list(designer.candidates)
+    else:
+        config = designer.broker.get_config()
+        options = {
+            key: config[key]
+            for key in ("backend", "ensemble", "fold_concurrency", "master_seed")
+        }
+        options["coordinator"] = designer.address
+        candidates = [None] * len(designs)
+    options["backend"] = options["backend"] or os.getenv("FEALDEN_BACKEND")
+    with store.ResultStore(db) as results_db:
+        for index, (design, result) in enumerate(zip(designs, results)):
+            results_db.add_run(
+                design,
+                result,
+                name=None if names is None else names[index],
+                options=options,
+                elapsed=designer.elapsed,
+                candidates=candidates[index],
+                task_errors=len(designer.task_errors),
+            )
+    print(f"Added {len(designs)} run(s) to {db}")
 
 
 def generate_sensor(
@@ -178,9 +663,11 @@ def generate_sensor(
     core: int,
     fixed: bool,
     thiol: bool,
-) -> list[sensor.Sensor]:
+) -> sensor.SensorList:
     """
     generate_sensor() gens a # of possible sensors and returns a list of valid sensors.
+    Candidates which cannot be folded (see structure.FoldingError) are counted in
+    the list, rather than failing the whole task.
 
     Parameters:
         seed        <-- an object of the 'Seed' class, the seed graph for the sensor
@@ -190,31 +677,699 @@ def generate_sensor(
         fixed       <-- bool, is methylene blue fixed at 3' terminus
 
     Retuns:
-        sensors     <-- list of objecfs of the class 'Sensor'
+        sensors     <-- a SensorList of objecfs of the class 'Sensor'
     """
     # global verbose
     # if verbose:
     #     print("Starting: %s, core %d" % (seed.name, core))
 
-    sensors = []
+    # with a master seed, design from the random numbers of this chunk
+    seed = seed.for_task(core)
+    sensors = sensor.SensorList()
     version = 0
     minScore = 0
 
     while version < num_poss_sen:
         version += 1
-        sen = seed.build_sensor(core, version, rec_seq, fixed, thiol)
+        try:
+            sen = seed.build_sensor(core, version, rec_seq, fixed, thiol)
+        except structure.FoldingError as e:
+            sensors.add_failure(e)
+            progress.count(generated=1)
+            continue
 
         # only keep good sensors
         if sen is None:
+            progress.count(generated=1)
             continue
         if sen.score >= minScore:
             sensors.append(sen)
+            progress.count(generated=1, folded=1, accepted=1, score=sen.score)
+        else:
+            sensors.add_rejection(sen.score)
+            progress.count(generated=1, folded=1)
+    progress.beat()
+    foldstore.flush()
 
     # if verbose:
     #     print("Completed: %s, core %d" % (seed.name, core))
     return sensors
 
 
+def init_worker(
+    backend: str | None,
+    profile_dir: str | None,
+    profile_memory: bool,
+    ensemble: bool = False,
+    fold_cache: int = 0,
+    master_seed: int | None = None,
+    heartbeats: Any = None,
+    fold_store: str | None = None,
+) -> None:
+    """
+    init_worker() is the initializer for each process in the Fealden pool. It selects
+    the folding backend and lets it preload anything it reuses between sequences.
+
+    Parameters:
+        backend        <-- a string, the folding backend, or None for FEALDEN_BACKEND
+        profile_dir    <-- a string, the directory for worker profiles, or None
+        profile_memory <-- a bool, also record tracemalloc snapshots when profiling
+        ensemble       <-- a bool, score sensors with partition function populations
+        fold_cache     <-- an integer, the folding results to keep for reuse
+        master_seed    <-- an integer, the seed of the tasks' random number
+                           generators, or None to use the random module
+        heartbeats     <-- a queue to send progress heartbeats to (see progress.py),
+                           or None
+        fold_store     <-- a string, the directory to keep the folds of every
+                           candidate in (see foldstore.py), or None
+    Returns:
+        Nothing
+    """
+    structure.use_backend(backend)
+    structure.use_ensemble(ensemble)
+    structure.use_fold_cache(fold_cache)
+    seed.use_master_seed(master_seed)
+    progress.init_worker(heartbeats)
+    foldstore.init_worker(fold_store)
+    structure.warm_up()
+    if profile_dir is not None:
+        profiling.init_worker(profile_dir, profile_memory)
+
+
+def use_settings(
+    backend: str | None, ensemble: bool, fold_cache: int, master_seed: int | None
+) -> None:
+    """
+    use_settings() selects the backend, ensemble scoring, fold cache size and master
+    seed of this process, as init_worker() does, but leaves those already selected
+    as they are, so the fold cache is only emptied if it has to be.
+    """
+    if structure.backend_name() != backend:
+        structure.use_backend(backend)
+    structure.use_ensemble(ensemble)
+    if structure.fold_cache_size() != fold_cache:
+        structure.use_fold_cache(fold_cache)
+    seed.use_master_seed(master_seed)
+
+
+def pool_context(
+    start_method: str | None, backend: str | None
+) -> multiprocessing.context.BaseContext:
+    """
+    pool_context() returns the multiprocessing context to create the Fealden pool
+    with. Under the forkserver start method, the server preloads fealden, dotenv and
+    the modules of the backend, so each worker is forked with them already imported
+    instead of importing them again (as spawned workers do). The server outlives
+    the pool, so later runs in the same process start their workers from it too.
+
+    Parameters:
+        start_method <-- a string, 'fork', 'spawn' or 'forkserver', or None for the
+                         default start method of the platform
+        backend      <-- a string, the folding backend, or None for FEALDEN_BACKEND
+    Returns:
+        a multiprocessing context
+    """
+    context = multiprocessing.get_context(start_method)
+    if context.get_start_method() == "forkserver":
+        context.set_forkserver_preload(
+            [f"{__package__}.fealden", "dotenv", *structure.backend_modules(backend)]
+        )
+    return context
+
+
+def parse_seed_file(
+    lines: list[str], rec_seq: str, binding_state: int, max_sensor_size: int
+) -> list[seed.Seed]:
+    """
+    parse_seed_file() is a simple method for parsing the seedGraph file.
+    A seed graph file looks like this:
+        Seed Graph 1:   <- The following information is for the first seed graph
+        2               <- The name of the node which contains the recognition seq
+        2 1 3 3 5
+        3 2 2
+        5 2 4
+        4 5 7 7 0
+        7 4 4
+        Seed Graph 2:
+        4
+        1 0 2
+        2 1 3 3 5
+        3 2 2
+        5 2 4
+        4 5 7 7 0
+        7 4 4
+        .
+        .
+        .
+    See the comment for the "make_graph" method of the seed class for an explenation
+    of how the data given corrilates to a graph.
+
+    This method breaks the data into chunks, one per seed graph, where each chunk is
+    a list containing all the info about that particular graph. Then each list
+    is used to generate a new seed graph using the class Seed. A list of Seed objs
+    is returned.
+
+    Parameters:
+        lines           <-- a list of str, each a line of the seed graph data file
+        rec_seq         <-- a string, the recognition sequence
+        binding_state   <-- an integer, 0 or 1, the binding state of rec_seq
+        max_sensor_size <-- an integer, the max number of bases in a sensor
+
+    Reutrns:
+        seeds <-- a list of objects of the class "Seed"
+    """
+
+    seeds = []
+    i = 0
+    li = lines[i]
+    seed_num = 0
+    while i < (len(lines)):
+        i += 1
+        li = lines[i]
+        graph_data = []
+        rec_node_name = "-1"
+        seed_num += 1
+        while i < (len(lines)) and lines[i].split()[0] != "Seed":
+            li = lines[i].strip()
+            if len(li) == 1:
+                rec_node_name = li
+                i += 1
+                continue
+            graph_data.append(li)
+            i += 1
+        seeds.append(
+            seed.Seed(
+                graph_data,
+                rec_node_name,
+                rec_seq,
+                binding_state,
+                str("Graph " + str(seed_num)),
+                max_sensor_size,
+            )
+        )
+    return seeds
+
+
+def design_seeds(
+    rec_seq: str, binding_state: int, max_sensor_size: int, min_sens_per_seed: int
+) -> list[seed.Seed]:
+    """
+    design_seeds() checks the arguments of a design, and returns the seeds of the
+    seed graphs for its binding state.
+
+    Parameters:
+        rec_seq           <-- a string, the recognition sequence
+        binding_state     <-- an integer, 0 or 1, the binding state of the
+                              recognition sequence
+        max_sensor_size   <-- an integer, the max number of bases in a sensor
+        min_sens_per_seed <-- an integer, the potential sensors to be generated
+                              from each seed graph
+    Returns:
+        a list of Seeds
+    Raises:
+        ValueError, if the recognition sequence is empty or not DNA, the binding
+        state is not 0 or 1, the max sensor size is 20 or less, or fewer than one
+        sensor per seed is asked for
+    """
+    if not rec_seq or re.search("[^atgc]", rec_seq, re.IGNORECASE):
+        raise ValueError(f"Invalid recognition sequence {rec_seq!r}")
+    if binding_state not in (0, 1):
+        raise ValueError(f"Invalid binding state {binding_state}")
+    if max_sensor_size <= 20:
+        raise ValueError(
+            f"Maximum sensor size {max_sensor_size} is too low, it must be greater"
+            " than 20"
+        )
+    if min_sens_per_seed < 1:
+        raise ValueError(
+            f"Invalid number of sensors per seed {min_sens_per_seed}, it must be at"
+            " least 1"
+        )
+
+    # Pulled seed file constructs into program to reduce file reads and
+    # remove file dependencies
+    return parse_seed_file(
+        SEED_GRAPHS[int(binding_state)], rec_seq.lower(), binding_state, max_sensor_size
+    )
+
+
+class Designer:
+
+    """
+    Designer designs sensors for one recognition sequence after another, keeping its
+    worker pool, and the backend and fold cache in each worker, alive between
+    designs. It is used as a context manager, which shuts the pool down:
+
+        with Designer(backend="mfold") as designer:
+            for target in targets:
+                sensors = designer.design(target, 1)
+
+    Parameters:
+        backend        <-- a string, the folding backend to use (see structure.py);
+                           FEALDEN_BACKEND is used if this is None.
+        ensemble       <-- a bool, score the on and off states with populations from
+                           the partition function of the backend (see structure.py).
+        jobs           <-- an integer, the worker processes, or None to size the
+                           pool to the available CPUs (see resources.py).
+        fold_concurrency <-- an integer, the most folds each worker keeps in flight
+                             (see asyncfold.py).
+        memory_budget  <-- a float, the MB of memory the workers and folds in
+                           flight may use, or None for no limit.
+        start_method   <-- a string, the multiprocessing start method of the pool
+                           ('fork', 'spawn' or 'forkserver'), or None for the
+                           platform default (see pool_context()).
+        event_loop     <-- a bool, fold from one event loop in this process instead
+                           of the worker pool.
+        fold_cache     <-- an integer, the folding results each worker keeps, so
+                           sequences designed again are not folded again.
+        profile_dir    <-- a string, if given every worker is profiled with cProfile
+                           and the profiles are written to this directory.
+        profile_memory <-- a bool, also record tracemalloc snapshots when profiling.
+        master_seed    <-- an integer; if given, the candidates of each seed graph
+                           are split into chunks of CHUNK_SIZE, each designed from
+                           random numbers seeded from master_seed and the chunk, so
+                           a design finds the same sensors whatever the pool.
+        shard          <-- a tuple (i, n): design only the chunks of shard i of n,
+                           with master_seed (0 if None), so n runs with the same
+                           master seed split the candidates between them.
+        progress_format <-- a string, 'line' or 'json', to report the progress of
+                            each design from the workers' heartbeats to stderr
+                            (see progress.py), or None for no report.
+        fold_store     <-- a string, a directory each worker appends the folds of
+                           every candidate to, to score them again with `fealden
+                           rescore` (see foldstore.py), or None.
+    Returns:
+        an object of the class Designer
+    """
+
+    # folding results kept by each worker, see structure.use_fold_cache()
+    FOLD_CACHE_SIZE = 1000
+    # candidates of a seed graph in each task, with a master seed
+    CHUNK_SIZE = 50
+
+    def __init__(
+        self,
+        backend: str | None = None,
+        ensemble: bool = False,
+        jobs: int | None = None,
+        fold_concurrency: int = 1,
+        memory_budget: float | None = None,
+        start_method: str | None = None,
+        event_loop: bool = False,
+        fold_cache: int = FOLD_CACHE_SIZE,
+        profile_dir: str | None = None,
+        profile_memory: bool = False,
+        master_seed: int | None = None,
+        shard: tuple[int, int] | None = None,
+        progress_format: str | None = None,
+        fold_store: str | None = None,
+    ) -> None:
+        """Initialize new Designer instance, checking the backend is available."""
+        self.backend = backend
+        self.ensemble = ensemble
+        self.start_method = start_method
+        self.event_loop = event_loop
+        self.fold_cache = fold_cache
+        self.profile_dir = profile_dir
+        self.profile_memory = profile_memory
+        if shard is not None and not 0 <= shard[0] < shard[1]:
+            raise ValueError(f"Invalid shard {shard[0]}/{shard[1]}")
+        self.shard = shard
+        self.master_seed = 0 if master_seed is None and shard else master_seed
+        if progress_format is not None and progress_format not in progress.FORMATS:
+            raise ValueError(f"Unknown progress format {progress_format}")
+        self.progress_format = progress_format
+        # the queue the workers send their heartbeats to, with progress_format
+        self.heartbeats: Any = None
+        self.fold_store = fold_store
+
+        # fail now, rather than in every worker, if the backend is unavailable
+        structure.load_backend(backend)
+
+        # a single event loop process can only reduce the folds in flight
+        self.workers, self.fold_concurrency = resources.plan(
+            1 if event_loop else jobs, fold_concurrency, memory_budget
+        )
+        self.pool: Any = None
+        # the settings of this process an event loop designer replaced, for close()
+        self.replaced: tuple[str | None, bool, int, int | None] | None = None
+        self.fold_stats: asyncfold.FoldStats | None = None
+        self.task_errors: list[BaseException] = []
+        # the candidates of each design of the last design_many()
+        self.candidates: list[int] = []
+        self.time_to_first_result: float | None = None
+        self.elapsed = 0.0
+
+    def __enter__(self) -> "Designer":  # noqa: PYI034
+        """Start the worker pool."""
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        """Shut the worker pool down."""
+        self.close()
+
+    def start(self) -> None:
+        """
+        start() creates the worker pool, unless it is running or the designer uses an
+        event loop, in which case this process is prepared to fold instead, with the
+        backend and settings of the designer (see use_settings()).
+        """
+        if self.event_loop:
+            if self.replaced is None:
+                self.replaced = (
+                    structure.backend_name(),
+                    structure.ensemble_enabled(),
+                    structure.fold_cache_size(),
+                    seed.master_seed(),
+                )
+            # selected on every design, as another designer may have changed them
+            use_settings(self.backend, self.ensemble, self.fold_cache, self.master_seed)
+            if self.progress_format is not None and self.heartbeats is None:
+                self.heartbeats = queue.SimpleQueue()
+            progress.init_worker(self.heartbeats)
+            foldstore.init_worker(self.fold_store)
+            structure.warm_up()
+        elif self.pool is None:
+            if self.profile_dir is not None:
+                profiling.clear_profiles(self.profile_dir)
+            context = pool_context(self.start_method, self.backend)
+            if self.progress_format is not None:
+                self.heartbeats = context.SimpleQueue()
+            self.pool = context.Pool(
+                self.workers,
+                initializer=init_worker,
+                initargs=(
+                    self.backend,
+                    self.profile_dir,
+                    self.profile_memory,
+                    self.ensemble,
+                    self.fold_cache,
+                    self.master_seed,
+                    self.heartbeats,
+                    self.fold_store,
+                ),
+            )
+
+    def close(self) -> None:
+        """
+        close() waits for the workers to finish their tasks, and stops them. An event
+        loop designer restores the settings of this process start() replaced.
+        """
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
+        if self.heartbeats is not None:
+            progress.init_worker(None)
+            self.heartbeats = None
+        if self.event_loop and self.fold_store is not None:
+            foldstore.init_worker(None)
+        if self.replaced is not None:
+            use_settings(*self.replaced)
+            self.replaced = None
+
+    def reporter(self, total: int) -> progress.Reporter | None:
+        """
+        reporter() starts a progress.Reporter of the workers' heartbeats for a
+        design of total candidates, if the designer reports progress.
+        """
+        if self.heartbeats is None or self.progress_format is None:
+            return None
+        reporter = progress.Reporter(self.heartbeats, total, self.progress_format)
+        reporter.start()
+        return reporter
+
+    def design(
+        self,
+        rec_seq: str,
+        binding_state: int,
+        max_sensor_size: int = 50,
+        min_sens_per_seed: int = 500,
+        fixed: bool = False,
+        thiol: bool = True,
+        checkpoint: checkpoint.Checkpoint | None = None,
+        found: Callable[[int, sensor.SensorList], None] | None = None,
+    ) -> sensor.SensorList:
+        """
+        design() generates and scores candidate sensors for a recognition sequence,
+        in the worker pool (which is started if needed). Candidates which could not
+        be folded are counted in the result, and the errors of tasks which failed
+        outright are kept in task_errors; if every task failed, the first error is
+        raised.
+
+        Parameters:
+            rec_seq           <-- a string, the recognition sequence
+            binding_state     <-- an integer, 0 or 1, the binding state of the
+                                  recognition sequence
+            max_sensor_size   <-- an integer, the max number of bases in a sensor
+            min_sens_per_seed <-- an integer, the potential sensors to be generated
+                                  per seed graph
+            fixed             <-- bool, is methylene blue fixed at 3' terminus
+            thiol             <-- bool, is thiol fixed at 3' terminus
+            checkpoint        <-- a checkpoint.Checkpoint of this design, or None
+                                  (see design_many())
+            found             <-- a function, called with the sensors of each task
+                                  as it completes, or None (see design_many())
+        Returns:
+            a SensorList of the valid sensors, each sequence once, best score first
+        """
+        design = (
+            rec_seq,
+            binding_state,
+            max_sensor_size,
+            min_sens_per_seed,
+            fixed,
+            thiol,
+        )
+        return self.design_many([design], checkpoint=checkpoint, found=found)[0]
+
+    def seed_tasks(
+        self,
+        rec_seq: str,
+        binding_state: int,
+        max_sensor_size: int,
+        min_sens_per_seed: int,
+        fixed: bool,
+        thiol: bool,
+    ) -> list[tuple[seed.Seed, str, float, int, bool, bool]]:
+        """
+        seed_tasks() checks the arguments of a design (see design()) and returns its
+        tasks, the arguments of generate_sensor() for every seed graph and worker, or
+        with a master seed, for every chunk of each seed graph's candidates in the
+        shard.
+        """
+        rec_seq = rec_seq.lower()
+        seeds = design_seeds(rec_seq, binding_state, max_sensor_size, min_sens_per_seed)
+
+        # recommendedSensPerSeed = 10 * len(recSeq) *\
+        #     ((50 - maxSensorSize) if (maxSensorSize < 40) else (10))
+        poss_sens_per_seed = min_sens_per_seed
+
+        # FIXME: Implement recommendedSensPerSeed
+        # recommendedSensPerSeed if \
+        # recommendedSensPerSeed < minSensPerSeed else minSensPerSeed
+
+        if self.master_seed is not None:
+            index, count = self.shard or (0, 1)
+            chunk_tasks: list[tuple[seed.Seed, str, float, int, bool, bool]] = []
+            number = 0
+            for start in range(0, poss_sens_per_seed, self.CHUNK_SIZE):
+                size = min(self.CHUNK_SIZE, poss_sens_per_seed - start)
+                chunk = start // self.CHUNK_SIZE + 1
+                # the seed graphs in turn, so every shard has chunks of each
+                for s in seeds:
+                    if number % count == index:
+                        chunk_tasks.append((s, rec_seq, size, chunk, fixed, thiol))
+                    number += 1
+            return chunk_tasks
+
+        seed_sens_per_process = poss_sens_per_seed / self.workers
+
+        tasks = []
+        i = 0
+        while i < self.workers:
+            i += 1
+            tasks.extend(
+                [(s, rec_seq, seed_sens_per_process, i, fixed, thiol) for s in seeds]
+            )
+        return tasks
+
+    def submit(
+        self,
+        t: tuple[Any, ...],
+        callback: Callable[[sensor.SensorList], None],
+        error_callback: Callable[[BaseException], None],
+    ) -> Any:
+        """
+        submit() queues a task of seed_tasks() on the worker pool, started with
+        start(), and returns its multiprocessing AsyncResult.
+
+        Parameters:
+            t              <-- a tuple, the arguments of generate_sensor()
+            callback       <-- a function, called with the SensorList of the task
+            error_callback <-- a function, called with the exception of the task if
+                               it fails
+        Returns:
+            a multiprocessing.pool.AsyncResult
+        """
+        task: Callable[..., sensor.SensorList] = generate_sensor
+        args: tuple[Any, ...] = t
+        if self.fold_concurrency > 1:
+            # keep several folds in flight in each worker
+            task, args = asyncfold.generate_sensor, (*t, self.fold_concurrency)
+        if self.profile_dir is not None:
+            # wrap each task so the worker's profiler records it
+            task, args = profiling.run_profiled, (task, *args)
+        return self.pool.apply_async(
+            task, args, callback=callback, error_callback=error_callback
+        )
+
+    def design_many(
+        self,
+        designs: Sequence[tuple[str, int, int, int, bool, bool]],
+        progress: Callable[[int, int, int, sensor.SensorList], None] | None = None,
+        cancelled: Callable[[int], bool] | None = None,
+        checkpoint: checkpoint.Checkpoint | None = None,
+        found: Callable[[int, sensor.SensorList], None] | None = None,
+    ) -> list[sensor.SensorList]:
+        """
+        design_many() runs several designs over the one worker pool. Their tasks are
+        submitted in turn, one of each design at a time, so every design makes
+        progress and the first designs do not hold up the last. Fold results cached
+        by the workers are shared between the designs. Only two tasks per worker are
+        queued at a time, so the remaining tasks of a design cancelled meanwhile are
+        skipped (and counted as done).
+
+        Parameters:
+            designs    <-- a list of the arguments of design(), as tuples
+            progress   <-- a function, called as tasks complete with the index of the
+                           design, its tasks done and in total, and its results so far
+            cancelled  <-- a function, called with the index of a design before each
+                           of its tasks is started, returning whether to skip it
+            checkpoint <-- a checkpoint.Checkpoint of these designs, with a master
+                           seed: only the chunks it has not done are designed, and
+                           it is saved as they complete, and at the end
+            found      <-- a function, called with the index of a design and the
+                           sensors of each of its tasks as the task completes (and
+                           with those of a checkpoint resumed), before they are
+                           ranked, to write them as the run goes (see
+                           writers.SensorStream)
+        Returns:
+            a list with a SensorList for each design, as design() returns
+        """
+        task_lists = [self.seed_tasks(*each) for each in designs]
+        results = [sensor.SensorList() for _ in designs]
+        done = [0] * len(designs)
+        if checkpoint is not None:
+            if self.master_seed is None:
+                raise ValueError("Checkpoints need a master seed")
+            checkpoint.check(designs, self.master_seed, self.shard)
+            # carry on from the sensors found, and skip the chunks done
+            results = checkpoint.results
+            if found is not None:
+                for index, result in enumerate(results):
+                    found(index, result)
+            for index, tasks in enumerate(task_lists):
+                done[index] = sum(checkpoint.is_done(index, t) for t in tasks)
+            todo = [
+                [t for t in tasks if not checkpoint.is_done(index, t)]
+                for index, tasks in enumerate(task_lists)
+            ]
+        else:
+            todo = task_lists
+        time_zero = timeit.default_timer()
+        self.task_errors = []
+        self.candidates = [round(sum(t[2] for t in tasks)) for tasks in task_lists]
+        self.time_to_first_result = None
+
+        def completed(index: int, tasks: int = 1) -> None:
+            done[index] += tasks
+            if progress is not None:
+                progress(index, done[index], len(task_lists[index]), results[index])
+
+        # tasks queued or running in the pool
+        slots = threading.BoundedSemaphore(2 * self.workers)
+
+        def collect_result(
+            index: int, t: tuple[Any, ...], result: sensor.SensorList
+        ) -> None:
+            if self.time_to_first_result is None:
+                self.time_to_first_result = timeit.default_timer() - time_zero
+            results[index].merge(result)
+            if found is not None:
+                found(index, result)
+            if checkpoint is not None:
+                checkpoint.task_done(index, t)
+            completed(index)
+
+        def collector(
+            index: int, t: tuple[Any, ...]
+        ) -> Callable[[sensor.SensorList], None]:
+            def collect(result: sensor.SensorList) -> None:
+                collect_result(index, t, result)
+                slots.release()
+
+            return collect
+
+        def error_collector(index: int) -> Callable[[BaseException], None]:
+            def collect_error(error: BaseException) -> None:
+                self.task_errors.append(error)
+                completed(index)
+                slots.release()
+
+            return collect_error
+
+        self.start()
+        reporter = self.reporter(sum(int(t[2]) for tasks in todo for t in tasks))
+        try:
+            if self.event_loop:
+                self.fold_stats = asyncfold.FoldStats()
+                for index, seed_tasks in enumerate(todo):
+                    if cancelled is not None and cancelled(index):
+                        completed(index, len(seed_tasks))
+                        continue
+                    # collect each task as it completes, as from the pool, so the
+                    # checkpoint is saved as the design goes
+                    asyncio.run(
+                        asyncfold.generate_all(
+                            seed_tasks,
+                            self.fold_concurrency,
+                            self.fold_stats,
+                            task_done=functools.partial(collect_result, index),
+                        )
+                    )
+            else:
+                interleaved = itertools.zip_longest(
+                    *[[(i, t) for t in tasks] for i, tasks in enumerate(todo)]
+                )
+                pending = []
+                for index, t in itertools.chain.from_iterable(
+                    [each for each in turn if each is not None] for turn in interleaved
+                ):
+                    slots.acquire()
+                    if cancelled is not None and cancelled(index):
+                        completed(index)
+                        slots.release()
+                        continue
+                    pending.append(
+                        self.submit(t, collector(index, t), error_collector(index))
+                    )
+                for each in pending:
+                    each.wait()
+        finally:
+            if reporter is not None:
+                reporter.close()
+
+        self.elapsed = timeit.default_timer() - time_zero
+        if checkpoint is not None:
+            checkpoint.save()
+        if self.task_errors and not any(r or r.failed for r in results):
+            raise self.task_errors[0]
+
+        return [each.best_first() for each in results]
+
+
 # *************************************************************************************
 # Generating a Fealden object auto-runs all non-interactive parts of the program.
 # *************************************************************************************
@@ -235,9 +1390,30 @@ class Fealden:
                            in their sensor.
         minSensPerSeed <-- an integer, the minimum number of potential sensors to be
                            generated per seed graph.
-        interactive    <-- a bool for interactive mode to store results in output
-                           attribute, rather than write to a csv file.
+        interactive    <-- a bool for interactive mode to store results in the output
+                           attribute, as results.Results, rather than write a file.
         outputfile     <-- a string, filename to store results in.
+        backend        <-- a string, the folding backend to use (see structure.py);
+                           FEALDEN_BACKEND is used if this is None.
+        profile_dir    <-- a string, if given every worker is profiled with cProfile
+                           and the profiles are written to this directory.
+        profile_memory <-- a bool, also record tracemalloc snapshots when profiling.
+        ensemble       <-- a bool, score the on and off states with populations from
+                           the partition function of the backend (see structure.py).
+        fold_concurrency <-- an integer, the most folds each worker keeps in flight
+                             (see asyncfold.py).
+        event_loop     <-- a bool, fold from one event loop in this process instead
+                           of the worker pool.
+        jobs           <-- an integer, the worker processes, or None to size the
+                           pool to the available CPUs (see resources.py).
+        memory_budget  <-- a float, the MB of memory the workers and folds in
+                           flight may use, or None for no limit.
+        start_method   <-- a string, the multiprocessing start method of the pool
+                           ('fork', 'spawn' or 'forkserver'), or None for the
+                           platform default (see pool_context()).
+        stream         <-- a bool, write the sensors as the tasks find them, in the
+                           order found, rather than best first at the end (see
+                           writers.SensorStream); only without interactive.
     Returns:
         an object of the class Fealden
     """
@@ -252,6 +1428,27 @@ class Fealden:
         output_file: str,
         fixed: bool,
         thiol: bool,
+        backend: str | None = None,
+        profile_dir: str | None = None,
+        profile_memory: bool = False,
+        ensemble: bool = False,
+        fold_concurrency: int = 1,
+        event_loop: bool = False,
+        jobs: int | None = None,
+        memory_budget: float | None = None,
+        start_method: str | None = None,
+        coordinator: str | None = None,
+        lease_size: int = 100,
+        lease_timeout: float = 60.0,
+        top_k: int | None = None,
+        master_seed: int | None = None,
+        shard: tuple[int, int] | None = None,
+        checkpoint: checkpoint.Checkpoint | None = None,
+        progress_format: str | None = None,
+        db: str | None = None,
+        output_format: str = "csv",
+        fold_store: str | None = None,
+        stream: bool = False,
     ) -> None:
         """Initialize new Fealden instance."""
         self.rec_seq = rec_seq
@@ -259,48 +1456,102 @@ class Fealden:
         self.max_sensor_size = max_sensor_size
         self.output_file = output_file
 
-        # Pulled seed file constructs into program to reduce file reads and
-        # remove file dependencies
-        seeds = self.parse_seed_file(SEED_GRAPHS[int(binding_state)])
-
-        # recommendedSensPerSeed = 10 * len(recSeq) *\
-        #     ((50 - maxSensorSize) if (maxSensorSize < 40) else (10))
-        poss_sens_per_seed = min_sens_per_seed
-
-        # FIXME: Implement recommendedSensPerSeed
-        # recommendedSensPerSeed if \
-        # recommendedSensPerSeed < minSensPerSeed else minSensPerSeed
-
         time_zero = timeit.default_timer()
-        num_process = multiprocessing.cpu_count()
-        pool = multiprocessing.Pool(num_process)
-        seed_sens_per_process = poss_sens_per_seed / num_process
-
-        tasks = []
-        sensors: dict[str, sensor.Sensor] = {}
-
-        i = 0
-        while i < num_process:
-            i += 1
-            tasks.extend(
-                [
-                    (s, self.rec_seq, seed_sens_per_process, i, fixed, thiol)
-                    for s in seeds
-                ]
+        designer: Designer | distributed.Coordinator
+        if coordinator is not None:
+            # score on `fealden worker` processes, anywhere on the network
+            designer = distributed.Coordinator(
+                coordinator,
+                backend=backend,
+                ensemble=ensemble,
+                fold_concurrency=fold_concurrency,
+                lease_size=lease_size,
+                lease_timeout=lease_timeout,
+                top_k=top_k,
+                master_seed=master_seed,
             )
-
-        for t in tasks:
-            pool.apply_async(
-                generate_sensor,
-                t,
-                callback=lambda result: sensors.update(
-                    [(r.seq, r) for r in result]  # type: ignore[attr-defined]
-                ),
+            # the key is a secret, so it is not echoed to the output (and logs)
+            # unless it was made up, and then only to stderr
+            print(
+                f"Serving leases on {designer.address}; start workers with\n"
+                f"    {distributed.AUTHKEY_VARIABLE}=KEY "
+                f"fealden worker HOST:{designer.address.rpartition(':')[2]}\n"
+                f"with KEY the key in {distributed.AUTHKEY_VARIABLE}",
+                flush=True,
             )
-        pool.close()
-        pool.join()
+            if designer.key_generated:
+                print(
+                    f"{distributed.AUTHKEY_VARIABLE} is not set; generated the key "
+                    f"{designer.key.decode()}",
+                    file=sys.stderr,
+                    flush=True,
+                )
+        else:
+            designer = Designer(
+                backend=backend,
+                ensemble=ensemble,
+                jobs=jobs,
+                fold_concurrency=fold_concurrency,
+                memory_budget=memory_budget,
+                start_method=start_method,
+                event_loop=event_loop,
+                profile_dir=profile_dir,
+                profile_memory=profile_memory,
+                master_seed=master_seed,
+                shard=shard,
+                progress_format=progress_format,
+                fold_store=fold_store,
+            )
+        streamed = None
+        if stream and not interactive:
+            streamed = writers.SensorStream(self.open_writer(output_format))
+        with designer:
+            if verbose and coordinator is None:
+                print(
+                    f"Using {designer.workers} worker(s), each keeping up to "
+                    f"{designer.fold_concurrency} fold(s) in flight"
+                )
+            args = (
+                rec_seq,
+                binding_state,
+                max_sensor_size,
+                min_sens_per_seed,
+                fixed,
+                thiol,
+            )
+            try:
+                if isinstance(designer, Designer):
+                    s = designer.design(
+                        *args,
+                        checkpoint=checkpoint,
+                        found=(
+                            None
+                            if streamed is None
+                            else lambda index, found: streamed.add(found)
+                        ),
+                    )
+                else:
+                    s = designer.design(*args)
+            finally:
+                if streamed is not None:
+                    with streamed.writer:
+                        streamed.flush()
+                    self.output_file = streamed.writer.path
+        self.time_to_first_result = designer.time_to_first_result
+        self.elapsed = timeit.default_timer() - time_zero
 
-        s = sorted(sensors.values(), key=lambda sen: sen.score)
+        if designer.fold_stats is not None:
+            print(designer.fold_stats.summary())
+        if verbose and self.time_to_first_result is not None:
+            print(f"First result after {self.time_to_first_result:.3f} seconds")
+        self.report_failures(s, designer.task_errors)
+        if db is not None:
+            store_results(db, [args], [s], designer)
+        if profile_dir is not None:
+            merged = profiling.merge_profiles(profile_dir)
+            if merged is not None:
+                print("Wrote merged worker profile to " + merged)
+                profiling.print_hot_spots(merged)
 
         if len(s) == 0:
             print(
@@ -314,93 +1565,61 @@ class Fealden:
             return None
 
         if not interactive:
-            try:
-                f = open(self.output_file, "w")
-            except OSError:
-                print("Unable to open " + self.output_file)
-                self.output_file = "recent-results.csv"
-                f = open(self.output_file, "w")
-
-            f.write(sensor.Sensor.csv_header() + "\n")
-            for sen in s:
-                f.write(str(sen) + "\n")
-            f.close()
+            if streamed is None:
+                with self.open_writer(output_format) as writer:
+                    writer.write_all(s)
+                self.output_file = writer.path
 
             print("Stored " + str(len(s)) + " result(s) in " + self.output_file)
             print("Took " + str(timeit.default_timer() - time_zero) + " seconds")
         else:
-            output_list = []
-            output_list.append(sensor.Sensor.csv_header())
-            for sen in s:
-                output_list.append(str(sen))
-            self.output = output_list
+            self.output = results.Results.from_sensors(s)
 
-    def parse_seed_file(self, lines: list[str]) -> list[seed.Seed]:
+    def open_writer(self, output_format: str) -> writers.ResultWriter:
         """
-        parse_seed_file() is a simple method for parsing the seedGraph file.
-        A seed graph file looks like this:
-            Seed Graph 1:   <- The following information is for the first seed graph
-            2               <- The name of the node which contains the recognition seq
-            2 1 3 3 5
-            3 2 2
-            5 2 4
-            4 5 7 7 0
-            7 4 4
-            Seed Graph 2:
-            4
-            1 0 2
-            2 1 3 3 5
-            3 2 2
-            5 2 4
-            4 5 7 7 0
-            7 4 4
-            .
-            .
-            .
-        See the comment for the "make_graph" method of the seed class for an explenation
-        of how the data given corrilates to a graph.
-
-        This method breaks the data into chunks, one per seed graph, where each chunk is
-        a list containing all the info about that particular graph. Then each list
-        is used to generate a new seed graph using the class Seed. A list of Seed objs
-        is returned.
-
-        Parameters:
-            lines <-- a list of str, each str is a line in the seed graph data file
+        open_writer() opens the output file in a format (see writers.py), or
+        recent-results.csv (with the suffix of the format) if it cannot be opened.
+        """
+        try:
+            return writers.open_writer(self.output_file, output_format)
+        except OSError:
+            print("Unable to open " + self.output_file)
+            return writers.open_writer("recent-results.csv", output_format)
 
-        Reutrns:
-            seeds <-- a list of objects of the class "Seed"
+    @staticmethod
+    def report_failures(
+        results: sensor.SensorList, task_errors: Sequence[BaseException | str]
+    ) -> None:
         """
+        report_failures() prints how many candidate sensors could not be folded, and
+        which tasks failed outright, so no work is lost without a report.
 
-        seeds = []
-        i = 0
-        li = lines[i]
-        seed_num = 0
-        while i < (len(lines)):
-            i += 1
-            li = lines[i]
-            graph_data = []
-            rec_node_name = "-1"
-            seed_num += 1
-            while i < (len(lines)) and lines[i].split()[0] != "Seed":
-                li = lines[i].strip()
-                if len(li) == 1:
-                    rec_node_name = li
-                    i += 1
-                    continue
-                graph_data.append(li)
-                i += 1
-            seeds.append(
-                seed.Seed(
-                    graph_data,
-                    rec_node_name,
-                    self.rec_seq,
-                    self.binding_state,
-                    str("Graph " + str(seed_num)),
-                    self.max_sensor_size,
-                )
+        Parameters:
+            results     <-- a SensorList, the results of all the tasks
+            task_errors <-- a list of the exceptions raised by failed tasks (or their
+                            messages, from distributed workers)
+        Returns:
+            Nothing
+        """
+        if results.failed:
+            print(
+                f"Could not fold {results.failed} candidate sensor(s); "
+                f"last error: {results.error}"
             )
-        return seeds
+        if task_errors:
+            print(
+                f"{len(task_errors)} task(s) failed and generated no sensors; "
+                f"last error: {task_errors[-1]!r}"
+            )
+
+    def parse_seed_file(self, lines: list[str]) -> list[seed.Seed]:
+        """
+        parse_seed_file() parses seed graph data (see the module function
+        parse_seed_file()) into seeds for the recognition sequence of this object.
+        """
+        return parse_seed_file(
+            lines, self.rec_seq, self.binding_state, self.max_sensor_size
+        )
 
 
 # run the program from the command line; preserved here for compatibility
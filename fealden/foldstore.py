@@ -0,0 +1,421 @@
+"""Keep the folds of every candidate, to score them again without folding them.
+
+With --fold-store DIR, each worker appends every candidate it folds to its own
+file in DIR, rejected or not: the sequence, the design it came from, and the free
+energy and pair table of each fold, in a compact binary record (see encode()).
+Folding is nearly all of the cost of a run, so scoring the stored candidates with
+other Thresholds (see sensor.py) takes a small fraction of it:
+
+    fealden rescore DIR -o rescored.csv --max-on-dist 14 --signal-gain-weight 5
+
+rebuilds the Folds of each candidate and picks its tag and score again, over a
+pool of processes, and writes the sensors accepted, best first. Sensors scored
+with --ensemble are rescored from their folds alone, as the partition function of
+the backend is not stored.
+
+A file starts with MAGIC, followed by its records. Each record starts with RECORD:
+its length in bytes, the lengths of the sequence, seed name and target, the number
+of folds, flags, and the recognition and response sequence positions; then the
+sequence, seed name and target as ASCII, the free energies as float64, and the
+partner of each base in each fold (0 if unpaired) as uint8, or as uint16 for
+sequences of 256 bases or more. Numbers are little endian.
+"""
+
+import argparse
+import itertools
+import multiprocessing
+import os
+import struct
+import sys
+import timeit
+from array import array
+from collections.abc import Iterator
+from typing import BinaryIO, NamedTuple
+
+from . import resources, sensor, writers
+
+# the first bytes of a fold store file
+MAGIC = b"FEALDEN-FOLDS-2\n"
+# the suffix of the files of a fold store
+SUFFIX = ".folds"
+# record length, sequence length, folds, flags, seed name length, target length,
+# recognition sequence start and end, response sequence start and end
+RECORD = struct.Struct("<IHHBBHhhhh")
+# the flags of a record
+FIXED, THIOL, BINDS_SINGLE_STRANDED, WIDE = 1, 2, 4, 8
+# candidates rescored in each task
+CHUNK_SIZE = 2000
+
+StructureDict = list[dict[str, float | list[list[int]]]]
+
+
+class Candidate(NamedTuple):
+    """A candidate sensor read from a fold store: its sequence, folds and design."""
+
+    seq: str
+    structure_dict: StructureDict
+    rec_seq: dict[str, int]
+    resp_seq: dict[str, int]
+    binding_state: int
+    seed_name: str
+    base_seq: str
+    fixed: bool
+    thiol: bool
+
+    def sensor(self, thresholds: sensor.Thresholds | None = None) -> sensor.Sensor:
+        """Return the candidate scored as a Sensor, with thresholds if given."""
+        return sensor.Sensor(
+            (self.seq, self.structure_dict),
+            self.rec_seq,
+            self.resp_seq,
+            self.binding_state,
+            self.seed_name,
+            self.base_seq,
+            self.fixed,
+            self.thiol,
+            thresholds=thresholds,
+        )
+
+
+def to_little_endian(values: array) -> bytes:  # type: ignore[type-arg]
+    """Return the bytes of an array in little endian order."""
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def from_little_endian(typecode: str, data: bytes) -> array:  # type: ignore[type-arg]
+    """Return an array of typecode from bytes in little endian order."""
+    values = array(typecode, data)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+def encode(candidate: Candidate) -> bytes:
+    """
+    encode() returns the record of a candidate, as described at the top of this
+    module.
+
+    Parameters:
+        candidate <-- a Candidate
+    Returns:
+        bytes, the record
+    """
+    length = len(candidate.seq)
+    wide = length >= 256
+    flags = (
+        (FIXED if candidate.fixed else 0)
+        | (THIOL if candidate.thiol else 0)
+        | (BINDS_SINGLE_STRANDED if candidate.binding_state else 0)
+        | (WIDE if wide else 0)
+    )
+    seed_name = candidate.seed_name.encode("ascii")
+    base_seq = candidate.base_seq.encode("ascii")
+    energies = array(
+        "d",
+        (float(each["deltaG"]) for each in candidate.structure_dict),  # type: ignore
+    )
+    partners = array(
+        "H" if wide else "B",
+        (
+            partner
+            for each in candidate.structure_dict
+            for _, partner in each["bps"]  # type: ignore[union-attr]
+        ),
+    )
+    body = b"".join(
+        (
+            candidate.seq.encode("ascii"),
+            seed_name,
+            base_seq,
+            to_little_endian(energies),
+            to_little_endian(partners),
+        )
+    )
+    header = RECORD.pack(
+        RECORD.size + len(body),
+        length,
+        len(energies),
+        flags,
+        len(seed_name),
+        len(base_seq),
+        candidate.rec_seq["start"],
+        candidate.rec_seq["end"],
+        candidate.resp_seq["start"],
+        candidate.resp_seq["end"],
+    )
+    return header + body
+
+
+def decode(record: bytes) -> Candidate:
+    """decode() returns the Candidate of a record written by encode()."""
+    (
+        _,
+        length,
+        folds,
+        flags,
+        name_length,
+        base_length,
+        rec_start,
+        rec_end,
+        resp_start,
+        resp_end,
+    ) = RECORD.unpack_from(record)
+    offset = RECORD.size
+    fields = []
+    for size in (length, name_length, base_length):
+        fields.append(record[offset : offset + size].decode("ascii"))
+        offset += size
+    energies = from_little_endian("d", record[offset : offset + 8 * folds])
+    offset += 8 * folds
+    partners = from_little_endian("H" if flags & WIDE else "B", record[offset:])
+    structure_dict: StructureDict = [
+        {
+            "deltaG": energies[number],
+            "bps": [
+                [base + 1, partners[number * length + base]] for base in range(length)
+            ],
+        }
+        for number in range(folds)
+    ]
+    return Candidate(
+        fields[0],
+        structure_dict,
+        {"start": rec_start, "end": rec_end},
+        {"start": resp_start, "end": resp_end},
+        1 if flags & BINDS_SINGLE_STRANDED else 0,
+        fields[1],
+        fields[2],
+        bool(flags & FIXED),
+        bool(flags & THIOL),
+    )
+
+
+# Per-worker state, set by init_worker() in each pool process
+_file: BinaryIO | None = None
+
+
+def init_worker(directory: str | None) -> None:
+    """
+    init_worker() opens the file of this process in the fold store directory, to
+    append the candidates it folds to, or closes it if directory is None.
+    """
+    global _file
+    if _file is not None:
+        _file.close()
+        _file = None
+    if directory is None:
+        return
+    os.makedirs(directory, exist_ok=True)
+    _file = open(os.path.join(directory, f"worker-{os.getpid()}{SUFFIX}"), "ab")
+    if _file.tell() == 0:
+        _file.write(MAGIC)
+
+
+def add(candidate: Candidate) -> None:
+    """add() appends a candidate to the file of this process, if it has one."""
+    if _file is not None:
+        _file.write(encode(candidate))
+
+
+def flush() -> None:
+    """
+    flush() writes the candidates added so far to the file of this process, at the
+    end of each task, as pool processes exit without flushing their files.
+    """
+    if _file is not None:
+        _file.flush()
+
+
+def store_files(path: str) -> list[str]:
+    """Return the files of a fold store directory, or path itself if it is a file."""
+    if os.path.isdir(path):
+        return sorted(
+            os.path.join(path, name)
+            for name in os.listdir(path)
+            if name.endswith(SUFFIX)
+        )
+    return [path]
+
+
+def read_header(f: BinaryIO, path: str) -> None:
+    """Read MAGIC from the start of a file, or raise a ValueError."""
+    if f.read(len(MAGIC)) != MAGIC:
+        raise ValueError(f"{path} is not a fold store file")
+
+
+def chunks(path: str, size: int = CHUNK_SIZE) -> Iterator[tuple[str, int, int]]:
+    """
+    chunks() splits a fold store file into byte ranges of up to size records each,
+    reading only the length of each record. A record cut short at the end of the
+    file, as by a worker which was killed, is left out.
+
+    Parameters:
+        path <-- a string, the file
+        size <-- an integer, the most records in each range
+    Returns:
+        an iterator of (path, start, end), the byte ranges
+    """
+    file_size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        read_header(f, path)
+        start = offset = f.tell()
+        records = 0
+        while offset + RECORD.size <= file_size:
+            f.seek(offset)
+            (length,) = struct.unpack("<I", f.read(4))
+            if offset + length > file_size:
+                break
+            offset += length
+            records += 1
+            if records == size:
+                yield (path, start, offset)
+                start, records = offset, 0
+        if records:
+            yield (path, start, offset)
+
+
+def read(path: str, start: int, end: int) -> Iterator[Candidate]:
+    """read() yields the candidates in a byte range of a file, from chunks()."""
+    with open(path, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+    offset = 0
+    while offset < len(data):
+        (length,) = struct.unpack_from("<I", data, offset)
+        yield decode(data[offset : offset + length])
+        offset += length
+
+
+def rescore(
+    chunk: tuple[str, int, int],
+    thresholds: sensor.Thresholds,
+    target: str | None = None,
+) -> tuple[sensor.SensorList, int]:
+    """
+    rescore() scores the candidates in a byte range of a fold store file with
+    thresholds. It is the task of the rescore pool.
+
+    Parameters:
+        chunk      <-- a tuple (path, start, end), from chunks()
+        thresholds <-- a sensor.Thresholds
+        target     <-- a string, to score only the candidates for this target, or
+                       None for all
+    Returns:
+        (sensors, candidates), a SensorList of the sensors accepted, and the
+        number of candidates scored
+    """
+    sensors = sensor.SensorList()
+    scored = 0
+    for candidate in read(*chunk):
+        if target is not None and candidate.base_seq != target:
+            continue
+        scored += 1
+        sen = candidate.sensor(thresholds)
+        if sen.score >= 0:
+            sensors.append(sen)
+        else:
+            sensors.add_rejection(sen.score)
+    return (sensors, scored)
+
+
+def main(argv: list[str] | None = None) -> None:
+    """
+    main() parses the command line of "fealden rescore", scores the candidates of
+    fold stores with the thresholds given over a pool of processes, and writes the
+    sensors accepted, best first.
+
+    Parameters:
+        argv <-- a list of strings, the arguments after "rescore", or None for
+                 sys.argv
+    Returns:
+        Nothing
+    """
+    defaults = sensor.Sensor.THRESHOLDS
+    parser = argparse.ArgumentParser(
+        prog="fealden rescore",
+        description="Score the candidates of fold stores written with --fold-store"
+        " again, with other thresholds, without folding them.",
+    )
+    parser.add_argument(
+        "stores",
+        type=str,
+        nargs="+",
+        help="Fold store directories, or files in them.",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        type=str,
+        help="The file to write the sensors to.",
+        default="rescored.csv",
+    )
+    parser.add_argument(
+        "--format",
+        choices=writers.FORMATS,
+        help="The format of the output file (see writers.py).",
+        default="csv",
+    )
+    parser.add_argument(
+        "--target",
+        type=str,
+        help="Score only the candidates designed for this recognition sequence.",
+        default=None,
+    )
+    parser.add_argument(
+        "--top-k",
+        type=int,
+        metavar="K",
+        help="Write only the best K sensors.",
+        default=None,
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        help="The processes to score with (default: the available CPUs).",
+        default=None,
+    )
+    for field, kind in sensor.Thresholds.__annotations__.items():
+        parser.add_argument(
+            "--" + field.replace("_", "-"),
+            type=kind,
+            help=f"The {field} threshold (default: {getattr(defaults, field)}).",
+            default=getattr(defaults, field),
+        )
+    args = parser.parse_args(argv)
+    thresholds = sensor.Thresholds(
+        *(getattr(args, field) for field in sensor.Thresholds._fields)
+    )
+    target = None if args.target is None else args.target.lower()
+
+    time_zero = timeit.default_timer()
+    try:
+        tasks = [
+            chunk
+            for store in args.stores
+            for path in store_files(store)
+            for chunk in chunks(path)
+        ]
+    except (OSError, ValueError) as e:
+        print(f"Could not read the fold store: {e}", file=sys.stderr)
+        sys.exit(1)
+    results = sensor.SensorList()
+    scored = 0
+    jobs = args.jobs or resources.available_cpus()
+    with multiprocessing.get_context().Pool(max(1, min(jobs, len(tasks)))) as pool:
+        for sensors, candidates in pool.starmap(
+            rescore, zip(tasks, itertools.repeat(thresholds), itertools.repeat(target))
+        ):
+            results.merge(sensors)
+            scored += candidates
+    ranked = results.best_first()[: args.top_k]
+
+    with writers.open_writer(args.output, args.format) as writer:
+        writer.write_all(ranked)
+    print(
+        f"Rescored {scored} candidate(s) in "
+        f"{timeit.default_timer() - time_zero:.2f} seconds; stored "
+        f"{len(ranked)} result(s) in {writer.path}"
+    )
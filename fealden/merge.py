@@ -0,0 +1,140 @@
+"""Merge the result files of sharded designs into one.
+
+Runs with the same --seed and each --shard i/N design disjoint slices of the
+candidates (see Designer), and write their sensors best first. The merge reads the
+files side by side, a row at a time, in a k-way merge on the score:
+
+    fealden merge results.csv shard-0.csv shard-1.csv --top-k 1000
+
+Each sequence is kept once, and only the best top_k rows are written. Only the rows
+with the score being merged are held in memory, so files of any size can be merged.
+"""
+
+import argparse
+import contextlib
+import csv
+import heapq
+import sys
+from collections.abc import Iterable, Iterator
+
+
+def sorted_rows(
+    rows: Iterable[list[str]], path: str, score: int
+) -> Iterator[list[str]]:
+    """
+    sorted_rows() yields the rows of a result file, checking they are best first.
+
+    Parameters:
+        rows  <-- an iterable of lists of strings, the rows after the header
+        path  <-- a string, the name of the file, for errors
+        score <-- an integer, the column of the score
+    Returns:
+        an iterator of the rows; a ValueError is raised at the first row with a
+        better score than the row before it, or no score
+    """
+    last = float("-inf")
+    for number, row in enumerate(rows, 2):
+        if not row:
+            continue
+        try:
+            value = float(row[score])
+        except (IndexError, ValueError):
+            raise ValueError(f"{path}, line {number}: no score") from None
+        if value < last:
+            raise ValueError(f"{path}, line {number}: not sorted by score")
+        last = value
+        yield row
+
+
+def merge_files(paths: Iterable[str], output: str, top_k: int | None = None) -> int:
+    """
+    merge_files() merges result files, each sorted best first, into one.
+
+    Parameters:
+        paths  <-- an iterable of strings, the CSV files to merge, which must have
+                   the same header, with Sequence and Score columns
+        output <-- a string, the CSV file to write
+        top_k  <-- an integer, the most rows written, or None for all
+    Returns:
+        an integer, the rows written; a ValueError is raised if a file is empty,
+        its header differs or its rows are not sorted
+    """
+    with contextlib.ExitStack() as stack:
+        header: list[str] | None = None
+        sources = []
+        for path in paths:
+            reader = csv.reader(stack.enter_context(open(path, newline="")))
+            first = next(reader, None)
+            if first is None:
+                raise ValueError(f"{path} is empty")
+            if header is None:
+                header = first
+            elif first != header:
+                raise ValueError(f"{path} has a different header")
+            sources.append((reader, path))
+        if header is None:
+            raise ValueError("No files to merge")
+        if "Sequence" not in header or "Score" not in header:
+            raise ValueError("The files have no Sequence and Score columns")
+        score, seq = header.index("Score"), header.index("Sequence")
+
+        merged = heapq.merge(
+            *(sorted_rows(reader, path, score) for reader, path in sources),
+            key=lambda row: float(row[score]),
+        )
+        written = 0
+        with open(output, "w", newline="") as f:
+            writer = csv.writer(f, lineterminator="\n")
+            writer.writerow(header)
+            # a sequence found by two shards has the same score in both, so only
+            # the sequences of the score being merged need remembering
+            seen: set[str] = set()
+            last = None
+            for row in merged:
+                if top_k is not None and written >= top_k:
+                    break
+                if row[score] != last:
+                    seen.clear()
+                    last = row[score]
+                if row[seq] in seen:
+                    continue
+                seen.add(row[seq])
+                writer.writerow(row)
+                written += 1
+    return written
+
+
+def main(argv: list[str] | None = None) -> None:
+    """
+    main() parses the command line of "fealden merge", and merges the files.
+
+    Parameters:
+        argv <-- a list of strings, the arguments after "merge", or None for sys.argv
+    Returns:
+        Nothing
+    """
+    parser = argparse.ArgumentParser(
+        prog="fealden merge",
+        description="Merge the result files of sharded designs, best first.",
+    )
+    parser.add_argument("output", type=str, help="The CSV file to write.")
+    parser.add_argument(
+        "files",
+        type=str,
+        nargs="+",
+        help="The result files to merge, as written by fealden.",
+    )
+    parser.add_argument(
+        "--top-k",
+        type=int,
+        metavar="K",
+        help="Write only the best K sensors.",
+        default=None,
+    )
+    args = parser.parse_args(argv)
+    try:
+        written = merge_files(args.files, args.output, args.top_k)
+    except (OSError, ValueError) as e:
+        print(f"Could not merge: {e}", file=sys.stderr)
+        sys.exit(1)
+    print(f"Stored {written} result(s) in {args.output}")
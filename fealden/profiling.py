@@ -0,0 +1,111 @@
+import cProfile
+import glob
+import os
+import pstats
+import tracemalloc
+from collections.abc import Callable
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+# Per-worker state, set by init_worker() in each pool process
+_profiler: cProfile.Profile | None = None
+_profile_dir: str | None = None
+_profile_memory = False
+
+
+def init_worker(profile_dir: str, memory: bool = False) -> None:
+    """
+    init_worker() is a multiprocessing.Pool initializer which prepares the worker
+    process for profiling. Every task run through run_profiled() in this worker is
+    accumulated into a single cProfile.Profile object.
+
+    Parameters:
+        profile_dir <-- a string, the directory in which profiles are written
+        memory      <-- a bool, also trace memory allocations with tracemalloc
+    Returns:
+        Nothing
+    """
+    global _profiler, _profile_dir, _profile_memory
+    os.makedirs(profile_dir, exist_ok=True)
+    _profiler = cProfile.Profile()
+    _profile_dir = profile_dir
+    _profile_memory = memory
+    if memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+
+def worker_profile_path(
+    profile_dir: str, pid: int | str, suffix: str = "pstats"
+) -> str:
+    """Return the path of the profile written by the worker with process id pid."""
+    return os.path.join(profile_dir, f"worker-{pid}.{suffix}")
+
+
+def clear_profiles(profile_dir: str) -> None:
+    """
+    clear_profiles() removes the worker profiles and tracemalloc snapshots left in
+    profile_dir by an earlier run, so merge_profiles() merges only those written by
+    the workers of this run. It is called before the pool starts.
+    """
+    for suffix in ("pstats", "tracemalloc"):
+        for path in glob.glob(worker_profile_path(profile_dir, "*", suffix)):
+            os.remove(path)
+
+
+def run_profiled(func: Callable[..., T], *args: Any) -> T:
+    """
+    run_profiled() runs func(*args) under this worker's profiler, then rewrites the
+    worker's cumulative .pstats file (and tracemalloc snapshot, if enabled). Dumping
+    after every task means the profile is complete even though pool workers are
+    terminated without running exit handlers.
+
+    Parameters:
+        func  <-- a picklable callable, the pool task to run
+        args  <-- the arguments for func
+    Returns:
+        the return value of func
+    """
+    if _profiler is None or _profile_dir is None:
+        return func(*args)
+
+    _profiler.enable()
+    try:
+        result = func(*args)
+    finally:
+        _profiler.disable()
+        pid = os.getpid()
+        _profiler.dump_stats(worker_profile_path(_profile_dir, pid))
+        if _profile_memory and tracemalloc.is_tracing():
+            tracemalloc.take_snapshot().dump(
+                worker_profile_path(_profile_dir, pid, "tracemalloc")
+            )
+    return result
+
+
+def merge_profiles(profile_dir: str, output_name: str = "merged.pstats") -> str | None:
+    """
+    merge_profiles() combines all per-worker .pstats files in profile_dir into a
+    single profile, so hot spots are reported across the whole pool. Profiles of
+    earlier runs are removed by clear_profiles() when the pool starts.
+
+    Parameters:
+        profile_dir <-- a string, the directory holding the worker profiles
+        output_name <-- a string, the file name of the merged profile
+    Returns:
+        the path of the merged profile, or None if no worker profiles were found
+    """
+    paths = sorted(glob.glob(worker_profile_path(profile_dir, "*")))
+    if not paths:
+        return None
+    stats = pstats.Stats(paths[0])
+    for path in paths[1:]:
+        stats.add(path)
+    merged = os.path.join(profile_dir, output_name)
+    stats.dump_stats(merged)
+    return merged
+
+
+def print_hot_spots(profile_path: str, limit: int = 15) -> None:
+    """Print the functions with the highest internal time in a profile."""
+    pstats.Stats(profile_path).strip_dirs().sort_stats("tottime").print_stats(limit)
@@ -0,0 +1,221 @@
+"""Report the progress of a design while it runs.
+
+Each worker counts the candidates it generates, those folded and scored, and those
+accepted, with the best score among them, and sends the counts to the parent as a
+heartbeat at most every HEARTBEAT_INTERVAL seconds, and at the end of each task.
+A Reporter in the parent adds them up and renders them every interval seconds,
+as a progress line rewritten in place:
+
+    1200/150000 candidates  84.2 folds/s  12.5% accepted  best 0.0123  ETA 0:29:31
+
+or as one JSON object per line, for log scrapers:
+
+    {"candidates": 1200, "total": 150000, "folded": 1180, "accepted": 148, ...}
+"""
+
+import json
+import math
+import sys
+import threading
+import timeit
+from typing import Any, TextIO
+
+# the least seconds between the heartbeats of a worker
+HEARTBEAT_INTERVAL = 0.5
+# the formats a Reporter renders
+FORMATS = ("line", "json")
+
+# Per-worker state, set by init_worker() in each pool process
+_heartbeats: Any = None
+_generated = 0
+_folded = 0
+_accepted = 0
+_best = math.inf
+_last_beat = 0.0
+
+
+def init_worker(heartbeats: Any) -> None:
+    """
+    init_worker() sets the queue the heartbeats of this process are sent to, a
+    multiprocessing.SimpleQueue from the parent, or None to send none.
+    """
+    global _heartbeats, _last_beat
+    _heartbeats = heartbeats
+    _last_beat = timeit.default_timer()
+
+
+def count(
+    generated: int = 0,
+    folded: int = 0,
+    accepted: int = 0,
+    score: float | None = None,
+) -> None:
+    """
+    count() adds to the counts of this worker, and sends them as a heartbeat if
+    HEARTBEAT_INTERVAL has passed since the last.
+
+    Parameters:
+        generated <-- an integer, the candidates generated
+        folded    <-- an integer, those folded and scored
+        accepted  <-- an integer, those kept as sensors
+        score     <-- a float, the score of a sensor kept, or None
+    Returns:
+        Nothing
+    """
+    global _generated, _folded, _accepted, _best
+    if _heartbeats is None:
+        return
+    _generated += generated
+    _folded += folded
+    _accepted += accepted
+    if score is not None and score < _best:
+        _best = score
+    if timeit.default_timer() - _last_beat >= HEARTBEAT_INTERVAL:
+        beat()
+
+
+def beat() -> None:
+    """beat() sends the counts of this worker since its last heartbeat, if any."""
+    global _generated, _folded, _accepted, _best, _last_beat
+    if _heartbeats is None or not _generated:
+        return
+    _heartbeats.put((_generated, _folded, _accepted, _best))
+    _generated = _folded = _accepted = 0
+    _best = math.inf
+    _last_beat = timeit.default_timer()
+
+
+def format_duration(seconds: float) -> str:
+    """Return a number of seconds as H:MM:SS."""
+    minutes, secs = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{secs:02d}"
+
+
+class Reporter:
+
+    """
+    Reporter adds up the heartbeats of the workers of a design in a thread of its
+    own, and renders its progress every interval seconds, until it is closed.
+
+    Parameters:
+        heartbeats <-- the queue the workers send their heartbeats to
+        total      <-- an integer, the candidates the design will generate
+        form       <-- a string, 'line' or 'json' (see FORMATS)
+        stream     <-- a text file, where the progress is written
+        interval   <-- a float, the seconds between renderings
+    Returns:
+        an object of the class Reporter
+    """
+
+    def __init__(
+        self,
+        heartbeats: Any,
+        total: int,
+        form: str = "line",
+        stream: TextIO | None = None,
+        interval: float = 1.0,
+    ) -> None:
+        """Initialize a new Reporter, with nothing counted."""
+        if form not in FORMATS:
+            raise ValueError(f"Unknown progress format {form}")
+        self.heartbeats = heartbeats
+        self.total = total
+        self.form = form
+        self.stream = stream or sys.stderr
+        self.interval = interval
+        self.generated = self.folded = self.accepted = 0
+        self.best = math.inf
+        self.time_zero = timeit.default_timer()
+        self.width = 0
+        self.stopping = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def __enter__(self) -> "Reporter":  # noqa: PYI034
+        """Start reporting."""
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        """Stop reporting, rendering the final counts."""
+        self.close()
+
+    def start(self) -> None:
+        """start() starts the thread which adds up heartbeats and renders them."""
+        self.time_zero = timeit.default_timer()
+        self.thread.start()
+
+    def drain(self) -> None:
+        """drain() adds up the heartbeats waiting in the queue."""
+        while not self.heartbeats.empty():
+            generated, folded, accepted, best = self.heartbeats.get()
+            self.generated += generated
+            self.folded += folded
+            self.accepted += accepted
+            self.best = min(self.best, best)
+
+    def run(self) -> None:
+        """run() adds up heartbeats and renders them, until the reporter closes."""
+        last = timeit.default_timer()
+        while not self.stopping.wait(0.05):
+            self.drain()
+            if timeit.default_timer() - last >= self.interval:
+                self.render()
+                last = timeit.default_timer()
+
+    def close(self) -> None:
+        """close() stops the reporting thread and renders the final counts."""
+        self.stopping.set()
+        if self.thread.is_alive():
+            self.thread.join()
+        self.drain()
+        self.render()
+        if self.form == "line":
+            self.stream.write("\n")
+            self.stream.flush()
+
+    def snapshot(self) -> dict[str, Any]:
+        """
+        snapshot() returns the progress so far: the counts, the folds per second,
+        the share of folded candidates accepted, the best score (None before the
+        first sensor) and the seconds left, estimated from the rate so far (None
+        before the first heartbeat).
+        """
+        elapsed = timeit.default_timer() - self.time_zero
+        rate = self.generated / elapsed if elapsed > 0 else 0.0
+        return {
+            "candidates": self.generated,
+            "total": self.total,
+            "folded": self.folded,
+            "accepted": self.accepted,
+            "elapsed": round(elapsed, 3),
+            "folds_per_sec": round(self.folded / elapsed, 3) if elapsed > 0 else 0.0,
+            "acceptance_rate": (
+                round(self.accepted / self.folded, 4) if self.folded else 0.0
+            ),
+            "best_score": None if self.best == math.inf else self.best,
+            "eta_seconds": (
+                round(max(0, self.total - self.generated) / rate, 1) if rate else None
+            ),
+        }
+
+    def render(self) -> None:
+        """render() writes the progress so far to the stream, in the format."""
+        state = self.snapshot()
+        if self.form == "json":
+            self.stream.write(json.dumps(state) + "\n")
+            self.stream.flush()
+            return
+        best = state["best_score"]
+        eta = state["eta_seconds"]
+        line = (
+            f"{state['candidates']}/{state['total']} candidates  "
+            f"{state['folds_per_sec']:.1f} folds/s  "
+            f"{state['acceptance_rate']:.1%} accepted  "
+            f"best {'-' if best is None else f'{best:.4g}'}  "
+            f"ETA {'-' if eta is None else format_duration(eta)}"
+        )
+        # overwrite the last line, and whatever of it was longer
+        self.stream.write("\r" + line.ljust(self.width))
+        self.stream.flush()
+        self.width = len(line)
@@ -0,0 +1,163 @@
+"""Size the Fealden worker pool to the CPUs and memory this process may use.
+
+multiprocessing.cpu_count() counts every CPU of the host, but in a container a
+process is often confined to fewer by its affinity mask or a cgroup CPU quota, and
+every pool worker also starts folding subprocesses of its own. available_cpus()
+respects both limits, and plan() shares them between the Python scoring workers and
+the folds each keeps in flight, optionally within a memory budget.
+"""
+
+import math
+import os
+
+__all__ = [
+    "available_cpus",
+    "available_memory",
+    "cgroup_cpu_limit",
+    "cgroup_memory_limit",
+    "parse_memory_budget",
+    "plan",
+]
+
+CGROUP = "/sys/fs/cgroup"
+
+# rough peak memory, in MB, of a pool worker, and of each candidate in flight (the
+# folding subprocess and the folds being scored), used to fit a memory budget
+WORKER_MEMORY_MB = 80.0
+CANDIDATE_MEMORY_MB = 20.0
+
+
+def read_first_line(path: str) -> str | None:
+    """Return the first line of a file, or None if it cannot be read."""
+    try:
+        with open(path) as f:
+            return f.readline().strip()
+    except OSError:
+        return None
+
+
+def cgroup_cpu_limit(root: str = CGROUP) -> float | None:
+    """
+    cgroup_cpu_limit() returns the CPU quota of this process's cgroup, as a number
+    of CPUs, from cpu.max (cgroup v2) or cpu.cfs_quota_us and cpu.cfs_period_us
+    (cgroup v1).
+
+    Parameters:
+        root <-- a string, where the cgroup filesystem is mounted
+    Returns:
+        a float, the CPUs the quota allows, or None if there is no quota
+    """
+    line = read_first_line(os.path.join(root, "cpu.max"))
+    if line is not None:
+        quota, _, period = line.partition(" ")
+        if quota == "max":
+            return None
+        return int(quota) / int(period or 100000)
+    quota_v1 = read_first_line(os.path.join(root, "cpu", "cpu.cfs_quota_us"))
+    period_v1 = read_first_line(os.path.join(root, "cpu", "cpu.cfs_period_us"))
+    if quota_v1 is None or period_v1 is None or int(quota_v1) <= 0:
+        return None
+    return int(quota_v1) / int(period_v1)
+
+
+def available_cpus(root: str = CGROUP) -> int:
+    """
+    available_cpus() returns the number of CPUs this process may run on: the CPUs in
+    its affinity mask, capped by its cgroup CPU quota (rounded up).
+    """
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        # not available on every platform
+        cpus = os.cpu_count() or 1
+    quota = cgroup_cpu_limit(root)
+    if quota is not None:
+        cpus = min(cpus, math.ceil(quota))
+    return max(1, cpus)
+
+
+def cgroup_memory_limit(root: str = CGROUP) -> float | None:
+    """Return the memory limit of this process's cgroup in MB, or None if none."""
+    for path in (
+        os.path.join(root, "memory.max"),
+        os.path.join(root, "memory", "memory.limit_in_bytes"),
+    ):
+        line = read_first_line(path)
+        if line is not None and line.isdigit():
+            limit = int(line)
+            # cgroup v1 reports no limit as a huge number
+            return limit / 2**20 if limit < 2**60 else None
+    return None
+
+
+def available_memory(root: str = CGROUP) -> float | None:
+    """
+    available_memory() returns the memory, in MB, this process can expect to use:
+    the MemAvailable of /proc/meminfo, capped by the cgroup memory limit. Returns
+    None if neither is known.
+    """
+    available = None
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    available = int(line.split()[1]) / 1024
+                    break
+    except OSError:
+        pass
+    limit = cgroup_memory_limit(root)
+    if limit is None:
+        return available
+    return limit if available is None else min(limit, available)
+
+
+def plan(
+    jobs: int | None = None,
+    fold_concurrency: int = 1,
+    memory_budget: float | None = None,
+    cpus: int | None = None,
+) -> tuple[int, int]:
+    """
+    plan() chooses the number of Python scoring workers, and the folds each keeps in
+    flight. Unless jobs is given, there is one worker for every fold_concurrency
+    available CPUs, so workers and their folding subprocesses together fit the CPUs.
+    With a memory budget, the folds in flight per worker and then the workers are
+    reduced until their estimated memory (see WORKER_MEMORY_MB and
+    CANDIDATE_MEMORY_MB) fits.
+
+    Parameters:
+        jobs             <-- an integer, the scoring workers, or None to detect
+        fold_concurrency <-- an integer, the folds each worker keeps in flight
+        memory_budget    <-- a float, the MB the run may use, or None for no limit
+        cpus             <-- an integer, the CPUs to plan for, or None to detect
+    Returns:
+        (workers, fold_concurrency), both at least 1
+    """
+    fold_concurrency = max(1, fold_concurrency)
+    if jobs is None:
+        if cpus is None:
+            cpus = available_cpus()
+        jobs = cpus // fold_concurrency
+    workers = max(1, jobs)
+
+    def needed(workers: int, fold_concurrency: int) -> float:
+        in_flight = workers * fold_concurrency
+        return workers * WORKER_MEMORY_MB + in_flight * CANDIDATE_MEMORY_MB
+
+    if memory_budget is not None:
+        budget = memory_budget
+        while fold_concurrency > 1 and needed(workers, fold_concurrency) > budget:
+            fold_concurrency -= 1
+        while workers > 1 and needed(workers, fold_concurrency) > budget:
+            workers -= 1
+    return workers, fold_concurrency
+
+
+def parse_memory_budget(value: str) -> float | None:
+    """
+    parse_memory_budget() reads a memory budget given on the command line: a number
+    of MB, or 'auto' for available_memory().
+    """
+    if value == "auto":
+        return available_memory()
+    return float(value)
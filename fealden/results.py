@@ -0,0 +1,122 @@
+"""Keep the sensors of an interactive run as records, to sort, filter and convert.
+
+With interactive=True, Fealden keeps its sensors in Fealden.output as Results: a
+list of SensorRecords (see sensor.py), one per sensor, whose fields are the columns
+of Sensor.csv_header() in snake case (the keys of Sensor.as_dict()), with their
+types, so the numbers can be used without parsing CSV lines:
+
+    results = Fealden("cacgtg", 1, 50, 500, True, "", False, True).output
+    short = results.filter(lambda record: record.length <= 40).sorted("conc_on")
+    short[0].score, short.column("sequence")
+    frame = results.to_pandas()
+
+Results.to_numpy() returns a NumPy structured array (needs numpy) and to_pandas() a
+pandas DataFrame (needs pandas); neither is needed otherwise.
+"""
+
+from collections.abc import Callable, Iterable
+from typing import Any
+
+from . import sensor
+from .sensor import SensorRecord
+
+__all__ = ["Results", "SensorRecord", "field_index"]
+
+
+class Results(list[SensorRecord]):
+
+    """
+    Results is a list of SensorRecords, which can be sorted, filtered and converted
+    to columns without going through their CSV lines. Sorting and filtering return
+    new Results.
+
+    Parameters:
+        records <-- an iterable of SensorRecords
+    Returns:
+        an object of the class Results
+    """
+
+    @classmethod
+    def from_sensors(cls, sensors: Iterable[sensor.Sensor]) -> "Results":
+        """Return the records of sensors, in their order."""
+        return cls(SensorRecord.from_sensor(sen) for sen in sensors)
+
+    def sorted(
+        self, key: str | Callable[[SensorRecord], Any] = "score", reverse: bool = False
+    ) -> "Results":
+        """
+        sorted() returns the records sorted by a field, or by a function of each
+        record, best score first by default.
+
+        Parameters:
+            key     <-- a string, a field of SensorRecord, or a function of a record
+            reverse <-- a bool, whether to sort in descending order
+        Returns:
+            a new Results
+        """
+        if isinstance(key, str):
+            index = field_index(key)
+            return Results(
+                sorted(self, key=lambda record: record[index], reverse=reverse)
+            )
+        return Results(sorted(self, key=key, reverse=reverse))
+
+    def filter(self, predicate: Callable[[SensorRecord], bool]) -> "Results":
+        """filter() returns the records for which predicate is true, in order."""
+        return Results(record for record in self if predicate(record))
+
+    def column(self, name: str) -> list[Any]:
+        """column() returns the values of a field of every record, in order."""
+        index = field_index(name)
+        return [record[index] for record in self]
+
+    def csv_lines(self) -> list[str]:
+        """
+        csv_lines() returns Sensor.csv_header() and a CSV line for each record, the
+        lines of the CSV file of a non-interactive run.
+        """
+        return [sensor.Sensor.csv_header(), *(record.csv_line() for record in self)]
+
+    def to_numpy(self) -> Any:
+        """
+        to_numpy() returns the records as a NumPy structured array, with a float64 or
+        int64 field for each number and a unicode field for each string.
+
+        Parameters:
+            None
+        Returns:
+            a numpy.ndarray; an ImportError is raised if numpy is not installed
+        """
+        import numpy as np
+
+        types: list[tuple[str, Any]] = []
+        for name, kind in sensor.COLUMNS.items():
+            if kind is str:
+                width = max((len(value) for value in self.column(name)), default=1)
+                types.append((name, f"U{width}"))
+            else:
+                types.append((name, np.float64 if kind is float else np.int64))
+        return np.array([tuple(record) for record in self], dtype=types)
+
+    def to_pandas(self) -> Any:
+        """
+        to_pandas() returns the records as a pandas DataFrame, one column per field.
+
+        Parameters:
+            None
+        Returns:
+            a pandas.DataFrame; an ImportError is raised if pandas is not installed
+        """
+        import pandas as pd
+
+        return pd.DataFrame.from_records(self, columns=SensorRecord._fields)
+
+
+def field_index(name: str) -> int:
+    """Return the position of a field of SensorRecord, or raise a ValueError."""
+    try:
+        return SensorRecord._fields.index(name)
+    except ValueError:
+        raise ValueError(
+            f"Unknown field {name}, expected one of {list(SensorRecord._fields)}"
+        ) from None
@@ -1,8 +1,30 @@
 from __future__ import annotations
 
+import copy
+import functools
 import random
+from typing import Any
 
-from . import node, sensor, structure
+from . import foldstore, node, sensor, structure
+
+# the seed of the random number generators of tasks, if any (see use_master_seed())
+_master_seed: int | None = None
+
+
+def use_master_seed(master_seed: int | None) -> None:
+    """
+    use_master_seed() gives every task of this process a random number generator of
+    its own, seeded from master_seed and the task (see Seed.for_task()), so a task
+    designs the same sequences in whichever process and order it runs. With None,
+    sequences are drawn from the random module.
+    """
+    global _master_seed
+    _master_seed = master_seed
+
+
+def master_seed() -> int | None:
+    """Return the master seed selected with use_master_seed(), if any."""
+    return _master_seed
 
 
 class Seed:
@@ -45,6 +67,7 @@ class Seed:
         self.rec_seq = rec_seq
         self.binding_state = binding_state
         self.max_sensor_size = max_sensor_size
+        self.rng: random.Random | None = None
         self.make_graph(init_data, self.head, self.nodes, rec_node_name, rec_seq)
 
     def __repr__(self) -> str:
@@ -54,6 +77,37 @@ class Seed:
         recSeq={self.rec_seq}, bindingState={self.binding_state},\
         max_size={self.max_sensor_size}"
 
+    def for_task(self, chunk: int) -> Seed:
+        """
+        for_task() returns the seed a task designs its sequences with. With a master
+        seed (see use_master_seed()), it is a copy with a random number generator of
+        its own, seeded from the master seed, this seed graph, and the chunk of
+        candidates the task is given, and a node graph of its own, as the sequences
+        designed depend on the node sizes left by the designs before them (tasks
+        interleaved in one process would otherwise share them); otherwise it is this
+        seed.
+
+        Parameters:
+            chunk <-- an integer, the number of the task's chunk of the candidates
+        Returns:
+            a Seed
+        """
+        if _master_seed is None:
+            return self
+        task_seed = copy.deepcopy(self)
+        task_seed.rng = random.Random(
+            f"{_master_seed}:{self.rec_seq}:{self.binding_state}:"
+            f"{self.max_sensor_size}:{self.name}:{chunk}"
+        )
+        return task_seed
+
+    def rand(self) -> Any:
+        """
+        rand() returns what design_sequence() draws random numbers from: the random
+        number generator of this seed's task (see for_task()), or the random module.
+        """
+        return random if self.rng is None else self.rng
+
     def make_graph(
         self,
         data: list[str],
@@ -206,6 +260,27 @@ class Seed:
         Returns:
             a Sensor object
         """
+        design = self.design_sequence()
+        if design is None:
+            return None
+        (seq, rec_data) = design
+
+        # Create an RNSAstructure object
+        RNA_obj = structure.RNAfolder(seq)
+        return self.make_sensor(seq, rec_data, RNA_obj, base_seq, fixed, thiol)
+
+    def design_sequence(self) -> tuple[str, list[dict[str, int]]] | None:
+        """
+        design_sequence() builds a new sensor sequence from the seed graph, without
+        folding it.
+
+        Parameters:
+            None
+        Returns:
+            (seq, rec_data), the sensor sequence and the recognition sequence data
+            (see node.get_rec_seq_data()), or None if the sequence is longer than
+            permitted by the user
+        """
         self.generate_node_sizes()
         self.populate_nodes()
         seq = "".join(self.get_sequence())
@@ -215,13 +290,51 @@ class Seed:
         if len(seq) > self.max_sensor_size:
             return None
 
-        (leading_rec_dat, lagging_rec_dat) = self.nodes[
+        rec_data = self.nodes[
             self.rec_node_name
         ].get_rec_seq_data()  # type: ignore[union-attr]
+        return (seq, rec_data)
 
-        # Create an RNSAstructure object
-        RNA_obj = structure.RNAfolder(seq)
+    def make_sensor(
+        self,
+        seq: str,
+        rec_data: list[dict[str, int]],
+        RNA_obj: structure.Folder,
+        base_seq: str,
+        fixed: bool,
+        thiol: bool,
+    ) -> sensor.Sensor:
+        """
+        make_sensor() scores a sequence from design_sequence() as a 'Sensor', given
+        its folding results.
+
+        Parameters:
+            seq      <-- a string, the sensor sequence
+            rec_data <-- the recognition sequence data from design_sequence()
+            RNA_obj  <-- the folding results of seq, from structure.RNAfolder()
+        Returns:
+            a Sensor object
+        """
+        (leading_rec_dat, lagging_rec_dat) = rec_data
         sen_in = seq.lower(), RNA_obj.structure_dict
+        # with --fold-store, keep the folds to score them again (see foldstore.py)
+        foldstore.add(
+            foldstore.Candidate(
+                *sen_in,
+                leading_rec_dat,
+                lagging_rec_dat,
+                self.binding_state,
+                self.name,
+                base_seq,
+                fixed,
+                thiol,
+            )
+        )
+        ensemble = None
+        if structure.ensemble_enabled():
+            ensemble = functools.partial(
+                structure.unpaired_probabilities, seq, RNA_obj
+            )
         return sensor.Sensor(
             sen_in,
             leading_rec_dat,
@@ -231,6 +344,7 @@ class Seed:
             base_seq,
             fixed,
             thiol,
+            ensemble=ensemble,
         )
 
     def generate_node_sizes(self) -> None:
@@ -254,7 +368,7 @@ class Seed:
         )  # min len of node with recSeq
         MAX_SIZE = self.max_sensor_size
         MIN_SIZE = 20
-        size = random.randint(MIN_SIZE, MAX_SIZE)
+        size = self.rand().randint(MIN_SIZE, MAX_SIZE)
 
         MIN_NODE_SIZE = 3  # to allow for loop SSNodes?
 
@@ -287,7 +401,7 @@ class Seed:
         keys = list(real_nodes)  # a list of the 'key' names in the realNodes dict
         while size > 0:
             # increasing the size of random nodes until size limit is reached
-            key = random.choice(keys)
+            key = self.rand().choice(keys)
             (current, length) = real_nodes[key]  # type: ignore[assignment]
             assert current is not None
             if current.get_state() == 0:  # DS
@@ -319,7 +433,7 @@ class Seed:
                 extra = n.get_length() - len(self.rec_seq)
                 # the length not required for the recSeq
                 if extra != 0:
-                    relLocRecSeq = random.randint(
+                    relLocRecSeq = self.rand().randint(
                         1, extra
                     )  # the position of the recSeq in the node
                     n.set_rel_loc_rec_start(relLocRecSeq)
@@ -350,7 +464,8 @@ class Seed:
         """
         if size == 0:
             return []
-        return [random.choice(["A", "T", "C", "G"]) for i in range(0, size)]
+        rand = self.rand()
+        return [rand.choice(["A", "T", "C", "G"]) for i in range(0, size)]
 
     def get_sequence(self) -> str:
         """
@@ -1,6 +1,33 @@
+from collections.abc import Callable
+from typing import Any, NamedTuple
+
 from . import fold
 
 
+class Thresholds(NamedTuple):
+    """The thresholds Sensor scores with; the defaults are those of Fealden."""
+
+    # the most distance from the tag to the 5' end for a fold to be on
+    max_on_dist: int = 12
+    # the least that distance must grow from the on folds for a fold to be off
+    min_off_change: int = 10
+    # the most difference between the free energies of the first folds, kcal/mol
+    delta_g_max_difference: float = 5
+    # the weight of 1 / on to off distance in calculate_score()
+    signal_gain_weight: float = 10
+
+
+# the scores of rejected sensors (see Sensor.get_tag_and_score()) --> the reason
+REJECTIONS = {
+    -1: "one_fold",
+    -2: "disparate_first_folds",
+    -3: "same_rec_seq_state",
+    -4: "rec_seq_state_not_desired",
+    -5: "energy_out_of_range",
+    -6: "no_tag_distance",
+}
+
+
 class Sensor:
 
     """
@@ -15,6 +42,12 @@ class Sensor:
     -----------------------------------------------------------------
     """
 
+    # Free energy criteria of get_tag_and_score(), in kcal/mol
+    DELTA_G_MIN = -50
+    DELTA_G_MAX = -2
+    # the thresholds of sensors not given any
+    THRESHOLDS = Thresholds()
+
     def __init__(
         self,
         data_file: tuple[str, list[dict[str, float | list[list[int]]]]],
@@ -25,6 +58,9 @@ class Sensor:
         base_seq: str,
         fixed: bool,
         thiol: bool = True,
+        triage: bool = True,
+        ensemble: Callable[[], list[float]] | None = None,
+        thresholds: Thresholds | None = None,
     ):
         """
         This is the constructor for Sensor.
@@ -45,14 +81,38 @@ class Sensor:
                             0 represents double stranded, 1 represents single stranded.
                 seed_name <- An integer, this is a simple tag to represent which
                             graph gave rise to this sensor.
+                triage    <- A bool. If True, sensors which are rejected on their free
+                            energies alone are scored without building their Folds.
+                ensemble  <- A function returning the probability that each base is
+                            unpaired across the folding ensemble. If given, the on and
+                            off concentrations are the ensemble populations of the
+                            recognition sequence states (see ensemble_populations()).
+                            It is only called for sensors which pass all other
+                            criteria.
+                thresholds <- A Thresholds, to score with in place of THRESHOLDS.
         """
         self.seed_name = seed_name
         self.rec_seq = rec_seq
         self.resp_seq = resp_seq
         self.des_rec_seq_state = des_rec_seq_state
-
-        # Data file is passed to interpret_data, actually list
-        (self.seq, self.folds) = self.interpret_data(data_file)
+        self.ensemble = ensemble
+        self.unpaired: list[float] | None = None
+        self.thresholds = self.THRESHOLDS if thresholds is None else thresholds
+
+        rejection = 0
+        if triage:
+            rejection = self.energy_triage(
+                [each["deltaG"] for each in data_file[1]],  # type: ignore[misc]
+                self.thresholds.delta_g_max_difference,
+            )
+        self.seq: str
+        self.folds: list[fold.Fold]
+        if rejection:
+            # rejected sensors are never reported, so their Folds are not needed
+            (self.seq, self.folds) = (data_file[0], [])
+        else:
+            # Data file is passed to interpret_data, actually list
+            (self.seq, self.folds) = self.interpret_data(data_file)
         self.on_conc = 0
         self.off_conc = 0
         self.noise_conc = 0
@@ -60,7 +120,43 @@ class Sensor:
         self.base_seq = base_seq
         self.fixed = fixed
         self.thiol = thiol
-        (self.tag_loc, self.score) = self.get_tag_and_score()
+        self.score: float
+        if rejection:
+            (self.tag_loc, self.score) = (0, rejection)
+        else:
+            (self.tag_loc, self.score) = self.get_tag_and_score()
+        # drop the reference to the folding results, so sensors stay picklable
+        self.ensemble = None
+
+    @staticmethod
+    def energy_triage(
+        delta_gs: list[float],
+        max_difference: float = THRESHOLDS.delta_g_max_difference,
+    ) -> int:
+        """
+        energy_triage() applies the criteria of get_tag_and_score() which depend only
+        on the free energies of the folds, so invalid sensors can often be rejected
+        before their Folds are built. A sensor is only rejected here when
+        get_tag_and_score() would reject it with the same code.
+
+        Parameters:
+            delta_gs       <-- a list of floats, the free energies of the folds, lowest
+                               first
+            max_difference <-- a float, the delta_g_max_difference of the Thresholds
+        Returns:
+            the (negative) score get_tag_and_score() would return, or 0 if the sensor
+            cannot be judged on its free energies alone
+        """
+        if len(delta_gs) <= 1:
+            return -1
+        if delta_gs[1] - max_difference > delta_gs[0]:
+            return -2
+        if len(delta_gs) > 2 and delta_gs[2] - max_difference > delta_gs[1]:
+            # criteria -3 and -4 depend on the state of the recognition sequence
+            return 0
+        if delta_gs[0] > Sensor.DELTA_G_MAX or delta_gs[0] < Sensor.DELTA_G_MIN:
+            return -5
+        return 0
 
     def interpret_data(
         self, data: tuple[str, list[dict[str, float | list[list[int]]]]]
@@ -105,7 +201,7 @@ class Sensor:
             of the sensor.
         """
 
-        DELTA_G_MAX_DIFFERENCE = 5
+        DELTA_G_MAX_DIFFERENCE = self.thresholds.delta_g_max_difference
         if len(self.folds) <= 1:
             # 'Only one fold'
             return (0, -1)
@@ -128,7 +224,10 @@ class Sensor:
                 # "In neither of the first two folds is the recognition
                 # sequence in the desired state."
                 return (0, -4)
-        if self.folds[0].deltaG > -2 or self.folds[0].deltaG < -50:
+        if (
+            self.folds[0].deltaG > self.DELTA_G_MAX
+            or self.folds[0].deltaG < self.DELTA_G_MIN
+        ):
             # "The first has a delta G which is out of range."
             return (0, -5)
         # sensor has passed triage criteria
@@ -166,7 +265,7 @@ class Sensor:
         # 1/10 (bad) = 0.1, 1/50 (good) = 0.04
         # Multiplied by 10 for rough parity in weighting, this could be adjusted
 
-        SIGNAL_GAIN_WEIGHT = 10
+        SIGNAL_GAIN_WEIGHT = self.thresholds.signal_gain_weight
 
         return (
             abs(2 * self.on_conc - self.off_conc) / (self.on_conc + self.off_conc)
@@ -292,8 +391,8 @@ class Sensor:
             (position, onConc, offConc, noiseConc,
             concWrong, concFuzzy, weightedAvgOnToOffDist)
         """
-        MAX_ON_DIST = 12
-        MIN_OFF_CHANGE = 10
+        MAX_ON_DIST = self.thresholds.max_on_dist
+        MIN_OFF_CHANGE = self.thresholds.min_off_change
         tag_locs = self.get_tag_locations(MAX_ON_DIST, MIN_OFF_CHANGE)
 
         # determine if this would make a good sensor if tagged in each possible
@@ -341,11 +440,23 @@ class Sensor:
             # the concentration of all the off states
             off_conc = sum([j for (i, j) in off_state_info])
 
+            # the on and off concentrations reported and compared; by default those
+            # of the folds listed, but with an ensemble, the folds only place the
+            # tag and weight its distances, and the ensemble decides how much of the
+            # sensor is in each state (noisy sensors are rejected before asking)
+            (on_state_conc, off_state_conc) = (on_conc, off_conc)
+            if self.ensemble is not None and noise_conc == 0:
+                (on_state_conc, off_state_conc) = self.ensemble_populations()
+
             # if noiseConc*10 > offConc + onConc or\
             #    concWrong*10 > offConc or\
             #    concWrong*10 > onConc or\
 
-            if noise_conc > 0 or off_conc * 10 < on_conc or on_conc * 10 < off_conc:
+            if (
+                noise_conc > 0
+                or off_state_conc * 10 < on_state_conc
+                or on_state_conc * 10 < off_state_conc
+            ):
                 # "too much noise, too many are wrong, or ratios are off"
                 continue
             #
@@ -359,8 +470,8 @@ class Sensor:
             # FIXME: Only returns first useful tag location, not best
             return (
                 position,
-                on_conc,
-                off_conc,
+                on_state_conc,
+                off_state_conc,
                 noise_conc,
                 conc_wrong,
                 conc_fuzzy,
@@ -369,6 +480,29 @@ class Sensor:
 
         return 0
 
+    def ensemble_populations(self) -> tuple[float, float]:
+        """
+        ensemble_populations() estimates the fractions of the folding ensemble in which
+        the recognition sequence is in the desired (on) and the other (off) state, from
+        the probability that each of its bases is unpaired. The recognition sequence is
+        taken to be single stranded with the mean unpaired probability of its bases.
+
+        Parameters:
+            None
+        Returns:
+            (on, off), two floats which add up to 1
+        """
+        if self.unpaired is None:
+            assert self.ensemble is not None
+            self.unpaired = self.ensemble()
+        rec_seq_unpaired = self.unpaired[
+            self.rec_seq["start"] - 1 : self.rec_seq["end"] - 1
+        ]
+        single_stranded = sum(rec_seq_unpaired) / len(rec_seq_unpaired)
+        if self.des_rec_seq_state == fold.Fold.SEQ_STATE["SS"]:
+            return (single_stranded, 1 - single_stranded)
+        return (1 - single_stranded, single_stranded)
+
     @staticmethod
     def csv_header() -> str:
         """
@@ -429,6 +563,33 @@ class Sensor:
             ]
         )
 
+    def as_dict(self) -> dict[str, str | int | float]:
+        """
+        as_dict() returns the values of csv_line() by name, for JSON output.
+
+        Parameters:
+            None
+        Returns:
+            A dictionary, column name (csv_header() in snake case) --> value, with
+            the keys and types of COLUMNS
+        """
+        return {
+            "sequence": self.seq,
+            "score": float(self.score),
+            "seed_name": str(self.seed_name),
+            "tag_location": int(self.tag_loc),
+            "conc_on": float(self.on_conc),
+            "conc_off": float(self.off_conc),
+            "conc_off_to_on_ratio": float(self.off_conc / self.on_conc),
+            "conc_noise": float(self.noise_conc),
+            "conc_wrong": float(self.wrong_conc),
+            "conc_fuzzy": float(self.fuzzy_conc),
+            "on_to_off_dist": float(self.on_to_off_dist),
+            "length": len(self.seq),
+            "num_folds": len(self.folds),
+            "original_sequence": self.base_seq,
+        }
+
     def __repr__(self) -> str:
         """
         __repr__() generates the string representation of a sensor. It is all
@@ -442,3 +603,87 @@ class Sensor:
         """
 
         return self.csv_line()
+
+
+class SensorRecord(NamedTuple):
+    """
+    The values of Sensor.csv_line() for one sensor, as Sensor.as_dict() names them.
+    Its fields are the one definition of the columns of a sensor (see COLUMNS).
+    """
+
+    sequence: str
+    score: float
+    seed_name: str
+    tag_location: int
+    conc_on: float
+    conc_off: float
+    conc_off_to_on_ratio: float
+    conc_noise: float
+    conc_wrong: float
+    conc_fuzzy: float
+    on_to_off_dist: float
+    length: int
+    num_folds: int
+    original_sequence: str
+
+    @classmethod
+    def from_sensor(cls, sen: Sensor) -> "SensorRecord":
+        """Return the record of a sensor."""
+        return cls(**sen.as_dict())  # type: ignore[arg-type]
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the fields by name, as Sensor.as_dict()."""
+        return self._asdict()
+
+    def csv_line(self) -> str:
+        """Return the fields as a line of CSV, as Sensor.csv_line()."""
+        return ",".join(str(value) for value in self)
+
+
+# the columns of a sensor: Sensor.as_dict() keys --> type (str, float or int), from
+# which the result files, the database and results.Results take theirs
+COLUMNS: dict[str, type] = dict(SensorRecord.__annotations__)
+
+
+class SensorList(list[Sensor]):
+
+    """
+    SensorList is the list of valid sensors generated by one task, which also counts
+    the candidates that were dropped because they could not be folded, and keeps the
+    last error, so the failures can be reported once the run completes. The sensors
+    rejected by their score are counted by its code (see REJECTIONS).
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty SensorList object."""
+        super().__init__()
+        self.failed = 0
+        self.error: str | None = None
+        self.rejected: dict[int, int] = {}
+
+    def add_failure(self, error: Exception) -> None:
+        """Count a candidate sensor that could not be folded."""
+        self.failed += 1
+        self.error = str(error)
+
+    def add_rejection(self, score: float) -> None:
+        """Count a candidate sensor rejected with a (negative) score."""
+        code = int(score)
+        self.rejected[code] = self.rejected.get(code, 0) + 1
+
+    def merge(self, other: "SensorList") -> None:
+        """Add the sensors, failures and rejections of another SensorList to this."""
+        self.extend(other)
+        self.failed += other.failed
+        self.error = other.error or self.error
+        for code, count in other.rejected.items():
+            self.rejected[code] = self.rejected.get(code, 0) + count
+
+    def best_first(self) -> "SensorList":
+        """Return the sensors as a new SensorList, each sequence once, best first."""
+        ranked = SensorList()
+        unique = {sen.seq: sen for sen in self}
+        ranked.extend(sorted(unique.values(), key=lambda sen: sen.score))
+        ranked.failed, ranked.error = self.failed, self.error
+        ranked.rejected = dict(self.rejected)
+        return ranked
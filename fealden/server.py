@@ -0,0 +1,630 @@
+"""Serve Fealden designs over HTTP, from a worker pool kept between requests.
+
+    python -m fealden serve [--host HOST] [--port PORT] [--max-running N] ...
+
+Jobs are posted as JSON objects with the design parameters of Fealden: rec_seq and
+binding_state, and optionally max_sensor_size, min_sens_per_seed, fixed and thiol.
+The backend and worker pool options are those of the server.
+
+    POST   /jobs              queue a job: 202 with its id, or 429 if the queue is full
+    GET    /jobs              every job, without its sensors
+    GET    /jobs/ID           a job and its progress, with its sensors once done
+    GET    /jobs/ID/events    the progress of a job as JSON lines, until it finishes
+    DELETE /jobs/ID           cancel a queued or running job
+    GET    /health            the pool, and the jobs queued and running
+
+Queued jobs are run by one Designer, up to --max-running at a time with their tasks
+interleaved over its pool, and a queued job starts as soon as a running job ends.
+There is no authentication: the server is meant for local clients, and listens on
+localhost by default.
+"""
+
+import argparse
+import collections
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+from . import fealden, sensor
+
+# design parameter --> (type, default), as in Designer.design(); None is required
+JOB_PARAMETERS: dict[str, tuple[type, Any]] = {
+    "rec_seq": (str, None),
+    "binding_state": (int, None),
+    "max_sensor_size": (int, 50),
+    "min_sens_per_seed": (int, 500),
+    "fixed": (bool, False),
+    "thiol": (bool, True),
+}
+FINISHED = ("done", "failed", "cancelled")
+
+
+class QueueFull(Exception):
+    """Raised when a job is submitted to a JobQueue with max_queued jobs waiting."""
+
+
+def parse_job(body: bytes) -> tuple[str, int, int, int, bool, bool]:
+    """
+    parse_job() reads the JSON body of a job request.
+
+    Parameters:
+        body <-- bytes, a JSON object of the parameters in JOB_PARAMETERS
+    Returns:
+        a tuple, the arguments of Designer.design()
+    Raises:
+        ValueError, if the body is not such an object
+    """
+    try:
+        request = json.loads(body)
+    except ValueError:
+        raise ValueError("The request is not valid JSON") from None
+    if not isinstance(request, dict):
+        raise ValueError("The request must be a JSON object")
+    for name in request:
+        if name not in JOB_PARAMETERS:
+            raise ValueError(f"Unknown parameter {name}")
+    values: list[Any] = []
+    for name, (kind, default) in JOB_PARAMETERS.items():
+        value = request.get(name, default)
+        if value is None:
+            raise ValueError(f"Missing parameter {name}")
+        # bool is a subclass of int, but not a number of bases
+        if not isinstance(value, kind) or (kind is int and isinstance(value, bool)):
+            raise ValueError(f"{name} must be of type {kind.__name__}")
+        values.append(value)
+    rec_seq, binding_state, max_sensor_size, min_sens_per_seed, fixed, thiol = values
+    return (rec_seq, binding_state, max_sensor_size, min_sens_per_seed, fixed, thiol)
+
+
+class Job:
+
+    """A design requested from the server, with its progress and results."""
+
+    def __init__(
+        self, job_id: str, design: tuple[str, int, int, int, bool, bool]
+    ) -> None:
+        """Initialize a new, queued Job object."""
+        self.id = job_id
+        self.design = design
+        self.state = "queued"
+        self.tasks_done = 0
+        self.tasks = 0
+        self.sensors_found = 0
+        self.failed = 0
+        self.results: sensor.SensorList | None = None
+        # while running: the tasks not yet submitted, those in the pool, the
+        # sensors found so far and the errors of failed tasks
+        self.todo: collections.deque[tuple[Any, ...]] = collections.deque()
+        self.in_flight = 0
+        self.found = sensor.SensorList()
+        self.task_errors: list[BaseException] = []
+        self.error: str | None = None
+        self.submitted = time.time()
+        self.started: float | None = None
+        self.finished: float | None = None
+
+    def status(self, with_results: bool = False) -> dict[str, Any]:
+        """
+        status() returns the state and progress of the job, as a JSON object.
+
+        Parameters:
+            with_results <-- bool, whether to add the sensors found, best first
+        Returns:
+            a dictionary
+        """
+        status: dict[str, Any] = {
+            "id": self.id,
+            "state": self.state,
+            "parameters": dict(zip(JOB_PARAMETERS, self.design)),
+            "tasks_done": self.tasks_done,
+            "tasks": self.tasks,
+            "sensors_found": self.sensors_found,
+            "failed_candidates": self.failed,
+            "error": self.error,
+            "submitted": self.submitted,
+            "started": self.started,
+            "finished": self.finished,
+        }
+        if with_results and self.results is not None:
+            status["sensors"] = [sen.as_dict() for sen in self.results]
+        return status
+
+
+class JobQueue:
+
+    """
+    JobQueue runs the jobs submitted to the server with one Designer, from a thread
+    of its own, up to max_running jobs at a time: a queued job is started as soon as
+    a running job finishes or is cancelled. Its methods may be called from any
+    thread.
+    """
+
+    def __init__(
+        self,
+        designer: fealden.Designer,
+        max_queued: int = 100,
+        max_running: int = 4,
+        keep_finished: int = 100,
+    ) -> None:
+        """
+        Initialize a new JobQueue object.
+
+        Parameters:
+            designer      <-- a Designer, to run the jobs
+            max_queued    <-- an integer, the jobs that may wait to run
+            max_running   <-- an integer, the jobs run together
+            keep_finished <-- an integer, the finished jobs kept for their results
+        """
+        self.designer = designer
+        self.max_queued = max_queued
+        self.max_running = max(1, max_running)
+        self.keep_finished = keep_finished
+        self.jobs: dict[str, Job] = {}
+        self.queue: collections.deque[Job] = collections.deque()
+        self.running: list[Job] = []
+        # tasks of the running jobs queued or running in the pool
+        self.in_flight = 0
+        self.changed = threading.Condition()
+        # counts the changes to any job, for wait_for_change()
+        self.version = 0
+        self.closed = False
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def start(self) -> None:
+        """Start the worker pool, and the thread running the jobs."""
+        self.designer.start()
+        self.thread.start()
+
+    def close(self) -> None:
+        """close() cancels the jobs not finished, and stops the thread and pool."""
+        with self.changed:
+            self.closed = True
+            for job in [*self.queue, *self.running]:
+                job.state = "cancelled"
+            self.queue.clear()
+            self.running = []
+            self.notify()
+        if self.thread.is_alive():
+            self.thread.join()
+        self.designer.close()
+
+    def notify(self) -> None:
+        """Wake the threads waiting for a change; call with the lock held."""
+        self.version += 1
+        self.changed.notify_all()
+
+    def submit(self, design: tuple[str, int, int, int, bool, bool]) -> Job:
+        """
+        submit() queues a design to be run.
+
+        Parameters:
+            design <-- a tuple, the arguments of Designer.design()
+        Returns:
+            the queued Job
+        Raises:
+            ValueError, if the design is invalid, and QueueFull
+        """
+        # check the design before queueing it, rather than failing in the pool
+        self.designer.seed_tasks(*design)
+        with self.changed:
+            if self.closed or len(self.queue) >= self.max_queued:
+                raise QueueFull(f"{len(self.queue)} jobs are already queued")
+            job = Job(uuid.uuid4().hex, design)
+            self.jobs[job.id] = job
+            self.queue.append(job)
+            self.notify()
+        return job
+
+    def status(self, job_id: str, with_results: bool = False) -> dict[str, Any] | None:
+        """Return the status of a job (see Job.status()), or None if not known."""
+        with self.changed:
+            job = self.jobs.get(job_id)
+            return None if job is None else job.status(with_results)
+
+    def statuses(self) -> list[dict[str, Any]]:
+        """Return the status of every job known, in the order submitted."""
+        with self.changed:
+            return [job.status() for job in self.jobs.values()]
+
+    def counts(self) -> dict[str, int]:
+        """Return the number of jobs in each state."""
+        with self.changed:
+            return dict(collections.Counter(job.state for job in self.jobs.values()))
+
+    def cancel(self, job_id: str) -> bool | None:
+        """
+        cancel() cancels a queued or running job, making room for a queued job. The
+        tasks of a running job which are in the pool are finished by the workers, but
+        their results are dropped.
+
+        Parameters:
+            job_id <-- a string, the id of the job
+        Returns:
+            True if the job was cancelled, False if it had finished, or None if the
+            job is not known
+        """
+        with self.changed:
+            job = self.jobs.get(job_id)
+            if job is None:
+                return None
+            if job.state in FINISHED:
+                return False
+            if job.state == "queued":
+                self.queue.remove(job)
+            else:
+                self.running.remove(job)
+                job.todo.clear()
+            job.state = "cancelled"
+            job.finished = time.time()
+            self.notify()
+            return True
+
+    def wait_for_change(self, version: int, timeout: float) -> int:
+        """
+        wait_for_change() waits until a job changes after version (see self.version)
+        or the timeout passes, and returns the version then.
+        """
+        with self.changed:
+            self.changed.wait_for(lambda: self.version != version, timeout)
+            return self.version
+
+    def run(self) -> None:
+        """
+        run() runs the queued jobs, until the queue is closed. The tasks of the
+        running jobs are submitted to the pool in turn, to the job with the fewest in
+        the pool first, with only two tasks per worker in the pool (as
+        Designer.design_many()), so a job started later is not held up by those
+        before it.
+        """
+        if self.designer.event_loop:
+            self.run_in_turn()
+            return
+        slots = 2 * self.designer.workers
+        with self.changed:
+            while not self.closed:
+                while self.queue and len(self.running) < self.max_running:
+                    self.start_job(self.queue.popleft())
+                waiting = [job for job in self.running if job.todo]
+                if not waiting or self.in_flight >= slots:
+                    self.changed.wait()
+                    continue
+                # the job with the fewest tasks in the pool goes next, and to the
+                # back, to take turns with the others
+                job = min(waiting, key=lambda each: each.in_flight)
+                self.running.remove(job)
+                self.running.append(job)
+                self.submit_task(job)
+
+    def start_job(self, job: Job) -> None:
+        """start_job() makes a job running, with its tasks to submit; hold the lock."""
+        job.state = "running"
+        job.started = time.time()
+        job.todo.extend(self.designer.seed_tasks(*job.design))
+        job.tasks = len(job.todo)
+        self.running.append(job)
+        if not job.todo:
+            self.finish_job(job)
+        self.notify()
+
+    def submit_task(self, job: Job) -> None:
+        """submit_task() submits the next task of a job to the pool; hold the lock."""
+
+        def collect(result: sensor.SensorList) -> None:
+            with self.changed:
+                job.found.merge(result)
+                self.task_done(job)
+
+        def collect_error(error: BaseException) -> None:
+            with self.changed:
+                job.task_errors.append(error)
+                self.task_done(job)
+
+        job.in_flight += 1
+        self.in_flight += 1
+        self.designer.submit(job.todo.popleft(), collect, collect_error)
+
+    def task_done(self, job: Job) -> None:
+        """task_done() records a task of a job leaving the pool; hold the lock."""
+        job.in_flight -= 1
+        self.in_flight -= 1
+        if job.state == "running":
+            job.tasks_done += 1
+            job.sensors_found, job.failed = len(job.found), job.found.failed
+            if not job.todo and not job.in_flight:
+                self.finish_job(job)
+        self.notify()
+
+    def finish_job(self, job: Job) -> None:
+        """
+        finish_job() records the results of a running job whose tasks are all done,
+        or its first error if every task failed; hold the lock.
+        """
+        found = job.found
+        if job.task_errors and not (found or found.failed):
+            job.state, job.error = "failed", repr(job.task_errors[0])
+        else:
+            job.state, job.results = "done", found.best_first()
+            job.sensors_found, job.failed = len(found), found.failed
+            job.error = found.error
+        job.finished = time.time()
+        self.running.remove(job)
+        self.forget_finished()
+
+    def forget_finished(self) -> None:
+        """Drop the oldest finished jobs beyond keep_finished; hold the lock."""
+        finished = [job_id for job_id, j in self.jobs.items() if j.state in FINISHED]
+        for job_id in finished[: max(0, len(finished) - self.keep_finished)]:
+            del self.jobs[job_id]
+
+    def run_in_turn(self) -> None:
+        """
+        run_in_turn() runs the queued jobs one at a time, until the queue is closed,
+        for a designer folding from an event loop rather than a pool.
+        """
+        while True:
+            with self.changed:
+                self.changed.wait_for(lambda: bool(self.queue) or self.closed)
+                if self.closed:
+                    return
+                job = self.queue.popleft()
+                job.state = "running"
+                job.started = time.time()
+                self.running.append(job)
+                self.notify()
+            self.run_job(job)
+
+    def run_job(self, job: Job) -> None:
+        """run_job() runs a job with Designer.design_many(), and records its results."""
+
+        def progress(
+            index: int, done: int, total: int, found: sensor.SensorList
+        ) -> None:
+            with self.changed:
+                job.tasks_done, job.tasks = done, total
+                job.sensors_found, job.failed = len(found), found.failed
+                self.notify()
+
+        def cancelled(index: int) -> bool:
+            return job.state == "cancelled"
+
+        results: list[sensor.SensorList] = []
+        error = None
+        try:
+            results = self.designer.design_many([job.design], progress, cancelled)
+        except Exception as e:
+            error = repr(e)
+        with self.changed:
+            if job.state != "cancelled":
+                if error is not None:
+                    job.state, job.error = "failed", error
+                else:
+                    job.state, job.results = "done", results[0]
+                    job.sensors_found = len(results[0])
+                    job.failed, job.error = results[0].failed, results[0].error
+                job.finished = time.time()
+                self.running.remove(job)
+            self.forget_finished()
+            self.notify()
+
+
+class DesignServer(ThreadingHTTPServer):
+
+    """DesignServer is an HTTP server handing requests to a JobQueue."""
+
+    daemon_threads = True
+
+    def __init__(
+        self, address: tuple[str, int], queue: JobQueue, verbose: bool = False
+    ) -> None:
+        """Initialize a new DesignServer object listening on address."""
+        super().__init__(address, Handler)
+        self.queue = queue
+        self.verbose = verbose
+
+
+class Handler(BaseHTTPRequestHandler):
+
+    """Handler answers the requests of a DesignServer (see the module docstring)."""
+
+    server: DesignServer
+    # how often a stream of events reports a job that has not changed
+    EVENT_INTERVAL = 15.0
+
+    def send_json(self, code: int, body: Any) -> None:
+        """Send a response with a JSON body."""
+        data = json.dumps(body).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def send_error_json(self, code: int, message: str) -> None:
+        """Send an error response, as a JSON object with its message."""
+        self.send_json(code, {"error": message})
+
+    def route(self) -> list[str]:
+        """Return the parts of the requested path, without its query."""
+        path = self.path.split("?", 1)[0]
+        return [part for part in path.split("/") if part]
+
+    def do_GET(self) -> None:
+        """Answer GET /health, /jobs, /jobs/ID and /jobs/ID/events."""
+        parts = self.route()
+        queue = self.server.queue
+        if parts == ["health"]:
+            self.send_json(
+                200,
+                {
+                    "workers": queue.designer.workers,
+                    "fold_concurrency": queue.designer.fold_concurrency,
+                    "max_queued": queue.max_queued,
+                    "max_running": queue.max_running,
+                    "jobs": queue.counts(),
+                },
+            )
+        elif parts == ["jobs"]:
+            self.send_json(200, queue.statuses())
+        elif len(parts) == 2 and parts[0] == "jobs":
+            status = queue.status(parts[1], with_results=True)
+            if status is None:
+                self.send_error_json(404, f"No job {parts[1]}")
+            else:
+                self.send_json(200, status)
+        elif len(parts) == 3 and parts[0] == "jobs" and parts[2] == "events":
+            self.stream_events(parts[1])
+        else:
+            self.send_error_json(404, f"No such resource {self.path}")
+
+    def stream_events(self, job_id: str) -> None:
+        """
+        stream_events() sends the status of a job as a JSON line whenever it changes,
+        and at least every EVENT_INTERVAL seconds, until the job is finished. The last
+        line has the sensors found.
+        """
+        queue = self.server.queue
+        version = queue.version
+        status = queue.status(job_id)
+        if status is None:
+            self.send_error_json(404, f"No job {job_id}")
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.end_headers()
+        last = None
+        try:
+            while status is not None:
+                if status["state"] in FINISHED:
+                    status = queue.status(job_id, with_results=True)
+                    self.wfile.write(json.dumps(status).encode() + b"\n")
+                    break
+                if status != last:
+                    self.wfile.write(json.dumps(status).encode() + b"\n")
+                    self.wfile.flush()
+                    last = status
+                version = queue.wait_for_change(version, self.EVENT_INTERVAL)
+                status = queue.status(job_id)
+        except (BrokenPipeError, ConnectionResetError):
+            # the client stopped listening
+            pass
+
+    def do_POST(self) -> None:
+        """Answer POST /jobs, queueing a design."""
+        if self.route() != ["jobs"]:
+            self.send_error_json(404, f"No such resource {self.path}")
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            job = self.server.queue.submit(parse_job(self.rfile.read(length)))
+        except ValueError as e:
+            self.send_error_json(400, str(e))
+        except QueueFull as e:
+            self.send_error_json(429, str(e))
+        else:
+            self.send_response(202)
+            self.send_header("Location", f"/jobs/{job.id}")
+            data = json.dumps(job.status()).encode()
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    def do_DELETE(self) -> None:
+        """Answer DELETE /jobs/ID, cancelling a job."""
+        parts = self.route()
+        if len(parts) != 2 or parts[0] != "jobs":
+            self.send_error_json(404, f"No such resource {self.path}")
+            return
+        cancelled = self.server.queue.cancel(parts[1])
+        if cancelled is None:
+            self.send_error_json(404, f"No job {parts[1]}")
+        elif not cancelled:
+            self.send_error_json(409, f"Job {parts[1]} has already finished")
+        else:
+            self.send_json(200, self.server.queue.status(parts[1]))
+
+    def log_message(self, format: str, *args: Any) -> None:
+        """Log requests to stderr only in verbose mode."""
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+def main(argv: list[str] | None = None) -> None:
+    """
+    main() parses the command line of "fealden serve", and serves designs until it
+    is interrupted.
+
+    Parameters:
+        argv <-- a list of strings, the arguments after "serve", or None for sys.argv
+    Returns:
+        Nothing
+    """
+    parser = argparse.ArgumentParser(
+        prog="fealden serve",
+        description="Serve Fealden designs over HTTP from a persistent worker pool.",
+    )
+    parser.add_argument(
+        "--host",
+        type=str,
+        help="The address to listen on. Default localhost only.",
+        default="127.0.0.1",
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        help="The port to listen on, or 0 for any free port.",
+        default=8000,
+    )
+    parser.add_argument(
+        "--max-queued",
+        type=int,
+        metavar="N",
+        help="Refuse new jobs (429) while N jobs are waiting to run.",
+        default=100,
+    )
+    parser.add_argument(
+        "--max-running",
+        type=int,
+        metavar="N",
+        help="Run up to N jobs at a time, sharing the worker pool.",
+        default=4,
+    )
+    parser.add_argument(
+        "--keep-finished",
+        type=int,
+        metavar="N",
+        help="Keep the results of the last N finished jobs.",
+        default=100,
+    )
+    parser.add_argument(
+        "-v",
+        "-verbose",
+        action="store_true",
+        help="Log every request.",
+    )
+    fealden.add_designer_arguments(parser)
+    args = parser.parse_args(argv)
+
+    queue = JobQueue(
+        fealden.Designer(**fealden.designer_options(args)),
+        args.max_queued,
+        args.max_running,
+        args.keep_finished,
+    )
+    server = DesignServer((args.host, args.port), queue, args.v)
+    queue.start()
+    print(
+        f"Serving Fealden on http://{args.host}:{server.server_port} with "
+        f"{queue.designer.workers} worker(s)",
+        flush=True,
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        queue.close()
@@ -0,0 +1,232 @@
+"""Keep the results of many runs in one indexed SQLite database.
+
+With --db FILE, every design is added to FILE, besides its CSV file: a row in runs
+with its parameters, options and rejection statistics (the candidates which could
+not be folded, and those rejected for each reason of sensor.REJECTIONS), and a row
+in sensors for each of its sensors, with the columns of Sensor.csv_line(). The
+sensors of a run are inserted together in one transaction. Indexes on target,
+score and length keep queries across runs fast, such as the best sensors ever
+found for a target:
+
+    fealden query results.db CACGTG -n 20
+
+The database is plain SQLite, so it can be queried with any SQLite client too.
+"""
+
+import argparse
+import csv
+import json
+import os
+import sqlite3
+import sys
+import time
+from collections.abc import Sequence
+from typing import Any
+
+from . import sensor
+
+# the SQLite type of each type of sensor.COLUMNS
+SQLITE_TYPES = {str: "TEXT", float: "REAL", int: "INTEGER"}
+# the columns of a sensor: Sensor.as_dict() keys --> SQLite type
+SENSOR_COLUMNS = {name: SQLITE_TYPES[kind] for name, kind in sensor.COLUMNS.items()}
+# the columns of runs counting the candidates rejected with each score
+REJECTION_COLUMNS = {
+    code: f"rejected_{reason}" for code, reason in sensor.REJECTIONS.items()
+}
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    created TEXT NOT NULL,
+    name TEXT,
+    target TEXT NOT NULL,
+    binding_state INTEGER NOT NULL,
+    max_sensor_size INTEGER NOT NULL,
+    min_sens_per_seed INTEGER NOT NULL,
+    fixed INTEGER NOT NULL,
+    thiol INTEGER NOT NULL,
+    options TEXT NOT NULL,
+    elapsed REAL,
+    candidates INTEGER,
+    sensors INTEGER NOT NULL,
+    failed INTEGER NOT NULL,
+    task_errors INTEGER NOT NULL,
+    last_error TEXT,
+    {", ".join(f"{column} INTEGER" for column in REJECTION_COLUMNS.values())}
+);
+CREATE TABLE IF NOT EXISTS sensors (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    target TEXT NOT NULL,
+    {", ".join(f"{name} {kind}" for name, kind in SENSOR_COLUMNS.items())}
+);
+CREATE INDEX IF NOT EXISTS sensors_target_score ON sensors (target, score);
+CREATE INDEX IF NOT EXISTS sensors_score ON sensors (score);
+CREATE INDEX IF NOT EXISTS sensors_length ON sensors (length);
+CREATE INDEX IF NOT EXISTS runs_target ON runs (target);
+"""
+
+
+class ResultStore:
+
+    """
+    ResultStore adds the results of designs to a SQLite database, created with its
+    tables and indexes if needed, and queries them. It is used as a context manager,
+    which closes the database.
+
+    Parameters:
+        path <-- a string, the database file
+    Returns:
+        an object of the class ResultStore
+    """
+
+    def __init__(self, path: str) -> None:
+        """Initialize a new ResultStore, opening or creating the database."""
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.row_factory = sqlite3.Row
+        with self.connection:
+            self.connection.executescript(SCHEMA)
+            # databases written before the rejections were counted lack their
+            # columns; their runs are left NULL
+            existing = {
+                row["name"]
+                for row in self.connection.execute("PRAGMA table_info(runs)")
+            }
+            for column in REJECTION_COLUMNS.values():
+                if column not in existing:
+                    self.connection.execute(
+                        f"ALTER TABLE runs ADD COLUMN {column} INTEGER"
+                    )
+
+    def __enter__(self) -> "ResultStore":  # noqa: PYI034
+        """Return the store."""
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        """Close the database."""
+        self.close()
+
+    def close(self) -> None:
+        """close() closes the database."""
+        self.connection.close()
+
+    def add_run(
+        self,
+        design: Sequence[Any],
+        results: sensor.SensorList,
+        name: str | None = None,
+        options: dict[str, Any] | None = None,
+        elapsed: float | None = None,
+        candidates: int | None = None,
+        task_errors: int = 0,
+    ) -> int:
+        """
+        add_run() adds a design and its sensors to the database, in one transaction.
+
+        Parameters:
+            design      <-- a tuple, the arguments of Designer.design()
+            results     <-- a SensorList, the sensors of the design
+            name        <-- a string, the name of the target (see batch.py), or None
+            options     <-- a dictionary, the options of the run, stored as JSON
+            elapsed     <-- a float, the seconds the run took, or None
+            candidates  <-- an integer, the candidates generated, or None
+            task_errors <-- an integer, the tasks which failed outright
+        Returns:
+            an integer, the id of the run
+        """
+        rec_seq, binding_state, max_sensor_size, min_sens_per_seed, fixed, thiol = (
+            design
+        )
+        target = rec_seq.lower()
+        rejections = ", ".join(REJECTION_COLUMNS.values())
+        marks = ", ".join("?" * (15 + len(REJECTION_COLUMNS)))
+        with self.connection:
+            cursor = self.connection.execute(
+                "INSERT INTO runs (created, name, target, binding_state,"
+                " max_sensor_size, min_sens_per_seed, fixed, thiol, options, elapsed,"
+                f" candidates, sensors, failed, task_errors, last_error, {rejections})"
+                f" VALUES ({marks})",
+                (
+                    time.strftime("%Y-%m-%dT%H:%M:%S"),
+                    name,
+                    target,
+                    binding_state,
+                    max_sensor_size,
+                    min_sens_per_seed,
+                    fixed,
+                    thiol,
+                    json.dumps(options or {}, sort_keys=True),
+                    elapsed,
+                    candidates,
+                    len(results),
+                    results.failed,
+                    task_errors,
+                    results.error,
+                    *(results.rejected.get(code, 0) for code in REJECTION_COLUMNS),
+                ),
+            )
+            run_id = cursor.lastrowid
+            assert run_id is not None
+            columns = ", ".join(SENSOR_COLUMNS)
+            marks = ", ".join("?" * (len(SENSOR_COLUMNS) + 2))
+            self.connection.executemany(
+                f"INSERT INTO sensors (run_id, target, {columns}) VALUES ({marks})",
+                ((run_id, target, *sen.as_dict().values()) for sen in results),
+            )
+        return run_id
+
+    def top(self, target: str, n: int = 10) -> list[sqlite3.Row]:
+        """
+        top() returns the best n sensors found for a target in all runs, each
+        sequence once (from the run that found it first), best score first.
+
+        Parameters:
+            target <-- a string, the recognition sequence
+            n      <-- an integer, the most sensors returned
+        Returns:
+            a list of sqlite3.Rows, with run_id and the columns of SENSOR_COLUMNS
+        """
+        columns = ", ".join(SENSOR_COLUMNS)
+        return self.connection.execute(
+            f"SELECT MIN(run_id) AS run_id, {columns} FROM sensors"
+            " WHERE target = ? GROUP BY sequence ORDER BY score, sequence LIMIT ?",
+            (target.lower(), n),
+        ).fetchall()
+
+
+def main(argv: list[str] | None = None) -> None:
+    """
+    main() parses the command line of "fealden query", and writes the best sensors
+    found for a target in every run in the database as CSV, to stdout.
+
+    Parameters:
+        argv <-- a list of strings, the arguments after "query", or None for sys.argv
+    Returns:
+        Nothing
+    """
+    parser = argparse.ArgumentParser(
+        prog="fealden query",
+        description="Show the best sensors for a target across the runs in a"
+        " database written with --db.",
+    )
+    parser.add_argument("db", type=str, help="The database file.")
+    parser.add_argument("target", type=str, help="The recognition sequence.")
+    parser.add_argument(
+        "-n",
+        type=int,
+        metavar="N",
+        help="Show the best N sensors.",
+        default=10,
+    )
+    args = parser.parse_args(argv)
+    if not os.path.exists(args.db):
+        parser.error(f"No database {args.db}")
+    try:
+        with ResultStore(args.db) as store:
+            rows = store.top(args.target, args.n)
+    except sqlite3.Error as e:
+        print(f"Could not query {args.db}: {e}", file=sys.stderr)
+        sys.exit(1)
+    writer = csv.writer(sys.stdout, lineterminator="\n")
+    writer.writerow(["Run", *sensor.Sensor.csv_header().split(",")])
+    writer.writerows(tuple(row) for row in rows)
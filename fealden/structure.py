@@ -1,10 +1,4 @@
-import os
-
-from dotenv import load_dotenv
-
-__all__ = ["RNAfolder"]
-
-"""fealden requies a .env file to specify external file locations and backend to use.
+"""fealden requires a .env file to specify external file locations and backend to use.
 
 Contents of an example .env file:
 
@@ -13,16 +7,330 @@ HYBRID_SS_MIN=/home/username/unafold-new/bin/hybrid-ss-min
 SIR_GRAPH=/home/username/mfold/bin/sir_graph
 RNASTRUCTURE=/home/username/RNAstructure
 
-FEALDEN_BACKEND can be 'mfold' or 'rnastructure'
+FEALDEN_FOLD_TIMEOUT=60  # seconds before an external folding program is killed
+FEALDEN_FOLD_RETRIES=2   # further attempts at a fold that failed or timed out
+
+FEALDEN_BACKEND can be 'mfold' or 'rnastructure', 'nnfold' for the built-in folding
+engine (needs numpy, see _nnfold.py), 'replay' to serve results recorded earlier
+with FEALDEN_BACKEND=record (see _replay.py for their settings), or 'synthetic' for
+generated results with no external binaries (see _synthetic.py)
+
+The backend is only imported, and the .env file only read, when the first sequence
+is folded, so importing fealden stays fast and works without any backend installed.
+A backend can also be chosen at runtime with use_backend(), which takes precedence
+over FEALDEN_BACKEND.
+
+With use_fold_cache(size), each process keeps the results of the last size sequences
+it folded, so a sequence designed again (in the same run, or a later one in a
+long-lived worker) is not folded again.
+
+With use_ensemble(True), sensors are scored with state populations from the
+partition function (see unpaired_probabilities()), and the backends list fewer
+suboptimal structures.
 """
 
-load_dotenv()
+import asyncio
+import importlib
+import math
+import os
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import Any, Protocol, TypeVar
+
+__all__ = [
+    "FoldingError",
+    "RNAfolder",
+    "fold_async",
+    "BACKENDS",
+    "BACKEND_NAMES",
+    "use_backend",
+    "backend_name",
+    "get_backend",
+    "backend_modules",
+    "warm_up",
+    "use_fold_cache",
+    "fold_cache_size",
+    "fold_cache_info",
+    "fold_timeout",
+    "fold_retries",
+    "use_ensemble",
+    "ensemble_enabled",
+    "suboptimal_percent",
+    "unpaired_probabilities",
+]
+
+# backend name --> module providing its RNAfolder class
+BACKENDS = {
+    "mfold": "._unafold",
+    "rnastructure": "._rnastructure",
+    "replay": "._replay",
+    "synthetic": "._synthetic",
+    "nnfold": "._nnfold",
+}
+# 'record' wraps the backend named by FEALDEN_RECORD_BACKEND
+BACKEND_NAMES = sorted([*BACKENDS, "record"])
+
+# suboptimal window, in percent of the minimum free energy, requested from backends
+SUBOPTIMAL_PERCENT = 15
+# the ensemble supplies the state populations, so folds are only needed for tagging
+ENSEMBLE_SUBOPTIMAL_PERCENT = 5
+# gas constant times temperature, in kcal/mol, matching fold.Fold.RT
+RT = 8.3144598 * (1.0 / 4184.0) * 298.0
+# defaults for FEALDEN_FOLD_TIMEOUT and FEALDEN_FOLD_RETRIES
+FOLD_TIMEOUT = 60.0
+FOLD_RETRIES = 2
+
+
+class FoldingError(RuntimeError):
+    """A backend could not fold a sequence: its program failed or timed out."""
+
+
+class Folder(Protocol):
+    """The interface of the RNAfolder class every backend provides."""
+
+    seq: str
+    number_folds: int
+    structure_dict: list[dict[str, float | list[list[int]]]]
+
+
+T = TypeVar("T")
+
+_backend_name: str | None = None
+_folder: Any = None
+_ensemble = False
+# (sequence, suboptimal percent) --> folding result, least recently used first
+_fold_cache: "OrderedDict[tuple[str, int], Folder]" = OrderedDict()
+_fold_cache_size = 0
+_fold_cache_hits = 0
+_fold_cache_misses = 0
+
+
+def use_backend(name: str | None) -> None:
+    """
+    use_backend() selects the folding backend for this process. The backend is not
+    imported until the next sequence is folded.
+
+    Parameters:
+        name <-- a string, one of BACKEND_NAMES, or None to use FEALDEN_BACKEND
+    Returns:
+        Nothing
+    """
+    global _backend_name, _folder
+    if name is not None and name not in BACKEND_NAMES:
+        raise ValueError(f"Unknown backend {name}, expected one of {BACKEND_NAMES}")
+    _backend_name = name
+    _folder = None
+    _fold_cache.clear()
+
+
+def backend_name() -> str | None:
+    """Return the backend selected with use_backend(), or None for FEALDEN_BACKEND."""
+    return _backend_name
+
+
+def load_backend(name: str | None) -> Any:
+    """Import a backend by name and return its RNAfolder class."""
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    if name is None:
+        name = os.getenv("FEALDEN_BACKEND")
+    if name == "record":
+        from ._replay import recording
+
+        return recording(load_backend(os.getenv("FEALDEN_RECORD_BACKEND", "mfold")))
+    if name not in BACKENDS:
+        raise ImportError(
+            f"No backend found, aborting (FEALDEN_BACKEND={name}; "
+            f"expected one of {BACKEND_NAMES})"
+        )
+    return importlib.import_module(BACKENDS[name], __package__).RNAfolder
+
+
+def backend_modules(name: str | None) -> list[str]:
+    """
+    backend_modules() returns the modules a backend imports, so they can be
+    preloaded (for instance by a multiprocessing forkserver) before any sequence is
+    folded. FEALDEN_BACKEND is read, from the environment only, if name is None.
+    """
+    if name is None:
+        name = os.getenv("FEALDEN_BACKEND")
+    if name == "record":
+        recorded = os.getenv("FEALDEN_RECORD_BACKEND", "mfold")
+        return [f"{__package__}._replay", *backend_modules(recorded)]
+    if name not in BACKENDS:
+        return []
+    return [__package__ + BACKENDS[name]]
+
+
+def get_backend() -> Any:
+    """Return the RNAfolder class of the selected backend, importing it if needed."""
+    global _folder
+    if _folder is None:
+        _folder = load_backend(_backend_name)
+    return _folder
+
+
+def warm_up() -> None:
+    """
+    warm_up() imports the selected backend and lets it preload anything it can reuse
+    between sequences (such as thermodynamic parameters), if it supports that.
+    """
+    hook = getattr(get_backend(), "warm_up", None)
+    if hook is not None:
+        hook()
+
+
+def fold_timeout() -> float:
+    """Return the seconds an external folding program may run (FEALDEN_FOLD_TIMEOUT)."""
+    return float(os.getenv("FEALDEN_FOLD_TIMEOUT") or FOLD_TIMEOUT)
+
+
+def fold_retries() -> int:
+    """Return how often a failed fold is attempted again (FEALDEN_FOLD_RETRIES)."""
+    return int(os.getenv("FEALDEN_FOLD_RETRIES") or FOLD_RETRIES)
+
+
+def retry(func: Callable[..., T], *args: Any) -> T:
+    """
+    retry() calls func(*args), calling it again up to fold_retries() times if it
+    raises FoldingError. The error of the last attempt is raised.
+    """
+    attempts = fold_retries()
+    while True:
+        try:
+            return func(*args)
+        except FoldingError:
+            if attempts <= 0:
+                raise
+            attempts -= 1
+
+
+def use_fold_cache(size: int) -> None:
+    """
+    use_fold_cache() keeps the folding results of the last size sequences folded by
+    this process, or none if size is 0. The cache is emptied.
+    """
+    global _fold_cache_size, _fold_cache_hits, _fold_cache_misses
+    _fold_cache_size = size
+    _fold_cache_hits = _fold_cache_misses = 0
+    _fold_cache.clear()
+
+
+def fold_cache_size() -> int:
+    """Return the folding results kept by the fold cache, 0 if there is none."""
+    return _fold_cache_size
+
+
+def fold_cache_info() -> tuple[int, int, int]:
+    """Return the hits, misses and current size of the fold cache."""
+    return _fold_cache_hits, _fold_cache_misses, len(_fold_cache)
+
+
+def cached_fold(seq: str) -> Folder | None:
+    """Return the cached folding result of a sequence, or None."""
+    global _fold_cache_hits, _fold_cache_misses
+    if not _fold_cache_size:
+        return None
+    key = (seq.upper(), suboptimal_percent())
+    folder = _fold_cache.get(key)
+    if folder is None:
+        _fold_cache_misses += 1
+        return None
+    _fold_cache_hits += 1
+    _fold_cache.move_to_end(key)
+    return folder
+
+
+def cache_fold(seq: str, folder: Folder) -> Folder:
+    """Add a folding result to the cache, if there is one, and return it."""
+    if _fold_cache_size:
+        _fold_cache[(seq.upper(), suboptimal_percent())] = folder
+        while len(_fold_cache) > _fold_cache_size:
+            _fold_cache.popitem(last=False)
+    return folder
+
+
+def RNAfolder(seq: str) -> Folder:
+    """Fold a sequence with the selected backend, retrying if it fails."""
+    folder = cached_fold(seq)
+    if folder is not None:
+        return folder
+    return cache_fold(seq, retry(get_backend(), seq))
+
+
+async def fold_async(seq: str) -> Folder:
+    """
+    fold_async() folds a sequence with the selected backend from an event loop,
+    retrying like RNAfolder() if it fails. Backends which run a subprocess provide
+    a fold_async() coroutine; the others are run in the loop's default executor.
+    """
+    folder = cached_fold(seq)
+    if folder is not None:
+        return folder
+    backend = get_backend()
+    hook = getattr(backend, "fold_async", None)
+    attempts = fold_retries()
+    while True:
+        try:
+            if hook is not None:
+                return cache_fold(seq, await hook(seq))
+            loop = asyncio.get_running_loop()
+            return cache_fold(seq, await loop.run_in_executor(None, backend, seq))
+        except FoldingError:
+            if attempts <= 0:
+                raise
+            attempts -= 1
+
+
+def use_ensemble(enabled: bool) -> None:
+    """Select partition function (ensemble) scoring for this process."""
+    global _ensemble
+    _ensemble = enabled
+
+
+def ensemble_enabled() -> bool:
+    """Return True if ensemble scoring is selected."""
+    return _ensemble
+
+
+def suboptimal_percent() -> int:
+    """Return the suboptimal window backends should fold with, in percent."""
+    return ENSEMBLE_SUBOPTIMAL_PERCENT if _ensemble else SUBOPTIMAL_PERCENT
+
+
+def unpaired_probabilities(seq: str, folder: Folder) -> list[float]:
+    """
+    unpaired_probabilities() returns the probability that each base of a sequence is
+    unpaired, across the whole folding ensemble. Backends with a partition function
+    provide it through an unpaired_probabilities() method; for the others, the
+    probabilities are Boltzmann weighted over the folds they listed.
+
+    Parameters:
+        seq    <-- a string, the sequence
+        folder <-- the result of RNAfolder(seq)
+    Returns:
+        a list of floats between 0 and 1, one per base
+    """
+    hook = getattr(folder, "unpaired_probabilities", None)
+    if hook is not None:
+        return retry(hook)
+    return boltzmann_unpaired(len(seq), folder.structure_dict)
 
-backend = os.getenv("FEALDEN_BACKEND")
 
-if backend == "mfold":
-    from ._unafold import RNAfolder  # noqa
-elif backend == "rnastructure":
-    from ._rnastructure import RNAfolder  # type: ignore # noqa
-else:
-    raise ImportError("No backend found, aborting")
+def boltzmann_unpaired(
+    length: int, structure_dict: list[dict[str, float | list[list[int]]]]
+) -> list[float]:
+    """Return the Boltzmann weighted probability that each base is unpaired."""
+    if not structure_dict:
+        return [1.0] * length
+    lowest = min(float(each["deltaG"]) for each in structure_dict)  # type: ignore
+    unpaired = [0.0] * length
+    total = 0.0
+    for each in structure_dict:
+        weight = math.exp(-(float(each["deltaG"]) - lowest) / RT)  # type: ignore
+        total += weight
+        for base, pair in each["bps"]:  # type: ignore[union-attr]
+            if pair == 0:
+                unpaired[base - 1] += weight
+    return [p / total for p in unpaired]
@@ -0,0 +1,306 @@
+"""Write the sensors of a run as CSV, JSON lines, Parquet or NumPy .npz files.
+
+The format is chosen with --format (see FORMATS). Every writer takes the sensors
+in batches of up to BATCH_SIZE, so a format can build each batch at once:
+
+    - csv, the default: the columns of Sensor.csv_header(), one line per sensor
+    - jsonl: one JSON object per line, with the keys of Sensor.as_dict(), for
+      streaming consumers
+    - parquet: a columnar Parquet file, one row group per batch, written with
+      pyarrow (pip install pyarrow); without it, an .npz file is written instead
+    - npz: a compressed NumPy archive with one array per column (needs numpy)
+
+The columnar formats keep scores and concentrations as float64 and counts as
+int64, so readers do not parse them back from text.
+
+The sensors are written best first once the run ends, or with --stream as the
+tasks find them (see SensorStream), in the order found.
+"""
+
+import importlib.util
+import itertools
+import json
+import os
+from abc import ABC, abstractmethod
+from collections.abc import Iterable, Iterator
+from typing import Any, TextIO
+
+from . import sensor
+
+# format --> file suffix
+FORMATS = {"csv": ".csv", "jsonl": ".jsonl", "parquet": ".parquet", "npz": ".npz"}
+# sensors written at a time
+BATCH_SIZE = 10000
+
+
+def batches(sensors: Iterable[sensor.Sensor]) -> Iterator[list[sensor.Sensor]]:
+    """Yield the sensors in lists of up to BATCH_SIZE."""
+    iterator = iter(sensors)
+    while batch := list(itertools.islice(iterator, BATCH_SIZE)):
+        yield batch
+
+
+def has_pyarrow() -> bool:
+    """Return whether pyarrow is installed, for the parquet format."""
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def output_format(form: str) -> str:
+    """
+    output_format() returns the format written for the one asked for: parquet is
+    written as npz if pyarrow is not installed.
+    """
+    if form not in FORMATS:
+        raise ValueError(f"Unknown format {form}, expected one of {list(FORMATS)}")
+    if form == "parquet" and not has_pyarrow():
+        return "npz"
+    return form
+
+
+def output_path(path: str, form: str) -> str:
+    """Return path with the suffix of a format in place of .csv, if it has one."""
+    root, suffix = os.path.splitext(path)
+    if suffix in FORMATS.values():
+        return root + FORMATS[form]
+    return path
+
+
+class ResultWriter(ABC):
+
+    """
+    ResultWriter is the base of the writers of each format. A writer is used as a
+    context manager, which closes the file:
+
+        with open_writer("results.jsonl", "jsonl") as writer:
+            writer.write_all(sensors)
+
+    Parameters:
+        path          <-- a string, the file to write
+        target_column <-- a bool, whether each row starts with the target name
+    Returns:
+        an object of a subclass of ResultWriter
+    """
+
+    def __init__(self, path: str, target_column: bool = False) -> None:
+        """Initialize a new writer of path."""
+        self.path = path
+        self.target_column = target_column
+        self.rows = 0
+
+    def __enter__(self) -> "ResultWriter":  # noqa: PYI034
+        """Return the writer."""
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        """Close the file."""
+        self.close()
+
+    @abstractmethod
+    def write(self, sensors: list[sensor.Sensor], target: str | None = None) -> None:
+        """write() writes a batch of sensors, with their target's name if given."""
+
+    def write_all(
+        self, sensors: Iterable[sensor.Sensor], target: str | None = None
+    ) -> None:
+        """write_all() writes sensors in batches of BATCH_SIZE."""
+        for batch in batches(sensors):
+            self.write(batch, target)
+
+    @abstractmethod
+    def close(self) -> None:
+        """close() finishes and closes the file."""
+
+
+class CsvWriter(ResultWriter):
+
+    """CsvWriter writes the lines of Sensor.csv_line(), after Sensor.csv_header()."""
+
+    def __init__(self, path: str, target_column: bool = False) -> None:
+        """Initialize a new CsvWriter, writing the header."""
+        super().__init__(path, target_column)
+        self.file: TextIO = open(path, "w")
+        header = sensor.Sensor.csv_header()
+        self.file.write(("Target," if target_column else "") + header + "\n")
+
+    def write(self, sensors: list[sensor.Sensor], target: str | None = None) -> None:
+        """write() writes a line for each sensor."""
+        prefix = f"{target}," if self.target_column else ""
+        self.file.write("".join(f"{prefix}{sen.csv_line()}\n" for sen in sensors))
+        self.rows += len(sensors)
+
+    def close(self) -> None:
+        """close() closes the file."""
+        self.file.close()
+
+
+class JsonlWriter(ResultWriter):
+
+    """JsonlWriter writes Sensor.as_dict() as a JSON object on each line."""
+
+    def __init__(self, path: str, target_column: bool = False) -> None:
+        """Initialize a new JsonlWriter."""
+        super().__init__(path, target_column)
+        self.file: TextIO = open(path, "w")
+
+    def write(self, sensors: list[sensor.Sensor], target: str | None = None) -> None:
+        """write() writes a line for each sensor."""
+        extra = {"target": target} if self.target_column else {}
+        self.file.write(
+            "".join(json.dumps({**extra, **sen.as_dict()}) + "\n" for sen in sensors)
+        )
+        self.rows += len(sensors)
+
+    def close(self) -> None:
+        """close() closes the file."""
+        self.file.close()
+
+
+def columns(
+    sensors: list[sensor.Sensor], target: str | None, target_column: bool
+) -> dict[str, list[Any]]:
+    """Return the values of a batch of sensors by column, as the columnar formats."""
+    rows = [sen.as_dict() for sen in sensors]
+    values = {name: [row[name] for row in rows] for name in sensor.COLUMNS}
+    if target_column:
+        return {"target": [target] * len(rows), **values}
+    return values
+
+
+class ParquetWriter(ResultWriter):
+
+    """ParquetWriter writes each batch as a row group of a Parquet file."""
+
+    def __init__(self, path: str, target_column: bool = False) -> None:
+        """Initialize a new ParquetWriter, which needs pyarrow."""
+        super().__init__(path, target_column)
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        types = {str: pa.string(), float: pa.float64(), int: pa.int64()}
+        fields = [pa.field(name, types[kind]) for name, kind in sensor.COLUMNS.items()]
+        if target_column:
+            fields.insert(0, pa.field("target", pa.string()))
+        self.pa = pa
+        self.schema = pa.schema(fields)
+        self.writer = pq.ParquetWriter(path, self.schema)
+
+    def write(self, sensors: list[sensor.Sensor], target: str | None = None) -> None:
+        """write() writes the batch as a row group."""
+        batch = columns(sensors, target, self.target_column)
+        self.writer.write_table(self.pa.table(batch, schema=self.schema))
+        self.rows += len(sensors)
+
+    def close(self) -> None:
+        """close() writes the footer of the file."""
+        self.writer.close()
+
+
+class NpzWriter(ResultWriter):
+
+    """
+    NpzWriter keeps each batch as NumPy arrays, one per column, and saves them all
+    in a compressed .npz archive when it is closed, read with numpy.load().
+    """
+
+    def __init__(self, path: str, target_column: bool = False) -> None:
+        """Initialize a new NpzWriter, which needs numpy."""
+        super().__init__(path, target_column)
+        import numpy as np
+
+        self.np = np
+        self.types: dict[str, type] = dict(sensor.COLUMNS)
+        if target_column:
+            self.types = {"target": str, **self.types}
+        self.chunks: dict[str, list[Any]] = {name: [] for name in self.types}
+
+    def write(self, sensors: list[sensor.Sensor], target: str | None = None) -> None:
+        """write() converts the batch to arrays."""
+        for name, values in columns(sensors, target, self.target_column).items():
+            self.chunks[name].append(self.np.array(values, dtype=self.types[name]))
+        self.rows += len(sensors)
+
+    def close(self) -> None:
+        """close() saves the arrays of every column."""
+        arrays = {
+            name: (
+                self.np.concatenate(chunks)
+                if chunks
+                else self.np.array([], dtype=self.types[name])
+            )
+            for name, chunks in self.chunks.items()
+        }
+        # numpy adds .npz to names without it
+        with open(self.path, "wb") as f:
+            self.np.savez_compressed(f, **arrays)  # type: ignore[arg-type]
+
+
+class SensorStream:
+
+    """
+    SensorStream passes the sensors of each task to a writer as the task completes,
+    each sequence once per target, in batches of BATCH_SIZE. It is the found
+    function of Designer.design_many():
+
+        stream = SensorStream(writer)
+        designer.design_many(designs, found=lambda index, sensors: stream.add(sensors))
+        stream.flush()
+
+    Parameters:
+        writer <-- a ResultWriter, to write the sensors to
+    Returns:
+        an object of the class SensorStream
+    """
+
+    def __init__(self, writer: ResultWriter) -> None:
+        """Initialize a new SensorStream, writing to writer."""
+        self.writer = writer
+        self.seen: set[tuple[str | None, str]] = set()
+        self.pending: dict[str | None, list[sensor.Sensor]] = {}
+
+    def add(self, sensors: Iterable[sensor.Sensor], target: str | None = None) -> None:
+        """
+        add() queues the sensors of a task not written before, and writes the
+        sensors queued for the target once there are BATCH_SIZE of them.
+        """
+        batch = self.pending.setdefault(target, [])
+        for sen in sensors:
+            if (target, sen.seq) not in self.seen:
+                self.seen.add((target, sen.seq))
+                batch.append(sen)
+        if len(batch) >= BATCH_SIZE:
+            self.writer.write(batch, target)
+            del self.pending[target]
+
+    def flush(self) -> None:
+        """flush() writes the sensors still queued, at the end of the run."""
+        for target, batch in self.pending.items():
+            if batch:
+                self.writer.write(batch, target)
+        self.pending = {}
+
+
+WRITERS: dict[str, type[ResultWriter]] = {
+    "csv": CsvWriter,
+    "jsonl": JsonlWriter,
+    "parquet": ParquetWriter,
+    "npz": NpzWriter,
+}
+
+
+def open_writer(
+    path: str, form: str = "csv", target_column: bool = False
+) -> ResultWriter:
+    """
+    open_writer() returns a writer of a format (see output_format()), writing to
+    path, with the suffix of the format written in place of a .csv suffix.
+
+    Parameters:
+        path          <-- a string, the file to write
+        form          <-- a string, one of FORMATS
+        target_column <-- a bool, whether each row starts with the target name
+    Returns:
+        a ResultWriter; an ImportError is raised if the format needs numpy and it
+        is not installed
+    """
+    form = output_format(form)
+    return WRITERS[form](output_path(path, form), target_column)
@@ -0,0 +1,34 @@
+from collections.abc import Callable
+
+import pytest
+
+from fealden import sensor
+
+SensorFactory = Callable[..., sensor.SensorList]
+
+
+def make_sensor(seq: str, score: float, seed_name: str = "Graph 1") -> sensor.Sensor:
+    """Return a Sensor with a sequence and score, without folding or scoring it."""
+    sen = sensor.Sensor.__new__(sensor.Sensor)
+    sen.seq, sen.score, sen.seed_name, sen.tag_loc = seq, score, seed_name, 0
+    sen.on_conc, sen.off_conc = 1, 2
+    sen.noise_conc = sen.wrong_conc = sen.fuzzy_conc = sen.on_to_off_dist = 0
+    sen.folds, sen.base_seq = [], "cacgtg"
+    return sen
+
+
+@pytest.fixture
+def make_sensors() -> SensorFactory:
+    """
+    make_sensors returns a function making a SensorList of sensors, each given by
+    its score (with the sequence "seq<score>") or as a (sequence, score) tuple.
+    """
+
+    def make(*found: float | tuple[str, float]) -> sensor.SensorList:
+        sensors = sensor.SensorList()
+        for each in found:
+            seq, score = each if isinstance(each, tuple) else (f"seq{each}", each)
+            sensors.append(make_sensor(seq, score))
+        return sensors
+
+    return make
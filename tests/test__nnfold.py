@@ -0,0 +1,60 @@
+import pytest
+
+pytest.importorskip("numpy")
+
+from fealden._nnfold import RNAfolder  # noqa: E402
+
+SENSOR_SEQ = "ACTTCGGGACTTGCTTGAAGCACGTGCTATTGGTACCAATAGTGAGAAGT"
+
+
+def test_RNAfolder_hairpin() -> None:
+    actual = RNAfolder("gcgcaaaagcgc")
+
+    assert actual.structure_dict[0]["bps"] == [
+        [1, 12],
+        [2, 11],
+        [3, 10],
+        [4, 9],
+        [5, 0],
+        [6, 0],
+        [7, 0],
+        [8, 0],
+        [9, 4],
+        [10, 3],
+        [11, 2],
+        [12, 1],
+    ]
+    energy = actual.structure_dict[0]["deltaG"]
+    assert isinstance(energy, float) and energy < -2
+
+
+def test_RNAfolder_unstructured() -> None:
+    actual = RNAfolder("aaaaaaa")
+
+    assert actual.number_folds == 1
+    assert actual.structure_dict == [
+        {"deltaG": 0.0, "bps": [[base, 0] for base in range(1, 8)]}
+    ]
+
+
+def test_RNAfolder_suboptimals() -> None:
+    actual = RNAfolder(SENSOR_SEQ)
+
+    assert actual.number_folds > 1
+    energies = [each["deltaG"] for each in actual.structure_dict]
+    assert energies == sorted(energies)
+    assert energies[-1] <= energies[0] * 0.85 + 1e-3  # type: ignore[operator]
+    for each in actual.structure_dict:
+        # the energies found by dynamic programming match the structures reported
+        assert actual.structure_energy(each["bps"]) == pytest.approx(  # type: ignore
+            each["deltaG"], abs=1e-3
+        )
+        partners: dict[int, int] = dict(each["bps"])  # type: ignore[arg-type]
+        for base, partner in partners.items():
+            if partner:
+                assert partners[partner] == base
+                assert abs(partner - base) > 3
+
+
+def test_RNAfolder__str() -> None:
+    assert str(RNAfolder("catgctagctagt")) == "CATGCTAGCTAGT"
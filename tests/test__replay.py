@@ -0,0 +1,109 @@
+import os
+from tempfile import TemporaryDirectory
+from unittest import mock
+
+import pytest
+
+from fealden import _replay, structure
+from fealden.fealden import Designer
+
+STRUCTURE_DICT = [
+    {"deltaG": -1.5, "bps": [[1, 6], [2, 5], [3, 0], [4, 0], [5, 2], [6, 1]]},
+    {"deltaG": 0.0, "bps": [[1, 0], [2, 0], [3, 0], [4, 0], [5, 0], [6, 0]]},
+]
+
+
+class FakeFolder:
+    def __init__(self, seq: str) -> None:
+        self.seq = seq.upper()
+        self.structure_dict = STRUCTURE_DICT
+
+
+def test_encode_decode() -> None:
+    record = _replay.encode("CATATG", STRUCTURE_DICT, 0.5)  # type: ignore[arg-type]
+
+    assert record["folds"][0]["pairs"] == [6, 5, 0, 0, 2, 1]
+    assert _replay.decode(record) == STRUCTURE_DICT
+
+
+@pytest.mark.parametrize("archive_name", ["archive.jsonl", "archive.jsonl.gz"])
+def test_record_and_replay(archive_name: str) -> None:
+    with TemporaryDirectory() as tmpdirname:
+        archive = os.path.join(tmpdirname, archive_name)
+        with mock.patch.dict("os.environ", {"FEALDEN_REPLAY_ARCHIVE": archive}):
+            recorder = _replay.recording(FakeFolder)
+            recorder("catatg")
+            recorder("gcatgc")
+
+            replayed = _replay.RNAfolder("catatg")
+
+            assert replayed.structure_dict == STRUCTURE_DICT
+            assert replayed.number_folds == 2
+            assert set(_replay.load_archive(archive)) == {
+                ("CATATG", structure.SUBOPTIMAL_PERCENT),
+                ("GCATGC", structure.SUBOPTIMAL_PERCENT),
+            }
+
+
+def test_replay_miss() -> None:
+    with TemporaryDirectory() as tmpdirname:
+        archive = os.path.join(tmpdirname, "missing.jsonl")
+        with mock.patch.dict("os.environ", {"FEALDEN_REPLAY_ARCHIVE": archive}):
+            with pytest.raises(structure.FoldingError):
+                _replay.RNAfolder("catatg")
+
+            with mock.patch.dict("os.environ", {"FEALDEN_REPLAY_MISSES": "empty"}):
+                assert _replay.RNAfolder("catatg").structure_dict == []
+
+
+def test_replay_miss_fails_candidate() -> None:
+    with TemporaryDirectory() as tmpdirname:
+        environ = {"FEALDEN_REPLAY_ARCHIVE": os.path.join(tmpdirname, "empty.jsonl")}
+        with mock.patch.dict("os.environ", environ):
+            with Designer(backend="replay", event_loop=True) as designer:
+                results = designer.design("CACGTG", 1, min_sens_per_seed=5)
+        # every candidate failed on its own, rather than the whole design
+        assert len(results) == 0 and results.failed > 0
+        assert results.error is not None and "replay archive" in results.error
+        assert not designer.task_errors
+
+    # the archive not being configured is an error of the run, not of a candidate
+    with mock.patch.dict("os.environ", {"FEALDEN_REPLAY_ARCHIVE": ""}):
+        with pytest.raises(LookupError, match="FEALDEN_REPLAY_ARCHIVE"):
+            _replay.RNAfolder("catatg")
+
+
+@mock.patch("fealden._replay.time.sleep")
+def test_replay_latency(mock_sleep: mock.Mock) -> None:
+    with TemporaryDirectory() as tmpdirname:
+        archive = os.path.join(tmpdirname, "latency.jsonl")
+        _replay.append_record(
+            archive,
+            _replay.encode("CATATG", STRUCTURE_DICT, 0.25),  # type: ignore[arg-type]
+        )
+        environ = {"FEALDEN_REPLAY_ARCHIVE": archive}
+        with mock.patch.dict("os.environ", environ):
+            _replay.RNAfolder("catatg")
+            mock_sleep.assert_not_called()
+
+            with mock.patch.dict("os.environ", {"FEALDEN_REPLAY_LATENCY": "recorded"}):
+                _replay.RNAfolder("catatg")
+                mock_sleep.assert_called_once_with(0.25)
+
+
+def test_replay_suboptimal_percent() -> None:
+    with TemporaryDirectory() as tmpdirname:
+        archive = os.path.join(tmpdirname, "percent.jsonl")
+        record = _replay.encode("CATATG", STRUCTURE_DICT, 0.0)  # type: ignore[arg-type]
+        # records written before the window was kept were folded with the default
+        del record["percent"]
+        _replay.append_record(archive, record)
+        with mock.patch.dict("os.environ", {"FEALDEN_REPLAY_ARCHIVE": archive}):
+            assert _replay.RNAfolder("catatg").number_folds == 2
+            try:
+                # ensemble runs fold with another window, so they are not replayed
+                structure.use_ensemble(True)
+                with pytest.raises(structure.FoldingError, match="window of 5%"):
+                    _replay.RNAfolder("catatg")
+            finally:
+                structure.use_ensemble(False)
@@ -27,3 +27,65 @@ def test__init__() -> None:
         RNAstructure.RNA.fromString.assert_called_once_with(
             "CACGTGGTGCAC", backbone="dna"
         )
+
+
+def test_warm_up() -> None:
+    import fealden._rnastructure as _rnastructure
+
+    with mock.patch.object(
+        _rnastructure, "RNAstructure", mock.MagicMock(), create=True
+    ) as mock_rnastructure:
+        try:
+            _rnastructure.RNAfolder.warm_up()
+            template = mock_rnastructure.RNA.fromString.return_value
+            mock_rnastructure.RNA.fromString.reset_mock()
+
+            _ = _rnastructure.RNAfolder("CACGTGGTGCAC")
+
+            mock_rnastructure.RNA.fromString.assert_not_called()
+            mock_rnastructure.RNA.assert_called_with(
+                "CACGTGGTGCAC", mock_rnastructure.SEQUENCE_STRING, template
+            )
+        finally:
+            _rnastructure._thermo_template = None
+
+
+def test_parse_ct_pairs() -> None:
+    from fealden._rnastructure import RNAfolder
+
+    ct_output = (
+        "    6  ENERGY = -1.2  seq\n"
+        "    1 G       0    2    6    1\n"
+        "    2 A       1    3    0    2\n"
+        "    3 A       2    4    0    3\n"
+        "    4 A       3    5    0    4\n"
+        "    5 A       4    6    0    5\n"
+        "    6 C       5    0    1    6\n"
+        "    6  ENERGY = 0  seq\n"
+        "    1 G       0    2    0    1\n"
+        "    2 A       1    3    0    2\n"
+        "    3 A       2    4    0    3\n"
+        "    4 A       3    5    0    4\n"
+        "    5 A       4    6    0    5\n"
+        "    6 C       5    0    0    6\n"
+    )
+
+    assert RNAfolder.parse_ct_pairs(ct_output, 6) == [
+        [6, 0, 0, 0, 0, 1],
+        [0, 0, 0, 0, 0, 0],
+    ]
+
+
+def test_unpaired_probabilities() -> None:
+    from fealden._rnastructure import RNAfolder
+
+    assert RNAfolder.possible_pairs("GAAC") == []
+    assert RNAfolder.possible_pairs("GTTTTC") == [(0, 4), (0, 5)]
+
+    folder = RNAfolder.__new__(RNAfolder)
+    folder.seq = "GAAAAC"
+    folder.RNAobj = mock.MagicMock()
+    folder.RNAobj.GetPairProbability.return_value = 0.25
+    assert folder.unpaired_probabilities() == [0.75, 1.0, 1.0, 1.0, 1.0, 0.75]
+    # the one pair which can form is the only one read
+    folder.RNAobj.GetPairProbability.assert_called_once_with(1, 6)
@@ -0,0 +1,47 @@
+from unittest import mock
+
+from fealden._synthetic import RNAfolder, candidate_stems, energy
+
+SENSOR_SEQ = "acttcgggacttgcttgaagcacgtgctattggtaccaatagtgagaagt"
+
+
+def test_candidate_stems() -> None:
+    # a 4 base pair hairpin with a 4 base loop
+    assert candidate_stems("GCGCAAAAGCGC") == [(0, 11, 4)]
+
+
+def test_energy() -> None:
+    assert energy("GCGCAAAAGCGC", [(0, 11, 4)]) == -2.24 - 2.17 - 2.24 + 3.5
+
+
+def test_RNAfolder_structures_are_valid() -> None:
+    actual = RNAfolder(SENSOR_SEQ)
+
+    assert 1 < actual.number_folds <= 4
+    energies = [each["deltaG"] for each in actual.structure_dict]
+    assert energies == sorted(energies)
+    assert energies[-1] - energies[0] <= 2.0  # type: ignore[operator]
+    for each in actual.structure_dict:
+        partners: dict[int, int] = dict(each["bps"])  # type: ignore[arg-type]
+        for base, partner in partners.items():
+            if partner == 0:
+                continue
+            assert partners[partner] == base
+            assert abs(partner - base) > 3
+            for other, other_partner in partners.items():
+                # no pseudoknots
+                assert not (base < other < partner < other_partner)
+
+
+def test_RNAfolder_is_deterministic() -> None:
+    assert RNAfolder(SENSOR_SEQ).structure_dict == RNAfolder(SENSOR_SEQ).structure_dict
+
+
+def test_RNAfolder_settings() -> None:
+    environ = {"FEALDEN_SYNTHETIC_FOLDS": "2", "FEALDEN_SYNTHETIC_SLEEP": "0.5"}
+    with mock.patch.dict("os.environ", environ):
+        with mock.patch("fealden._synthetic.time.sleep") as mock_sleep:
+            actual = RNAfolder(SENSOR_SEQ)
+
+    assert actual.number_folds == 2
+    mock_sleep.assert_called_once_with(0.5)
@@ -1,8 +1,13 @@
+import asyncio
+import sys
+from tempfile import TemporaryDirectory
 from unittest.mock import MagicMock, patch
 
+import pytest
 from dotenv import load_dotenv
 
-from fealden._unafold import RNAfolder
+from fealden._unafold import RNAfolder, read_output, run_program, run_program_async
+from fealden.structure import FoldingError
 
 load_dotenv("../.env")
 
@@ -80,6 +85,8 @@ def test_parse_ct_to_folds() -> None:
 @patch("fealden._unafold.open")
 @patch("fealden._unafold.subprocess.Popen")
 def test_collect_unafold_ct(mock_run: MagicMock, mock_open: MagicMock) -> None:
+    mock_run.return_value.communicate.return_value = ("", "")
+    mock_run.return_value.returncode = 0
     _ = RNAfolder.collect_unafold_ct("CATGCTAGCTAGT")
     mock_run.assert_called_once()
     mock_open.assert_called_once()
@@ -180,3 +187,32 @@ def test_RNAfolder_find_best_tag() -> None:
     actual = RNAfolder("catgctagctagt").find_best_tag()
 
     assert actual == EXPECTED_TAG
+
+
+def test_parse_plot_unpaired() -> None:
+    plot_output = "i\tj\tprobability\n1\t6\t0.75\n2\t5\t0.5\n1\t5\t0.25\n"
+
+    actual = RNAfolder.parse_plot_unpaired(plot_output, 6)
+
+    assert actual == [0.0, 0.5, 1.0, 1.0, 0.25, 0.25]
+
+
+def test_run_program_failures() -> None:
+    with TemporaryDirectory() as tmpdirname:
+        with pytest.raises(FoldingError, match="status 3: bad input"):
+            code = "import sys; sys.stderr.write('bad input'); sys.exit(3)"
+            run_program([sys.executable, "-c", code], "", tmpdirname)
+        with pytest.raises(FoldingError, match="Could not start"):
+            run_program([f"{tmpdirname}/hybrid-ss-min"], "", tmpdirname)
+        with pytest.raises(FoldingError, match="wrote no stdin.ct"):
+            read_output(f"{tmpdirname}/stdin.ct", ["hybrid-ss-min"])
+
+
+@patch.dict("os.environ", {"FEALDEN_FOLD_TIMEOUT": "0.2"})
+def test_run_program_timeout() -> None:
+    command = [sys.executable, "-c", "import time; time.sleep(30)"]
+    with TemporaryDirectory() as tmpdirname:
+        with pytest.raises(FoldingError, match="timed out"):
+            run_program(command, "", tmpdirname)
+        with pytest.raises(FoldingError, match="timed out"):
+            asyncio.run(run_program_async(command, "", tmpdirname))
@@ -0,0 +1,85 @@
+import asyncio
+import random
+import threading
+from typing import Any
+from unittest import mock
+
+from fealden import asyncfold, structure
+from fealden.fealden import generate_sensor
+from fealden.seed import Seed
+
+SEED_GRAPH = [
+    "2 1 3 11 0",
+    "3 2 4",
+    "4 3 5 5 7",
+    "5 4 4",
+    "7 4 6",
+    "6 7 9 9 11",
+    "9 6 6",
+    "11 6 2",
+]
+
+
+def make_seed() -> Seed:
+    return Seed(SEED_GRAPH, "7", "CACGTG", 1, "Graph 2", 50)
+
+
+def test_FoldStats() -> None:
+    stats = asyncfold.FoldStats()
+    stats.start, stats.end = 0.0, 2.0
+    stats.folds, stats.busy, stats.peak = 10, 6.0, 4
+
+    assert stats.throughput == 5.0
+    assert stats.concurrency == 3.0
+    assert "10 sequences" in stats.summary()
+    assert "peak 4" in stats.summary()
+
+
+def test_generate_all_matches_generate_sensor() -> None:
+    try:
+        structure.use_backend("synthetic")
+        with mock.patch("fealden.fealden.seed.random", random.Random(0)):
+            expected = generate_sensor(make_seed(), "CACGTG", 40, 1, False, True)
+        for concurrency in (1, 4):
+            stats = asyncfold.FoldStats()
+            with mock.patch("fealden.fealden.seed.random", random.Random(0)):
+                tasks = [(make_seed(), "CACGTG", 40, 1, False, True)]
+                actual = asyncio.run(asyncfold.generate_all(tasks, concurrency, stats))
+
+            assert sorted(repr(s) for s in actual) == sorted(repr(s) for s in expected)
+            assert 0 < stats.folds <= 40
+            assert stats.peak <= concurrency
+    finally:
+        structure.use_backend(None)
+
+
+def test_generate_sensor() -> None:
+    try:
+        structure.use_backend("synthetic")
+        with mock.patch("fealden.fealden.seed.random", random.Random(1)):
+            actual = asyncfold.generate_sensor(
+                make_seed(), "CACGTG", 20, 1, False, True, 3
+            )
+
+        assert all(s.score >= 0 for s in actual)
+    finally:
+        structure.use_backend(None)
+
+
+def test_generate_all_scores_off_the_loop() -> None:
+    threads = set()
+    make_sensor = Seed.make_sensor
+
+    def record_thread(self: Seed, *args: Any) -> Any:
+        threads.add(threading.get_ident())
+        return make_sensor(self, *args)
+
+    try:
+        structure.use_backend("synthetic")
+        with mock.patch.object(Seed, "make_sensor", record_thread):
+            tasks = [(make_seed(), "CACGTG", 10, 1, False, True)]
+            asyncio.run(asyncfold.generate_all(tasks, 2))
+    finally:
+        structure.use_backend(None)
+    # the loop ran in this thread, and each sensor was scored in the executor
+    assert threads and threading.get_ident() not in threads
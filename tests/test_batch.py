@@ -0,0 +1,109 @@
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+import pytest
+
+from fealden import batch, sensor
+
+DEFAULTS = batch.Target("", "", 1, 50, 500, False, True)
+
+
+def read(contents: str) -> list[batch.Target]:
+    with TemporaryDirectory() as root:
+        path = Path(root, "targets")
+        path.write_text(contents)
+        return batch.read_targets(str(path), DEFAULTS)
+
+
+def test_read_targets_csv() -> None:
+    targets = read(
+        "name,sequence,binding_state,max_size,sps,fixed,thiol\n"
+        "myc,CACGTG,0,40,1000,yes,\n"
+        "\n"
+        ",TATATAA,SS,,,,0\n"
+    )
+
+    assert targets == [
+        batch.Target("myc", "cacgtg", 0, 40, 1000, True, True),
+        batch.Target("target2", "tatataa", 1, 50, 500, False, False),
+    ]
+    assert targets[0].design_args() == ("cacgtg", 0, 40, 1000, True, True)
+    assert read("Sequence\nCACGTG\n") == [
+        DEFAULTS._replace(name="target1", rec_seq="cacgtg")
+    ]
+
+
+def test_read_targets_fasta() -> None:
+    targets = read(
+        "; two targets\n"
+        ">myc binding_state=DS sps=1000\n"
+        "CAC\n"
+        "GTG\n"
+        ">tata\n"
+        "TATATAA\n"
+    )
+
+    assert targets == [
+        batch.Target("myc", "cacgtg", 0, 50, 1000, False, True),
+        batch.Target("tata", "tatataa", 1, 50, 500, False, True),
+    ]
+
+
+@pytest.mark.parametrize(
+    "contents, message",
+    [
+        ("sequence\nCACGUG\n", "line 2: invalid sequence"),
+        ("sequence,binding_state\nCACGTG,2\n", "invalid binding state"),
+        ("sequence,colour\nCACGTG,red\n", "unknown option colour"),
+        ("name\nmyc\n", "no sequence"),
+        ("name,sequence\nmyc,CACGTG,extra\n", "line 2: too many fields"),
+        ("CACGTG\n>myc\n", "sequence before the first > header"),
+        (">myc\nCACGTG\n>\nTATATAA\n", "line 3: no name after >"),
+        ("sequence,max_size\nCACGTG,40\nCACGTG,20\n", "line 3: max size 20 is too"),
+        (">myc sps=0\nCACGTG\n", "line 1: sps 0 must be at least 1"),
+        ("sequence,sps\nCACGTG,many\n", "line 2: invalid literal"),
+        (">myc\nCACGTG\n>myc\nTATATAA\n", "duplicate target names myc"),
+    ],
+)
+def test_read_targets_invalid(contents: str, message: str) -> None:
+    with pytest.raises(ValueError, match=message):
+        read(contents)
+
+
+def test_write() -> None:
+    targets = [
+        batch.Target("myc", "cacgtg", 1),
+        batch.Target("a/b", "tatataa", 1),
+        # sanitized to the same file name as the target before
+        batch.Target("a b", "gcgc", 1),
+        batch.Target("A?B", "gcgc", 1),
+    ]
+    results = [sensor.SensorList() for _ in targets]
+    with TemporaryDirectory() as root:
+        combined = Path(root, "results.csv")
+        batch.write_combined(str(combined), targets, results)
+        assert combined.read_text() == "Target," + sensor.Sensor.csv_header() + "\n"
+
+        batch.write_per_target(str(Path(root, "out")), targets, results)
+        assert sorted(p.name for p in Path(root, "out").iterdir()) == [
+            "A_B-3.csv",
+            "a_b-2.csv",
+            "a_b.csv",
+            "myc.csv",
+        ]
+
+
+def test_progress_printer(capsys: pytest.CaptureFixture[str]) -> None:
+    targets = [batch.Target("myc", "cacgtg", 1), batch.Target("tata", "tatataa", 1)]
+    results = sensor.SensorList()
+    results.add_failure(RuntimeError("no fold"))
+    progress = batch.progress_printer(targets)
+
+    progress(1, 2, 3, sensor.SensorList())
+    progress(1, 3, 3, results)
+    progress(0, 3, 3, sensor.SensorList())
+
+    assert capsys.readouterr().out == (
+        "[1/2] tata: 0 candidate sensor(s), 1 not folded\n"
+        "[2/2] myc: 0 candidate sensor(s)\n"
+    )
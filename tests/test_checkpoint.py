@@ -0,0 +1,87 @@
+import itertools
+import os
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from types import SimpleNamespace
+
+import pytest
+
+from fealden import checkpoint
+from fealden.fealden import Designer
+
+DESIGN = ("CACGTG", 1, 50, 60, False, True)
+
+
+def test_Checkpoint_save_and_load() -> None:
+    with TemporaryDirectory() as root:
+        path = str(Path(root, "run.ckpt"))
+        saved = checkpoint.Checkpoint(path, [DESIGN], 3, interval=3600)
+        task = (SimpleNamespace(name="Graph 1"), "cacgtg", 50, 2, False, True)
+        saved.task_done(0, task)
+        assert not os.path.exists(path)
+        saved.save()
+        assert os.listdir(root) == ["run.ckpt"]
+
+        loaded = checkpoint.Checkpoint.load(path)
+        assert loaded.is_done(0, task) and not loaded.is_done(1, task)
+        assert loaded.funnel(0) == {"candidates": 50, "failed": 0, "sensors": 0}
+        loaded.check([DESIGN], 3, None)
+        with pytest.raises(ValueError, match="other designs"):
+            loaded.check([("tatataa", *DESIGN[1:])], 3, None)
+        with pytest.raises(ValueError, match="master seed 3"):
+            checkpoint.open_checkpoint(path, [DESIGN], 4, resume=True)
+
+        Path(path).write_text("not a checkpoint")
+        with pytest.raises(ValueError):
+            checkpoint.Checkpoint.load(path)
+
+
+def test_Designer_resumes_checkpoint() -> None:
+    with TemporaryDirectory() as root:
+        path = str(Path(root, "run.ckpt"))
+        with Designer(backend="synthetic", jobs=1, master_seed=5) as designer:
+            whole = designer.design(*DESIGN)
+
+            # interrupted after two of its six chunks
+            started = itertools.count()
+            interrupted = checkpoint.Checkpoint(path, [DESIGN], 5, interval=0)
+            designer.design_many(
+                [DESIGN],
+                cancelled=lambda _: next(started) >= 2,
+                checkpoint=interrupted,
+            )
+            resumed = checkpoint.Checkpoint.load(path)
+            assert len(resumed.done) == 2 and resumed.funnel(0)["candidates"] == 100
+
+            progress: list[int] = []
+            results = designer.design_many(
+                [DESIGN],
+                lambda _, done, total, __: progress.append(done),
+                checkpoint=resumed,
+            )
+        # only the four chunks left were designed, finding the same sensors
+        assert progress == [3, 4, 5, 6]
+        assert [s.seq for s in results[0]] == [s.seq for s in whole]
+        assert len(checkpoint.Checkpoint.load(path).done) == 6
+
+
+def test_Designer_checkpoints_event_loop() -> None:
+    with TemporaryDirectory() as root:
+        path = str(Path(root, "run.ckpt"))
+        saving = checkpoint.Checkpoint(path, [DESIGN], 5, interval=0)
+        designer = Designer(backend="synthetic", event_loop=True, master_seed=5)
+        # the folds done when the checkpoint is saved
+        folds: list[int] = []
+        save = saving.save
+
+        def record_save() -> None:
+            assert designer.fold_stats is not None
+            folds.append(designer.fold_stats.folds)
+            save()
+
+        saving.save = record_save  # type: ignore[method-assign]
+        with designer:
+            designer.design_many([DESIGN], checkpoint=saving)
+        # saved as each of the six chunks completed, not only at the end
+        assert len(folds) == 7 and folds[0] < folds[5]
+        assert len(checkpoint.Checkpoint.load(path).done) == 6
@@ -0,0 +1,126 @@
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import Any
+from unittest import mock
+
+import pytest
+
+from fealden import distributed
+from fealden.fealden import Fealden
+from fealden.sensor import SensorList
+
+from .conftest import SensorFactory
+
+
+def test_Broker(make_sensors: SensorFactory) -> None:
+    broker = distributed.Broker({}, lease_timeout=60, top_k=2)
+    tasks: Any = ["a", "b", "c"]
+    broker.add(tasks)
+
+    first = broker.take("w1")
+    second = broker.take("w2")
+    assert first is not None and second is not None
+    assert first.id == 0 and first.task == tasks[0]
+    assert broker.renew("w1", first.id)
+    assert not broker.renew("w2", first.id)
+    broker.complete("w1", first.id, make_sensors(3.0, 1.0))
+    # a late duplicate of a completed lease is ignored
+    broker.complete("w2", first.id, make_sensors(0.5))
+    broker.complete("w2", second.id, make_sensors(2.0, 4.0))
+    assert broker.progress() == (2, 3)
+    assert not broker.wait(0)
+    assert [s.score for s in broker.results] == [1.0, 2.0]
+    assert broker.active_workers() == 2
+
+    third = broker.take("w1")
+    assert third is not None and broker.take("w1") is None
+    broker.complete("w1", third.id, make_sensors())
+    assert broker.wait(0)
+
+    # a new design does not take the results of the last
+    broker.add(tasks)
+    broker.complete("w1", first.id, make_sensors(0.1))
+    assert broker.progress() == (0, 3) and not broker.results
+
+
+def test_Broker_reassigns_leases() -> None:
+    broker = distributed.Broker({}, lease_timeout=0.05, max_attempts=2)
+    broker.add(["a"])  # type: ignore
+
+    lease = broker.take("dead")
+    assert lease is not None and broker.take("other") is None
+    time.sleep(0.1)
+    again = broker.take("other")
+    assert again == lease and broker.reassigned == 1
+    # the dead worker's lease is now the other's
+    assert not broker.renew("dead", lease.id)
+    broker.fail("other", lease.id, "RuntimeError()")
+    assert broker.task_errors == ["RuntimeError()"] and broker.wait(0)
+
+
+def test_Coordinator_leases() -> None:
+    coordinator = distributed.Coordinator("127.0.0.1:0", b"key", lease_size=40)
+    leases = coordinator.leases("CACGTG", 1, min_sens_per_seed=100)
+
+    # three seed graphs, in turn, each with leases of 40, 40 and 20 candidates
+    assert [task[2] for task in leases] == [40] * 6 + [20] * 3
+    assert [task[0] for task in leases[:3]] == [task[0] for task in leases[3:6]]
+    assert all(task[1] == "cacgtg" for task in leases)
+    with pytest.raises(ValueError):
+        coordinator.leases("CACGUG", 1)
+
+
+def test_parse_address() -> None:
+    assert distributed.parse_address("localhost:5000") == ("localhost", 5000)
+    with pytest.raises(ValueError):
+        distributed.parse_address("localhost")
+
+
+def test_Coordinator_workers() -> None:
+    env = dict(os.environ, FEALDEN_AUTHKEY="secret")
+    env["PYTHONPATH"] = os.pathsep.join([os.getcwd(), env.get("PYTHONPATH", "")])
+    with distributed.Coordinator(
+        "127.0.0.1:0", b"secret", backend="synthetic", lease_size=10, top_k=3
+    ) as coordinator:
+        command = [sys.executable, "-m", "fealden", "worker", coordinator.address]
+        workers = [subprocess.Popen(command, env=env) for _ in range(2)]
+        results = coordinator.design("CACGTG", 1, min_sens_per_seed=20)
+
+        assert coordinator.workers == 2
+        assert not coordinator.task_errors
+        assert coordinator.time_to_first_result is not None
+    assert [worker.wait(timeout=30) for worker in workers] == [0, 0]
+    assert len(results) <= 3
+    assert [s.score for s in results] == sorted(s.score for s in results)
+
+
+@pytest.mark.parametrize("environ", [{"FEALDEN_AUTHKEY": "secret"}, {}])
+def test_Fealden_coordinator_keeps_key_secret(
+    environ: dict[str, str], capsys: pytest.CaptureFixture[str]
+) -> None:
+    with TemporaryDirectory() as root, mock.patch.dict("os.environ", environ):
+        if not environ:
+            os.environ.pop("FEALDEN_AUTHKEY", None)
+        with mock.patch.object(
+            distributed.Coordinator, "design", return_value=SensorList()
+        ):
+            Fealden(
+                "cacgtg",
+                1,
+                50,
+                20,
+                False,
+                str(Path(root, "out.csv")),
+                False,
+                True,
+                coordinator="127.0.0.1:0",
+            )
+    out, err = capsys.readouterr()
+    assert "FEALDEN_AUTHKEY=KEY fealden worker" in out
+    assert "secret" not in out + err
+    # a key made up by the coordinator is only given on stderr
+    assert ("generated the key" in err) == (not environ)
@@ -1,11 +1,18 @@
 import argparse
+import json
 import random
 from pathlib import Path
 from tempfile import TemporaryDirectory
+from typing import Any
 from unittest import mock
 
-from fealden.fealden import Fealden, generate_sensor, main
+import pytest
+
+from fealden import seed, structure
+from fealden.fealden import Designer, Fealden, generate_sensor, main, pool_context
 from fealden.seed import Seed
+from fealden.sensor import REJECTIONS, SensorList
+from fealden.structure import FoldingError
 
 
 def test_Fealden() -> None:
@@ -62,6 +69,188 @@ def test_generate_sensor() -> None:
         assert repr(actual[0]) == EXPECTED_SENSOR
 
 
+def test_generate_sensor_counts_failures() -> None:
+    mock_seed = mock.Mock()
+    mock_seed.for_task.return_value = mock_seed
+    mock_seed.build_sensor.side_effect = [
+        None,
+        FoldingError("hybrid-ss-min timed out"),
+    ] * 2
+    actual = generate_sensor(mock_seed, "CACGTG", 4, 1, False, True)
+
+    assert list(actual) == []
+    assert actual.failed == 2
+    assert actual.error == "hybrid-ss-min timed out"
+
+
+def test_report_failures(capsys: pytest.CaptureFixture[str]) -> None:
+    results = SensorList()
+    results.add_failure(FoldingError("hybrid-ss-min timed out"))
+    Fealden.report_failures(results, [RuntimeError("worker died")])
+
+    output = capsys.readouterr().out
+    assert "Could not fold 1 candidate sensor(s)" in output
+    assert "1 task(s) failed" in output
+
+
+def test_Designer() -> None:
+    with Designer(backend="synthetic", jobs=1) as designer:
+        pool = designer.pool
+        first = designer.design("CACGTG", 1, min_sens_per_seed=20)
+        second = designer.design("tatataa", 0, min_sens_per_seed=20)
+
+        assert designer.pool is pool
+        assert designer.time_to_first_result is not None
+    assert designer.pool is None
+    for results in (first, second):
+        assert [s.score for s in results] == sorted(s.score for s in results)
+        assert len({s.seq for s in results}) == len(results)
+    assert all(s.base_seq == "cacgtg" for s in first)
+    # every candidate was either accepted or rejected for one of REJECTIONS
+    assert set(first.rejected) <= set(REJECTIONS)
+    assert sum(first.rejected.values()) > 0
+
+
+def test_Designer_design_many() -> None:
+    progress: list[tuple[int, int, int]] = []
+    with Designer(backend="synthetic", jobs=1) as designer:
+        results = designer.design_many(
+            [("CACGTG", 1, 50, 20, False, True), ("tatataa", 0, 50, 20, False, True)],
+            lambda index, done, total, _: progress.append((index, done, total)),
+        )
+
+    assert len(results) == 2
+    assert all(s.base_seq == "cacgtg" for s in results[0])
+    assert all(s.base_seq == "tatataa" for s in results[1])
+    # the tasks of the two designs are interleaved, and each completes
+    assert {index for index, _, _ in progress[:2]} == {0, 1}
+    assert (0, 3, 3) in progress and (1, 3, 3) in progress
+
+
+def test_Designer_design_many_cancelled() -> None:
+    progress: list[tuple[int, int, int]] = []
+    with Designer(backend="synthetic", jobs=1) as designer:
+        results = designer.design_many(
+            [("CACGTG", 1, 50, 20, False, True), ("tatataa", 0, 50, 20, False, True)],
+            lambda index, done, total, _: progress.append((index, done, total)),
+            cancelled=lambda index: index == 1,
+        )
+
+    assert len(results[1]) == 0 and results[1].failed == 0
+    assert (0, 3, 3) in progress and (1, 3, 3) in progress
+
+
+def test_Fealden_stream() -> None:
+    def run(stream: bool) -> list[str]:
+        path = Path(root, f"{stream}.csv")
+        Fealden(
+            "cacgtg",
+            1,
+            50,
+            200,
+            False,
+            str(path),
+            False,
+            True,
+            backend="synthetic",
+            jobs=1,
+            master_seed=0,
+            output_format="jsonl",
+            stream=stream,
+        )
+        lines = path.with_suffix(".jsonl").read_text().splitlines()
+        return [json.loads(line)["sequence"] for line in lines]
+
+    with TemporaryDirectory() as root:
+        ranked, streamed = run(False), run(True)
+    # the same sensors, each once, in the order found rather than best first
+    assert ranked and sorted(streamed) == sorted(ranked)
+
+
+def test_Designer_master_seed() -> None:
+    def design(**options: Any) -> list[str]:
+        with Designer(backend="synthetic", master_seed=7, **options) as designer:
+            results = designer.design("CACGTG", 1, min_sens_per_seed=60)
+        return sorted(s.seq for s in results)
+
+    whole = design(jobs=1)
+    assert whole and design(jobs=2) == whole
+    # tasks folding in this process, interleaved, design the same sequences
+    assert design(event_loop=True) == whole
+    assert design(event_loop=True, fold_concurrency=4) == whole
+    # the shards split the candidates, and together find the same sensors
+    shards = design(jobs=1, shard=(0, 2)) + design(jobs=1, shard=(1, 2))
+    assert sorted(shards) == whole
+    with pytest.raises(ValueError):
+        Designer(backend="synthetic", shard=(2, 2))
+
+
+def test_Designer_event_loop() -> None:
+    with Designer(backend="synthetic", event_loop=True) as designer:
+        designer.design("CACGTG", 1, min_sens_per_seed=20)
+
+        assert designer.pool is None
+        assert designer.fold_stats is not None
+        assert designer.fold_stats.folds > 0
+        with pytest.raises(ValueError):
+            designer.design("CACGUG", 1)
+        with pytest.raises(ValueError):
+            designer.design("CACGTG", 2)
+        # designs which would fail in the workers are rejected before any task
+        with pytest.raises(ValueError, match="recognition sequence"):
+            designer.design("", 1)
+        with pytest.raises(ValueError, match="greater than 20"):
+            designer.design("CACGTG", 1, max_sensor_size=20)
+        with pytest.raises(ValueError, match="at least 1"):
+            designer.design("CACGTG", 1, min_sens_per_seed=0)
+
+
+def test_Designer_event_loop_settings() -> None:
+    first = Designer(backend="synthetic", event_loop=True, master_seed=3)
+    # another designer does not change the backend the first folds with
+    second = Designer(backend="nnfold", event_loop=True, ensemble=True)
+    assert structure.backend_name() is None
+    with first:
+        first.design("CACGTG", 1, min_sens_per_seed=5)
+        assert structure.get_backend().__module__ == "fealden._synthetic"
+        assert seed.master_seed() == 3
+        with second:
+            assert structure.get_backend().__module__ == "fealden._nnfold"
+            assert structure.ensemble_enabled()
+        # each design selects the settings of its designer again
+        first.design("CACGTG", 1, min_sens_per_seed=5)
+        assert structure.get_backend().__module__ == "fealden._synthetic"
+    # the settings of this process are restored when the designer is closed
+    assert structure.backend_name() is None
+    assert not structure.ensemble_enabled()
+    assert structure.fold_cache_size() == 0
+    assert seed.master_seed() is None
+
+
+def test_Designer_task_errors() -> None:
+    def fail(*args: Any, error_callback: Any, **kwargs: Any) -> mock.Mock:
+        error_callback(RuntimeError("worker died"))
+        return mock.Mock()
+
+    designer = Designer(backend="synthetic", jobs=1)
+    designer.pool = mock.Mock()
+    designer.pool.apply_async.side_effect = fail
+    with pytest.raises(RuntimeError):
+        designer.design("CACGTG", 1, min_sens_per_seed=2)
+    assert len(designer.task_errors) == designer.pool.apply_async.call_count > 0
+
+
+def test_pool_context() -> None:
+    mock_context = mock.Mock()
+    mock_context.get_start_method.return_value = "forkserver"
+    with mock.patch("multiprocessing.get_context", return_value=mock_context):
+        assert pool_context("forkserver", "synthetic") is mock_context
+
+    mock_context.set_forkserver_preload.assert_called_once_with(
+        ["fealden.fealden", "dotenv", "fealden._synthetic"]
+    )
+
+
 @mock.patch("fealden.fealden.Fealden")
 @mock.patch("argparse.ArgumentParser.parse_args")
 def test__main__(mock_arg: mock.Mock, mock_fealden: mock.Mock) -> None:
@@ -75,8 +264,47 @@ def test__main__(mock_arg: mock.Mock, mock_fealden: mock.Mock) -> None:
         v=None,
         fixed=False,
         thiol3=True,
+        backend=None,
+        profile=None,
+        profile_memory=False,
+        ensemble=False,
+        fold_concurrency=1,
+        event_loop=False,
+        jobs=None,
+        memory_budget=None,
+        start_method=None,
+        batch=None,
+        per_target=False,
+        coordinator=None,
+        seed=None,
+        shard=None,
+        checkpoint=None,
+        checkpoint_interval=60.0,
+        resume=False,
+        progress=None,
+        db=None,
+        format="csv",
+        stream=False,
+        fold_store=None,
     )
     main()
     mock_fealden.assert_called_once_with(
-        "cacgtg", 1, 50, 500, None, "test.csv", False, True
+        "cacgtg",
+        1,
+        50,
+        500,
+        None,
+        "test.csv",
+        False,
+        True,
+        backend=None,
+        profile_dir=None,
+        profile_memory=False,
+        ensemble=False,
+        fold_concurrency=1,
+        event_loop=False,
+        jobs=None,
+        memory_budget=None,
+        start_method=None,
+        master_seed=None,
     )
@@ -0,0 +1,84 @@
+import os
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+import pytest
+
+from fealden import foldstore, sensor
+from fealden.fealden import Designer
+
+DESIGN = ("CACGTG", 1, 50, 60, False, True)
+
+
+def candidate(length: int) -> foldstore.Candidate:
+    stem = [[base + 1, length - base if base < 3 else 0] for base in range(length)]
+    unpaired = [[base + 1, 0] for base in range(length)]
+    return foldstore.Candidate(
+        "acgt" * (length // 4),
+        [{"deltaG": -4.155, "bps": stem}, {"deltaG": -3.5, "bps": unpaired}],
+        {"start": 5, "end": 10},
+        {"start": -1, "end": -1},
+        1,
+        "Graph 2",
+        "cacgtg",
+        False,
+        True,
+    )
+
+
+def test_encode_decode() -> None:
+    for length in (40, 300):
+        expected = candidate(length)
+        assert foldstore.decode(foldstore.encode(expected)) == expected
+    # backends may return any number of folds
+    many = candidate(40)
+    many.structure_dict.extend(many.structure_dict[1:] * 298)
+    assert len(many.structure_dict) == 300
+    assert foldstore.decode(foldstore.encode(many)) == many
+    # a byte per base and fold for short sequences
+    assert len(foldstore.encode(candidate(40))) < 200
+
+
+def test_chunks() -> None:
+    with TemporaryDirectory() as root:
+        path = str(Path(root, "worker-1.folds"))
+        with open(path, "wb") as f:
+            f.write(foldstore.MAGIC)
+            for _ in range(5):
+                f.write(foldstore.encode(candidate(40)))
+            # cut short, as by a worker which was killed
+            f.write(foldstore.encode(candidate(40))[:30])
+
+        found = list(foldstore.chunks(path, 2))
+        size = len(foldstore.encode(candidate(40)))
+        assert [end - start for _, start, end in found] == [2 * size, 2 * size, size]
+        assert [len(list(foldstore.read(*chunk))) for chunk in found] == [2, 2, 1]
+        assert foldstore.store_files(root) == [path]
+
+        with open(path, "wb") as f:
+            f.write(b"Sequence,Score\n")
+        with pytest.raises(ValueError):
+            list(foldstore.chunks(path))
+
+
+def test_rescore() -> None:
+    with TemporaryDirectory() as root:
+        store = str(Path(root, "store"))
+        with Designer(
+            backend="synthetic", jobs=1, master_seed=5, fold_store=store
+        ) as designer:
+            designed = designer.design(*DESIGN)
+        # every candidate was kept, accepted or not
+        (path,) = foldstore.store_files(store)
+        (chunk,) = foldstore.chunks(path)
+        rescored, scored = foldstore.rescore(chunk, sensor.Sensor.THRESHOLDS)
+        assert scored > len(designed) > 0
+        assert {sen.seq for sen in rescored} == {sen.seq for sen in designed}
+
+        output = str(Path(root, "rescored.csv"))
+        foldstore.main([store, "-o", output, "--jobs", "1", "--max-on-dist", "16"])
+        with open(output) as f:
+            lines = f.read().splitlines()
+        assert lines[0] == sensor.Sensor.csv_header()
+        assert len(lines) - 1 >= len({sen.seq for sen in designed})
+        assert os.listdir(store)[0].endswith(foldstore.SUFFIX)
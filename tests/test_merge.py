@@ -0,0 +1,52 @@
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+import pytest
+
+from fealden import merge
+
+HEADER = "Sequence,Score,Seed Name\n"
+
+
+def write(root: str, name: str, rows: str) -> str:
+    path = Path(root, name)
+    path.write_text(HEADER + rows)
+    return str(path)
+
+
+def test_merge_files() -> None:
+    with TemporaryDirectory() as root:
+        files = [
+            write(root, "0.csv", "aaa,0.1,Graph 1\nccc,0.3,Graph 2\nttt,0.5,Graph 1\n"),
+            write(root, "1.csv", "ggg,0.2,Graph 1\nccc,0.3,Graph 2\n"),
+            write(root, "2.csv", ""),
+        ]
+        output = str(Path(root, "merged.csv"))
+
+        assert merge.merge_files(files, output) == 4
+        assert Path(output).read_text() == HEADER + (
+            "aaa,0.1,Graph 1\nggg,0.2,Graph 1\nccc,0.3,Graph 2\nttt,0.5,Graph 1\n"
+        )
+        assert merge.merge_files(files, output, top_k=2) == 2
+        assert Path(output).read_text().splitlines()[1:] == [
+            "aaa,0.1,Graph 1",
+            "ggg,0.2,Graph 1",
+        ]
+
+
+@pytest.mark.parametrize(
+    "contents, message",
+    [
+        ("", "empty"),
+        ("Sequence,Score\naaa,0.1\n", "different header"),
+        (HEADER + "aaa,0.2,Graph 1\nccc,0.1,Graph 1\n", "line 3: not sorted"),
+        (HEADER + "aaa,,Graph 1\n", "line 2: no score"),
+    ],
+)
+def test_merge_files_invalid(contents: str, message: str) -> None:
+    with TemporaryDirectory() as root:
+        good = write(root, "good.csv", "aaa,0.1,Graph 1\n")
+        bad = Path(root, "bad.csv")
+        bad.write_text(contents)
+        with pytest.raises(ValueError, match=message):
+            merge.merge_files([good, str(bad)], str(Path(root, "merged.csv")))
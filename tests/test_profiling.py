@@ -0,0 +1,68 @@
+import cProfile
+import os
+import pstats
+import tracemalloc
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from fealden import profiling
+from fealden.fealden import Designer
+
+
+def _work(n: int) -> int:
+    return sum(range(n))
+
+
+def _stale(n: int) -> int:
+    return sum(range(n))
+
+
+def test_run_profiled_without_init() -> None:
+    assert profiling.run_profiled(_work, 10) == 45
+
+
+def test_run_profiled_and_merge() -> None:
+    with TemporaryDirectory() as tmpdirname:
+        profiling.init_worker(tmpdirname, memory=True)
+        try:
+            assert profiling.run_profiled(_work, 10) == 45
+        finally:
+            profiling._profiler = None
+            profiling._profile_dir = None
+            tracemalloc.stop()
+
+        worker_file = profiling.worker_profile_path(tmpdirname, os.getpid())
+        assert os.path.exists(worker_file)
+        assert os.path.exists(
+            profiling.worker_profile_path(tmpdirname, os.getpid(), "tracemalloc")
+        )
+
+        merged = profiling.merge_profiles(tmpdirname)
+        assert merged == os.path.join(tmpdirname, "merged.pstats")
+        functions = {name for (_, _, name) in pstats.Stats(merged).stats}  # type: ignore
+        assert "_work" in functions
+
+
+def test_merge_profiles_empty() -> None:
+    with TemporaryDirectory() as tmpdirname:
+        assert profiling.merge_profiles(tmpdirname) is None
+
+
+def test_merge_profiles_ignores_earlier_runs() -> None:
+    with TemporaryDirectory() as tmpdirname:
+        # a profile left by a worker of an earlier run
+        profiler = cProfile.Profile()
+        profiler.runcall(_stale, 10)
+        stale = profiling.worker_profile_path(tmpdirname, 1)
+        profiler.dump_stats(stale)
+        Path(profiling.worker_profile_path(tmpdirname, 1, "tracemalloc")).touch()
+
+        with Designer(backend="synthetic", jobs=1, profile_dir=tmpdirname) as designer:
+            designer.design("CACGTG", 1, min_sens_per_seed=5)
+
+        assert not os.path.exists(stale)
+        merged = profiling.merge_profiles(tmpdirname)
+        assert merged is not None
+        functions = {name for (_, _, name) in pstats.Stats(merged).stats}  # type: ignore
+        assert "_stale" not in functions
+        assert "generate_sensor" in functions
@@ -0,0 +1,66 @@
+import io
+import json
+import queue
+
+import pytest
+
+from fealden import progress
+from fealden.fealden import Designer
+
+
+def test_count_and_beat() -> None:
+    heartbeats: queue.SimpleQueue[tuple[int, int, int, float]] = queue.SimpleQueue()
+    progress.init_worker(heartbeats)
+    try:
+        progress.count(generated=1)
+        progress.count(generated=1, folded=1, accepted=1, score=0.5)
+        progress.count(generated=1, folded=1, accepted=1, score=0.25)
+        assert heartbeats.empty()
+        progress.beat()
+        assert heartbeats.get() == (3, 2, 2, 0.25)
+        # nothing new to send
+        progress.beat()
+        assert heartbeats.empty()
+    finally:
+        progress.init_worker(None)
+
+
+def test_Reporter() -> None:
+    heartbeats: queue.SimpleQueue[tuple[int, int, int, float]] = queue.SimpleQueue()
+    heartbeats.put((40, 30, 3, 0.5))
+    heartbeats.put((10, 10, 1, 0.25))
+    stream = io.StringIO()
+    with progress.Reporter(heartbeats, 100, "json", stream):
+        pass
+
+    state = json.loads(stream.getvalue().splitlines()[-1])
+    assert state["candidates"] == 50 and state["total"] == 100
+    assert state["acceptance_rate"] == 0.1 and state["best_score"] == 0.25
+    assert state["eta_seconds"] is not None
+
+    stream = io.StringIO()
+    reporter = progress.Reporter(queue.SimpleQueue(), 100, "line", stream)
+    reporter.render()
+    reporter.close()
+    assert stream.getvalue().startswith("\r0/100 candidates")
+    assert "best -  ETA -" in stream.getvalue()
+    assert stream.getvalue().endswith("\n")
+
+    with pytest.raises(ValueError):
+        progress.Reporter(heartbeats, 100, "xml")
+
+
+@pytest.mark.parametrize("event_loop", [False, True])
+def test_Designer_reports_progress(
+    event_loop: bool, capsys: pytest.CaptureFixture[str]
+) -> None:
+    with Designer(
+        backend="synthetic", jobs=1, event_loop=event_loop, progress_format="json"
+    ) as designer:
+        results = designer.design("CACGTG", 1, min_sens_per_seed=20)
+
+    state = json.loads(capsys.readouterr().err.splitlines()[-1])
+    assert state["candidates"] == state["total"] == 60
+    assert state["accepted"] >= len(results)
+    if results:
+        assert state["best_score"] == results[0].score
@@ -0,0 +1,64 @@
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import mock
+
+from fealden import resources
+
+
+def write(root: str, name: str, contents: str) -> None:
+    path = Path(root, name)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(contents + "\n")
+
+
+def test_cgroup_cpu_limit() -> None:
+    with TemporaryDirectory() as root:
+        assert resources.cgroup_cpu_limit(root) is None
+        write(root, "cpu/cpu.cfs_quota_us", "-1")
+        write(root, "cpu/cpu.cfs_period_us", "100000")
+        assert resources.cgroup_cpu_limit(root) is None
+        write(root, "cpu/cpu.cfs_quota_us", "300000")
+        assert resources.cgroup_cpu_limit(root) == 3.0
+        write(root, "cpu.max", "max 100000")
+        assert resources.cgroup_cpu_limit(root) is None
+        write(root, "cpu.max", "150000 100000")
+        assert resources.cgroup_cpu_limit(root) == 1.5
+
+
+@mock.patch("os.sched_getaffinity", return_value={0, 1, 2, 3, 4, 5, 6, 7})
+def test_available_cpus(mock_affinity: mock.Mock) -> None:
+    with TemporaryDirectory() as root:
+        assert resources.available_cpus(root) == 8
+        write(root, "cpu.max", "250000 100000")
+        assert resources.available_cpus(root) == 3
+        write(root, "cpu.max", "5000 100000")
+        assert resources.available_cpus(root) == 1
+
+
+def test_cgroup_memory_limit() -> None:
+    with TemporaryDirectory() as root:
+        assert resources.cgroup_memory_limit(root) is None
+        write(root, "memory/memory.limit_in_bytes", str(2**63 - 4096))
+        assert resources.cgroup_memory_limit(root) is None
+        write(root, "memory.max", "max")
+        assert resources.cgroup_memory_limit(root) is None
+        write(root, "memory.max", str(512 * 2**20))
+        assert resources.cgroup_memory_limit(root) == 512
+
+
+def test_plan() -> None:
+    assert resources.plan(cpus=8) == (8, 1)
+    assert resources.plan(fold_concurrency=4, cpus=8) == (2, 4)
+    assert resources.plan(fold_concurrency=16, cpus=8) == (1, 16)
+    assert resources.plan(jobs=3, fold_concurrency=4, cpus=8) == (3, 4)
+    # 2 workers and 8 candidates in flight need 2 * 80 + 8 * 20 = 320 MB
+    assert resources.plan(2, 4, memory_budget=320) == (2, 4)
+    assert resources.plan(2, 4, memory_budget=280) == (2, 3)
+    assert resources.plan(4, 1, memory_budget=250) == (2, 1)
+    assert resources.plan(4, 1, memory_budget=10) == (1, 1)
+
+
+def test_parse_memory_budget() -> None:
+    assert resources.parse_memory_budget("1024") == 1024.0
+    with mock.patch("fealden.resources.available_memory", return_value=2048.0):
+        assert resources.parse_memory_budget("auto") == 2048.0
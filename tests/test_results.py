@@ -0,0 +1,55 @@
+import pytest
+
+from fealden import results, sensor
+
+from .conftest import SensorFactory
+
+
+def test_SensorRecord(make_sensors: SensorFactory) -> None:
+    assert results.SensorRecord._fields == tuple(sensor.COLUMNS)
+    assert results.SensorRecord is sensor.SensorRecord
+    header = sensor.Sensor.csv_header().replace(" (nm)", "").lower().split(",")
+    assert [name.replace("_", " ") for name in results.SensorRecord._fields] == header
+
+    (record,) = results.Results.from_sensors(make_sensors(("acgt", 0.5)))
+    assert record.score == 0.5 and record.length == 4
+    assert record.as_dict()["sequence"] == "acgt"
+    assert record.csv_line().startswith("acgt,0.5,Graph 1,0,")
+
+
+def test_Results(make_sensors: SensorFactory) -> None:
+    found = results.Results.from_sensors(
+        make_sensors(("aaaaaa", 0.3), ("cc", 0.1), ("gggg", 0.2))
+    )
+    assert found.sorted().column("sequence") == ["cc", "gggg", "aaaaaa"]
+    assert found.sorted("length", reverse=True)[0].sequence == "aaaaaa"
+    assert found.sorted(lambda record: record.sequence)[0].sequence == "aaaaaa"
+
+    short = found.filter(lambda record: record.length < 5)
+    assert isinstance(short, results.Results)
+    assert short.column("score") == [0.1, 0.2]
+
+    lines = found.csv_lines()
+    assert lines[0] == sensor.Sensor.csv_header()
+    assert lines[2].startswith("cc,0.1,")
+    with pytest.raises(ValueError):
+        found.sorted("energy")
+
+
+def test_to_numpy(make_sensors: SensorFactory) -> None:
+    np = pytest.importorskip("numpy")
+    found = results.Results.from_sensors(
+        make_sensors(("aaaaaa", 0.3), ("cc", 0.1))
+    )
+    array = found.to_numpy()
+    assert array.dtype["score"] == np.float64
+    assert array.dtype["length"] == np.int64
+    assert list(np.sort(array, order="score")["sequence"]) == ["cc", "aaaaaa"]
+    assert results.Results().to_numpy().shape == (0,)
+
+
+def test_to_pandas(make_sensors: SensorFactory) -> None:
+    pytest.importorskip("pandas")
+    frame = results.Results.from_sensors(make_sensors(("cc", 0.1))).to_pandas()
+    assert list(frame.columns) == list(results.SensorRecord._fields)
+    assert frame["score"].tolist() == [0.1]
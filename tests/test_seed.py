@@ -1,3 +1,4 @@
+from fealden import seed
 from fealden.seed import Seed
 
 
@@ -28,3 +29,17 @@ def test_Seed() -> None:
 sequence='}, recNodeName=7,        recSeq=CACGTG, bindingState=1,        max_size=50"
 
     assert repr(actual) == EXPECTED
+
+
+def test_Seed_for_task() -> None:
+    graph = Seed(["2 1 3 3 0", "3 2 2"], "3", "CACGTG", 1, "Graph 1", 50)
+    assert graph.for_task(1) is graph
+    try:
+        seed.use_master_seed(7)
+        first, again, other = graph.for_task(1), graph.for_task(1), graph.for_task(2)
+        assert first is not graph and first.name == graph.name
+        draws = [first.rand().random() for _ in range(3)]
+        assert draws == [again.rand().random() for _ in range(3)]
+        assert draws != [other.rand().random() for _ in range(3)]
+    finally:
+        seed.use_master_seed(None)
@@ -1,4 +1,6 @@
-from fealden.sensor import Sensor
+import pickle
+
+from fealden.sensor import COLUMNS, Sensor, SensorList, SensorRecord, Thresholds
 
 
 def test_Sensor() -> None:
@@ -133,3 +135,87 @@ def test_Sensor() -> None:
     )
 
     assert repr(actual) == EXPECTED_SENSOR
+    # the record of a sensor has the values and types of COLUMNS
+    assert SensorRecord.from_sensor(actual).csv_line() == EXPECTED_SENSOR
+    assert {name: type(value) for name, value in actual.as_dict().items()} == COLUMNS
+
+
+def test_energy_triage() -> None:
+    assert Sensor.energy_triage([-10.0]) == -1
+    assert Sensor.energy_triage([-10.0, -4.0]) == -2
+    assert Sensor.energy_triage([-1.5, -1.0]) == -5
+    assert Sensor.energy_triage([-60.0, -59.0, -58.0]) == -5
+    # the 3rd fold is disparate, so the recognition sequence state decides
+    assert Sensor.energy_triage([-1.5, -1.0, 5.0]) == 0
+    assert Sensor.energy_triage([-10.0, -9.0, -8.0]) == 0
+
+
+def test_Sensor_triage() -> None:
+    folds = [{"deltaG": -10.0, "bps": [[1, 0]]}, {"deltaG": -4.0, "bps": [[1, 0]]}]
+
+    actual = Sensor(
+        ("a", folds),  # type: ignore[arg-type]
+        {"start": 1, "end": 1},
+        {"start": -1, "end": -1},
+        1,
+        "Graph 1",
+        "A",
+        False,
+    )
+
+    assert (actual.tag_loc, actual.score) == (0, -2)
+    assert actual.folds == []
+
+
+def test_Sensor_thresholds() -> None:
+    assert Sensor.energy_triage([-10.0, -4.0], max_difference=7) == 0
+    actual = Sensor(
+        ("aaaa", []),
+        {"start": 2, "end": 4},
+        {"start": -1, "end": -1},
+        1,
+        "Graph 1",
+        "AA",
+        False,
+        thresholds=Thresholds(signal_gain_weight=5),
+    )
+    actual.on_conc, actual.off_conc, actual.on_to_off_dist = (1, 1, 10)
+
+    assert actual.calculate_score() == 1.0
+    actual.thresholds = Sensor.THRESHOLDS
+    assert actual.calculate_score() == 1.5
+
+
+def test_Sensor_ensemble_populations() -> None:
+    actual = Sensor(
+        ("aaaa", []),
+        {"start": 2, "end": 4},
+        {"start": -1, "end": -1},
+        1,
+        "Graph 1",
+        "AA",
+        False,
+    )
+    actual.ensemble = lambda: [0.0, 0.5, 1.0, 0.0]
+
+    assert actual.ensemble_populations() == (0.75, 0.25)
+    actual.des_rec_seq_state = 0
+    assert actual.ensemble_populations() == (0.25, 0.75)
+
+
+def test_SensorList() -> None:
+    first, second = SensorList(), SensorList()
+    first.add_failure(RuntimeError("hybrid-ss-min timed out"))
+    second.append(Sensor(("aaaa", []), {"start": 2, "end": 4}, {}, 1, "G", "A", False))
+    second.add_failure(RuntimeError("sir_graph exited with status 1"))
+    first.add_rejection(-5)
+    second.add_rejection(-5)
+    second.add_rejection(-1)
+
+    first.merge(pickle.loads(pickle.dumps(second)))
+
+    assert len(first) == 1
+    assert first.failed == 2
+    assert first.error == "sir_graph exited with status 1"
+    assert first.rejected == {-5: 2, -1: 1}
+    assert first.best_first().rejected == first.rejected
@@ -0,0 +1,126 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+from collections.abc import Iterator
+from typing import Any
+
+import pytest
+
+from fealden import server
+from fealden.fealden import Designer
+
+JOB = {"rec_seq": "CACGTG", "binding_state": 1, "min_sens_per_seed": 20}
+
+
+def request(url: str, method: str = "GET", body: Any = None) -> tuple[int, Any]:
+    data = None if body is None else json.dumps(body).encode()
+    req = urllib.request.Request(url, data, method=method)
+    try:
+        with urllib.request.urlopen(req, timeout=30) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+@pytest.fixture
+def service() -> Iterator[tuple[str, server.JobQueue]]:
+    # the queue is started by the tests which run jobs
+    queue = server.JobQueue(Designer(backend="synthetic", jobs=1), max_queued=2)
+    httpd = server.DesignServer(("127.0.0.1", 0), queue)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{httpd.server_port}", queue
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+        queue.close()
+
+
+def test_parse_job() -> None:
+    assert server.parse_job(json.dumps(JOB).encode()) == (
+        "CACGTG",
+        1,
+        50,
+        20,
+        False,
+        True,
+    )
+    for body, message in [
+        (b"{", "not valid JSON"),
+        (b"[]", "must be a JSON object"),
+        (b'{"rec_seq": "CACGTG"}', "Missing parameter binding_state"),
+        (b'{"rec_seq": "CACGTG", "binding_state": true}', "binding_state must be"),
+        (b'{"rec_seq": "CACGTG", "binding_state": 1, "jobs": 4}', "Unknown parameter"),
+    ]:
+        with pytest.raises(ValueError, match=message):
+            server.parse_job(body)
+
+
+def test_queue_limits_and_cancel(service: tuple[str, server.JobQueue]) -> None:
+    url, _ = service
+    invalid_jobs: list[tuple[dict[str, Any], str]] = [
+        ({"rec_seq": "CACGUG"}, "Invalid recognition sequence"),
+        ({"rec_seq": ""}, "Invalid recognition sequence"),
+        ({"max_sensor_size": 20}, "must be greater than 20"),
+        ({"min_sens_per_seed": 0}, "must be at least 1"),
+    ]
+    for invalid, message in invalid_jobs:
+        code, error = request(url + "/jobs", "POST", {**JOB, **invalid})
+        assert code == 400 and message in error["error"]
+    code, first = request(url + "/jobs", "POST", JOB)
+    assert code == 202 and first["state"] == "queued"
+    assert request(url + "/jobs", "POST", JOB)[0] == 202
+    assert request(url + "/jobs", "POST", JOB)[0] == 429
+
+    code, cancelled = request(url + "/jobs/" + first["id"], "DELETE")
+    assert code == 200 and cancelled["state"] == "cancelled"
+    assert request(url + "/jobs/" + first["id"], "DELETE")[0] == 409
+    assert request(url + "/jobs/nothing", "DELETE")[0] == 404
+    assert request(url + "/jobs/nothing")[0] == 404
+    assert request(url + "/health")[1]["jobs"] == {"cancelled": 1, "queued": 1}
+    assert [job["id"] for job in request(url + "/jobs")[1]][0] == first["id"]
+
+
+def test_run_jobs(service: tuple[str, server.JobQueue]) -> None:
+    url, queue = service
+    ids = [
+        request(url + "/jobs", "POST", JOB)[1]["id"],
+        request(url + "/jobs", "POST", {**JOB, "rec_seq": "tatataa"})[1]["id"],
+    ]
+    queue.start()
+    for job_id in ids:
+        with urllib.request.urlopen(f"{url}/jobs/{job_id}/events", timeout=30) as r:
+            assert r.headers["Content-Type"] == "application/x-ndjson"
+            events = [json.loads(line) for line in r]
+        assert events[-1]["state"] == "done"
+        assert all(event["state"] != "done" for event in events[:-1])
+        assert events[-1]["tasks_done"] == events[-1]["tasks"] == 3
+
+        code, status = request(f"{url}/jobs/{job_id}")
+        assert code == 200 and status == events[-1]
+        scores = [sen["score"] for sen in status["sensors"]]
+        assert scores == sorted(scores) and len(scores) == status["sensors_found"]
+    assert request(url + "/jobs/" + ids[0], "DELETE")[0] == 409
+
+
+def test_jobs_start_as_others_finish() -> None:
+    queue = server.JobQueue(Designer(backend="synthetic", jobs=2), max_running=2)
+    queue.start()
+    try:
+        jobs = [
+            queue.submit(("CACGTG", 1, 50, 600, False, True)),
+            queue.submit(("CACGTG", 1, 50, 20, False, True)),
+            queue.submit(("tatataa", 1, 50, 20, False, True)),
+        ]
+        version = 0
+        while any(job.state not in server.FINISHED for job in jobs):
+            version = queue.wait_for_change(version, 30)
+    finally:
+        queue.close()
+    assert [job.state for job in jobs] == ["done"] * 3
+    long, short, last = (job.finished or 0.0 for job in jobs)
+    assert short < long
+    # the last job is started as the short one finishes, not after the long one
+    assert (jobs[2].started or long) < long
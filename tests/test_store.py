@@ -0,0 +1,102 @@
+import json
+import sqlite3
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+import pytest
+
+from fealden import sensor, store
+
+from .conftest import SensorFactory
+
+DESIGN = ("CACGTG", 1, 50, 500, False, True)
+
+
+def test_SENSOR_COLUMNS() -> None:
+    assert list(store.SENSOR_COLUMNS) == list(sensor.COLUMNS)
+    assert store.SENSOR_COLUMNS["sequence"] == "TEXT"
+    assert store.SENSOR_COLUMNS["score"] == "REAL"
+    assert store.SENSOR_COLUMNS["length"] == "INTEGER"
+
+
+def test_ResultStore(make_sensors: SensorFactory) -> None:
+    with TemporaryDirectory() as root:
+        path = str(Path(root, "results.db"))
+        with store.ResultStore(path) as db:
+            first = make_sensors(("aaaa", 0.3), ("cccc", 0.1))
+            first.add_failure(RuntimeError("timed out"))
+            first.add_rejection(-5)
+            first.add_rejection(-5)
+            run = db.add_run(DESIGN, first, options={"backend": "synthetic"})
+            db.add_run(DESIGN, make_sensors(("cccc", 0.1), ("gggg", 0.2)), name="myc")
+            db.add_run(("tatataa", *DESIGN[1:]), make_sensors(("tttt", 0.0)))
+
+            top = db.top("cacgtg", 2)
+            assert [(row["sequence"], row["run_id"]) for row in top] == [
+                ("cccc", run),
+                ("gggg", run + 1),
+            ]
+            assert [row["sequence"] for row in db.top("CACGTG")] == [
+                "cccc",
+                "gggg",
+                "aaaa",
+            ]
+            stats = db.connection.execute(
+                "SELECT target, sensors, failed, last_error, options FROM runs"
+                " WHERE id = ?",
+                (run,),
+            ).fetchone()
+            assert tuple(stats)[:4] == ("cacgtg", 2, 1, "timed out")
+            assert json.loads(stats["options"]) == {"backend": "synthetic"}
+            rejected = db.connection.execute(
+                "SELECT rejected_energy_out_of_range, rejected_one_fold FROM runs"
+                " WHERE id = ?",
+                (run,),
+            ).fetchone()
+            assert tuple(rejected) == (2, 0)
+            indexes = {
+                row[0]
+                for row in db.connection.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'index'"
+                )
+            }
+            assert {
+                "sensors_target_score",
+                "sensors_score",
+                "sensors_length",
+            } <= indexes
+
+        # the database is reopened as it is
+        with store.ResultStore(path) as db:
+            assert len(db.top("cacgtg")) == 3
+
+
+def test_ResultStore_adds_rejection_columns() -> None:
+    with TemporaryDirectory() as root:
+        path = str(Path(root, "results.db"))
+        with sqlite3.connect(path) as connection:
+            # the runs table as written before the rejections were counted
+            connection.execute(
+                "CREATE TABLE runs (id INTEGER PRIMARY KEY, created TEXT NOT NULL,"
+                " target TEXT NOT NULL, failed INTEGER NOT NULL, last_error TEXT)"
+            )
+        with store.ResultStore(path) as db:
+            columns = {
+                row["name"] for row in db.connection.execute("PRAGMA table_info(runs)")
+            }
+        assert set(store.REJECTION_COLUMNS.values()) <= columns
+
+
+def test_main(capsys: pytest.CaptureFixture[str], make_sensors: SensorFactory) -> None:
+    with TemporaryDirectory() as root:
+        path = str(Path(root, "results.db"))
+        with store.ResultStore(path) as db:
+            db.add_run(DESIGN, make_sensors(("aaaa", 0.3), ("cccc", 0.1)))
+        store.main([path, "CACGTG", "-n", "1"])
+
+        lines = capsys.readouterr().out.splitlines()
+        assert lines[0] == "Run," + sensor.Sensor.csv_header()
+        assert lines[1].startswith("1,cccc,0.1,")
+        assert len(lines) == 2
+        with pytest.raises(SystemExit):
+            store.main([str(Path(root, "missing.db")), "CACGTG"])
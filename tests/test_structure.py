@@ -0,0 +1,116 @@
+import os
+import subprocess
+import sys
+from unittest import mock
+
+import pytest
+
+from fealden import _synthetic, structure
+
+
+def test_import_needs_no_backend() -> None:
+    environ = {k: v for k, v in os.environ.items() if not k.startswith("FEALDEN")}
+    code = "import sys, fealden.seed; assert 'dotenv' not in sys.modules"
+    result = subprocess.run([sys.executable, "-c", code], env=environ)
+
+    assert result.returncode == 0
+
+
+def test_use_backend() -> None:
+    try:
+        structure.use_backend("synthetic")
+
+        assert structure.get_backend() is _synthetic.RNAfolder
+        assert isinstance(structure.RNAfolder("gcgcaaaagcgc"), _synthetic.RNAfolder)
+    finally:
+        structure.use_backend(None)
+
+
+def test_backend_modules() -> None:
+    assert structure.backend_modules("mfold") == ["fealden._unafold"]
+    with mock.patch.dict("os.environ", {"FEALDEN_RECORD_BACKEND": "nnfold"}):
+        assert structure.backend_modules("record") == [
+            "fealden._replay",
+            "fealden._nnfold",
+        ]
+    with mock.patch.dict("os.environ", {"FEALDEN_BACKEND": ""}):
+        assert structure.backend_modules(None) == []
+
+
+def test_use_backend_unknown() -> None:
+    with pytest.raises(ValueError):
+        structure.use_backend("vienna")
+
+
+@mock.patch("dotenv.load_dotenv")
+def test_no_backend_configured(mock_load_dotenv: mock.Mock) -> None:
+    with mock.patch.dict("os.environ", {"FEALDEN_BACKEND": ""}):
+        structure.use_backend(None)
+        with pytest.raises(ImportError):
+            structure.RNAfolder("gcgcaaaagcgc")
+    structure.use_backend(None)
+
+
+@mock.patch.dict("os.environ", {"FEALDEN_FOLD_RETRIES": "2"})
+def test_retry() -> None:
+    calls = []
+
+    def fail(seq: str) -> str:
+        calls.append(seq)
+        if len(calls) < 3:
+            raise structure.FoldingError("hybrid-ss-min timed out")
+        return seq
+
+    assert structure.retry(fail, "gcgc") == "gcgc"
+    assert len(calls) == 3
+
+    calls.clear()
+    with mock.patch.dict("os.environ", {"FEALDEN_FOLD_RETRIES": "1"}):
+        with pytest.raises(structure.FoldingError):
+            structure.retry(fail, "gcgc")
+    assert len(calls) == 2
+
+
+def test_use_fold_cache() -> None:
+    try:
+        structure.use_backend("synthetic")
+        structure.use_fold_cache(2)
+        first = structure.RNAfolder("gcgcaaaagcgc")
+
+        assert structure.RNAfolder("GCGCAAAAGCGC") is first
+        structure.RNAfolder("gcgcaaaagcgg")
+        structure.RNAfolder("gcgcaaaagcgt")
+        assert structure.fold_cache_info() == (1, 3, 2)
+        assert structure.RNAfolder("gcgcaaaagcgc") is not first
+    finally:
+        structure.use_fold_cache(0)
+        structure.use_backend(None)
+
+
+def test_suboptimal_percent() -> None:
+    try:
+        assert structure.suboptimal_percent() == structure.SUBOPTIMAL_PERCENT
+        structure.use_ensemble(True)
+        assert structure.ensemble_enabled()
+        assert structure.suboptimal_percent() == structure.ENSEMBLE_SUBOPTIMAL_PERCENT
+    finally:
+        structure.use_ensemble(False)
+
+
+def test_boltzmann_unpaired() -> None:
+    structure_dict = [
+        {"deltaG": -1.0, "bps": [[1, 3], [2, 0], [3, 1]]},
+        {"deltaG": -1.0, "bps": [[1, 0], [2, 0], [3, 0]]},
+    ]
+
+    actual = structure.boltzmann_unpaired(3, structure_dict)  # type: ignore[arg-type]
+
+    assert actual == [0.5, 1.0, 0.5]
+    assert structure.boltzmann_unpaired(2, []) == [1.0, 1.0]
+
+
+def test_unpaired_probabilities() -> None:
+    folder = mock.Mock()
+    folder.unpaired_probabilities.return_value = [0.25]
+
+    assert structure.unpaired_probabilities("a", folder) == [0.25]
@@ -0,0 +1,99 @@
+import json
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import mock
+
+import pytest
+
+from fealden import sensor, writers
+
+from .conftest import SensorFactory
+
+
+def test_output_path_and_format() -> None:
+    assert writers.output_path("run.csv", "jsonl") == "run.jsonl"
+    assert writers.output_path("run.npz", "csv") == "run.csv"
+    assert writers.output_path("run.out", "npz") == "run.out"
+    with mock.patch("fealden.writers.has_pyarrow", return_value=False):
+        assert writers.output_format("parquet") == "npz"
+    with pytest.raises(ValueError):
+        writers.output_format("xml")
+
+
+def test_csv_and_jsonl(make_sensors: SensorFactory) -> None:
+    with TemporaryDirectory() as root:
+        with writers.open_writer(str(Path(root, "run.csv")), "csv") as writer:
+            writer.write_all(make_sensors(0.1, 0.2))
+        lines = Path(writer.path).read_text().splitlines()
+        assert lines[0] == sensor.Sensor.csv_header()
+        assert lines[1].startswith("seq0.1,0.1,")
+
+        with mock.patch("fealden.writers.BATCH_SIZE", 2):
+            with writers.open_writer(
+                str(Path(root, "run.csv")), "jsonl", target_column=True
+            ) as writer:
+                writer.write_all(make_sensors(0.1, 0.2, 0.3), "myc")
+        assert writer.path.endswith("run.jsonl") and writer.rows == 3
+        rows = [json.loads(line) for line in Path(writer.path).read_text().splitlines()]
+        assert [row["score"] for row in rows] == [0.1, 0.2, 0.3]
+        assert list(rows[0])[:2] == ["target", "sequence"]
+
+
+def test_npz(make_sensors: SensorFactory) -> None:
+    np = pytest.importorskip("numpy")
+    with TemporaryDirectory() as root:
+        with mock.patch("fealden.writers.BATCH_SIZE", 2):
+            with writers.open_writer(
+                str(Path(root, "run.csv")), "npz", target_column=True
+            ) as writer:
+                writer.write_all(make_sensors(0.1, 0.2, 0.3), "myc")
+        with np.load(writer.path) as arrays:
+            assert arrays["score"].dtype == np.float64
+            assert list(arrays["score"]) == [0.1, 0.2, 0.3]
+            assert list(arrays["target"]) == ["myc"] * 3
+            assert arrays["length"].dtype == np.int64
+
+        with writers.open_writer(str(Path(root, "empty.npz")), "npz") as writer:
+            pass
+        with np.load(writer.path) as arrays:
+            assert len(arrays["sequence"]) == 0
+
+
+def test_parquet(make_sensors: SensorFactory) -> None:
+    pq = pytest.importorskip("pyarrow.parquet")
+    with TemporaryDirectory() as root:
+        with mock.patch("fealden.writers.BATCH_SIZE", 2):
+            with writers.open_writer(str(Path(root, "run.csv")), "parquet") as writer:
+                writer.write_all(make_sensors(0.1, 0.2, 0.3))
+        parquet = pq.ParquetFile(writer.path)
+        assert parquet.metadata.num_row_groups == 2
+        assert parquet.read().column("score").to_pylist() == [0.1, 0.2, 0.3]
+
+
+def test_ResultWriter_is_abstract() -> None:
+    with pytest.raises(TypeError):
+        writers.ResultWriter("run.csv")  # type: ignore[abstract]
+
+
+def test_SensorStream(make_sensors: SensorFactory) -> None:
+    with TemporaryDirectory() as root:
+        with mock.patch("fealden.writers.BATCH_SIZE", 2):
+            with writers.open_writer(
+                str(Path(root, "run.jsonl")), "jsonl", target_column=True
+            ) as writer:
+                stream = writers.SensorStream(writer)
+                first, second, third = make_sensors(0.3, 0.1, 0.2)
+                stream.add([first], "myc")
+                assert writer.rows == 0
+                # a sequence found again is written once per target
+                stream.add([first, second], "myc")
+                assert writer.rows == 2
+                stream.add([third, first], "max")
+                stream.flush()
+        rows = [json.loads(line) for line in Path(writer.path).read_text().splitlines()]
+        assert [(row["target"], row["score"]) for row in rows] == [
+            ("myc", 0.3),
+            ("myc", 0.1),
+            ("max", 0.2),
+            ("max", 0.3),
+        ]